@@ -1,15 +1,34 @@
+import hmac
+
 from django.conf import settings
 from rest_framework import generics, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from core.acl import policies
+from core.acl.compiled import CompiledAccessPolicy
+from core.acl.helpers import Action, Effect, Principal, make_statement
 from .. import models, serializers
 
 
+class ContentfulWebhookAccess(CompiledAccessPolicy):
+    statements = [
+        make_statement(
+            principal=Principal.Any,
+            action=Action.Any,
+            effect=Effect.Allow,
+            condition=["is_request_from_contentful"],
+        )
+    ]
+
+    def is_request_from_contentful(self, request, view, action) -> bool:
+        # Set as a custom header of the webhook in Contentful; without a configured secret every request is refused
+        secret = settings.CONTENTFUL_WEBHOOK_SECRET
+        return bool(secret) and hmac.compare_digest(request.headers.get("X-Contentful-Webhook-Secret", ""), secret)
+
+
 class ContentfulWebhook(generics.CreateAPIView):
-    permission_classes = (policies.AnyoneFullAccess,)
+    permission_classes = (ContentfulWebhookAccess,)
     serializer_class = serializers.ContentfulWebhookSerializer
 
 
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from tasks.content_tasks import sync_content
+
+
+class Command(BaseCommand):
+    help = "Synchronize content items with the entries changed in Contentful since the last sync"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full", action="store_true", help="Resynchronize every entry and unpublish the items missing from it"
+        )
+
+    def handle(self, *args, **options):
+        result = sync_content(full=options["full"])
+        self.stdout.write(str(result))
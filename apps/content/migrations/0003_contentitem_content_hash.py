@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentitem',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.10 on 2026-10-18 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_contentitem_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentfulSyncState',
+            fields=[
+                ('id', models.CharField(max_length=128, primary_key=True, serialize=False)),
+                ('sync_token', models.TextField(blank=True)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
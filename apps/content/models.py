@@ -31,6 +31,8 @@ class ContentItem(models.Model):
 
     fields = models.JSONField(default=dict)
     is_published = models.BooleanField(default=True, db_index=True)
+    # Hash of the synced content type and fields, an entry whose hash did not change is not written again
+    content_hash = models.CharField(max_length=64, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -50,6 +52,17 @@ class ContentItem(models.Model):
         return self.fields.get("title", str(self.id))
 
 
+class ContentfulSyncState(models.Model):
+    """Sync token of the last content sync from a Contentful space and environment, the next sync continues from it."""
+
+    id = models.CharField(max_length=128, primary_key=True)
+    sync_token = models.TextField(blank=True)
+    synced_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.id
+
+
 class Document(models.Model):
     """User-uploaded document."""
 
@@ -1,13 +1,37 @@
 from django.conf import settings
 from rest_framework import serializers
 
-from . import models, tasks
+from . import models
 
 
 class ContentfulWebhookSerializer(serializers.Serializer):
-    def create(self, obj):
-        sync_task = tasks.ContentfulSync("complete")
-        sync_task.apply()
+    """
+    Payload of a Contentful webhook. The event is the last part of the `X-Contentful-Topic` header (e.g.
+    `ContentManagement.Entry.publish`) and the entry is `sys.id`; only publish, unpublish and delete events of entries
+    change delivered content, the others are ignored. The event only names the entry to resynchronize, its content is
+    fetched from Contentful.
+    """
+
+    ENTRY_EVENTS = ("publish", "unpublish", "delete")
+
+    sys = serializers.DictField(write_only=True)
+
+    def validate(self, attrs):
+        topic = self.context["request"].headers.get("X-Contentful-Topic", "")
+        *_, entity, event = ["", "", *topic.split(".")]
+        entry_id = attrs["sys"].get("id")
+        if entity == "Entry" and event in self.ENTRY_EVENTS and not entry_id:
+            raise serializers.ValidationError({"sys": "Entry id is missing"})
+        content_type = attrs["sys"].get("contentType", {}).get("sys", {}).get("id")
+        return {"entity": entity, "event": event, "entry_id": entry_id, "content_type": content_type}
+
+    def create(self, validated_data):
+        from tasks.content_tasks import apply_contentful_event
+
+        if validated_data["entity"] == "Entry" and validated_data["event"] in self.ENTRY_EVENTS:
+            apply_contentful_event.delay(
+                validated_data["entry_id"], validated_data["event"], validated_data["content_type"]
+            )
         return {}
 
 
@@ -86,7 +110,7 @@ class DocumentUploadSerializer(serializers.ModelSerializer):
         # Trigger async processing
         from tasks.content_tasks import process_uploaded_document
 
-        process_uploaded_document.delay(document.id)
+        process_uploaded_document.delay(str(document.id))
         return document
 
 
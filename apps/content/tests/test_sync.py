@@ -0,0 +1,286 @@
+import pytest
+
+from integrations.services.contentful_service import ContentfulService
+
+from ..models import ContentfulSyncState, ContentItem
+from ..sync import sync_contentful, sync_entries, sync_entry_ids
+
+pytestmark = pytest.mark.django_db
+
+
+def make_entry(entry_id, title, content_type="article"):
+    return {"id": entry_id, "content_type": content_type, "fields": {"title": title}}
+
+
+class TestSyncEntries:
+    def test_creates_items(self):
+        result = sync_entries([make_entry("a", "First item"), make_entry("b", "Second")])
+
+        assert result.as_dict() == {"synced_count": 2, "written_count": 2, "unpublished_count": 0}
+        item = ContentItem.objects.get(external_id="a")
+        assert item.slug == "first-item"
+        assert item.fields == {"title": "First item"}
+        assert item.is_published
+        assert item.content_hash
+
+    def test_writes_only_changed_entries(self):
+        sync_entries([make_entry("a", "First"), make_entry("b", "Second")])
+        unchanged = ContentItem.objects.get(external_id="a")
+
+        result = sync_entries([make_entry("a", "First"), make_entry("b", "Second, edited")], chunk_size=10)
+
+        assert result.written_count == 1
+        assert ContentItem.objects.get(external_id="b").fields == {"title": "Second, edited"}
+        assert ContentItem.objects.get(external_id="a").updated_at == unchanged.updated_at
+
+    def test_keeps_slug_of_existing_items(self):
+        sync_entries([make_entry("a", "First")])
+
+        sync_entries([make_entry("a", "Renamed")])
+
+        assert ContentItem.objects.get(external_id="a").slug == "first"
+
+    def test_unpublishes_missing_entries_and_republishes_returning_ones(self):
+        sync_entries([make_entry("a", "First"), make_entry("b", "Second")])
+
+        result = sync_entries([make_entry("a", "First")])
+
+        assert result.unpublished_count == 1
+        assert not ContentItem.objects.get(external_id="b").is_published
+
+        result = sync_entries([make_entry("a", "First"), make_entry("b", "Second")])
+
+        assert result.as_dict() == {"synced_count": 2, "written_count": 1, "unpublished_count": 0}
+        assert ContentItem.objects.get(external_id="b").is_published
+
+    def test_consumes_generators_chunk_by_chunk(self, mocker):
+        upsert_entries = mocker.patch("content.sync.upsert_entries", return_value=2)
+        consumed = []
+
+        def entries():
+            for index in range(5):
+                consumed.append(index)
+                yield make_entry(str(index), f"Item {index}")
+
+        result = sync_entries(entries(), chunk_size=2)
+
+        assert [len(call.args[0]) for call in upsert_entries.call_args_list] == [2, 2, 1]
+        assert result.synced_count == 5
+        assert len(consumed) == 5
+
+    def test_queries_are_bounded_per_chunk(self, django_assert_max_num_queries):
+        entries = [make_entry(str(index), f"Item {index}") for index in range(10)]
+
+        # One SELECT and one upsert per chunk, the published ids, and the savepoint around the sync
+        with django_assert_max_num_queries(5 * 2 + 1 + 2):
+            sync_entries(entries, chunk_size=2)
+
+
+class FakeContentful:
+    """Sync API of an in-memory Contentful space, serving two items per page."""
+
+    page_size = 2
+
+    def __init__(self):
+        self.entries = {}
+        self.events = []
+        self.requests = []
+
+    def publish(self, entry_id, title):
+        self.entries[entry_id] = {
+            "sys": {"id": entry_id, "type": "Entry", "contentType": {"sys": {"id": "article"}}},
+            "fields": {"title": {"en-US": title, "de-DE": f"{title} (de)"}},
+        }
+        self.events.append(entry_id)
+
+    def delete(self, entry_id):
+        del self.entries[entry_id]
+        self.events.append(entry_id)
+
+    def get_page(self, params):
+        self.requests.append(params)
+        if "initial" in params:
+            since, offset = "initial", 0
+        else:
+            since, offset = params["sync_token"].split(":")
+            offset = int(offset)
+
+        if since == "initial":
+            items = list(self.entries.values())
+        else:
+            changed = dict.fromkeys(self.events[int(since) :])
+            items = [
+                self.entries.get(entry_id, {"sys": {"id": entry_id, "type": "DeletedEntry"}}) for entry_id in changed
+            ]
+
+        page = {"items": items[offset : offset + self.page_size]}
+        if offset + self.page_size < len(items):
+            page["nextPageUrl"] = f"https://cdn.test/sync?sync_token={since}:{offset + self.page_size}"
+        else:
+            page["nextSyncUrl"] = f"https://cdn.test/sync?sync_token={len(self.events)}:0"
+        return page
+
+    def get_entries(self, entry_ids):
+        self.requests.append({"sys.id[in]": ",".join(entry_ids)})
+        return {"items": [self.entries[entry_id] for entry_id in entry_ids if entry_id in self.entries]}
+
+
+@pytest.fixture
+def contentful(mocker, settings):
+    # The SDK client, unused by the Sync API, fetches the content types when it is created
+    mocker.patch("contentful.Client")
+    settings.CONTENTFUL_SPACE_ID = "space"
+    settings.CONTENTFUL_ACCESS_TOKEN = "token"
+    return FakeContentful()
+
+
+class TestSyncContentful:
+    @pytest.fixture
+    def sync(self, contentful):
+        return lambda **kwargs: sync_contentful(ContentfulService(sync_client=contentful), chunk_size=2, **kwargs)
+
+    def test_initial_sync_stores_sync_token(self, contentful, sync):
+        for index in range(3):
+            contentful.publish(str(index), f"Item {index}")
+
+        result = sync()
+
+        assert result.as_dict() == {"synced_count": 3, "written_count": 3, "unpublished_count": 0}
+        assert contentful.requests[0] == {"initial": "true", "type": "Entry"}
+        assert ContentItem.objects.get(external_id="1").fields == {"title": "Item 1"}
+        assert ContentfulSyncState.objects.get(id="space/master").sync_token == "3:0"
+
+    def test_applies_only_changes_since_last_sync(self, contentful, sync):
+        for index in range(3):
+            contentful.publish(str(index), f"Item {index}")
+        sync()
+        contentful.requests.clear()
+
+        contentful.publish("1", "Item 1, edited")
+        contentful.publish("3", "Item 3")
+        contentful.delete("0")
+        result = sync()
+
+        assert contentful.requests == [{"sync_token": "3:0"}, {"sync_token": "3:2"}]
+        assert result.as_dict() == {"synced_count": 2, "written_count": 2, "unpublished_count": 1}
+        assert ContentItem.objects.get(external_id="1").fields == {"title": "Item 1, edited"}
+        assert ContentItem.objects.get(external_id="3").is_published
+        assert not ContentItem.objects.get(external_id="0").is_published
+        assert ContentItem.objects.get(external_id="2").is_published
+
+    def test_full_resync_unpublishes_missing_items(self, contentful, sync):
+        contentful.publish("a", "First")
+        sync()
+        ContentItem.objects.create(external_id="stale", content_type="article", fields={"title": "Stale"})
+
+        result = sync(full=True)
+
+        assert contentful.requests[-1] == {"initial": "true", "type": "Entry"}
+        assert result.as_dict() == {"synced_count": 1, "written_count": 0, "unpublished_count": 1}
+        assert not ContentItem.objects.get(external_id="stale").is_published
+
+    def test_writes_pages_while_fetching_the_next_ones(self, mocker, contentful, sync):
+        for index in range(10):
+            contentful.publish(str(index), f"Item {index}")
+        requested_pages = []
+        mocker.patch(
+            "content.sync.upsert_entries",
+            side_effect=lambda entries: requested_pages.append(len(contentful.requests)) or len(entries),
+        )
+
+        result = sync()
+
+        # The current page, the prefetched one and the one waiting for room
+        assert requested_pages[0] <= 3
+        assert len(contentful.requests) == 5
+        assert result.synced_count == 10
+
+    def test_failed_sync_keeps_sync_token(self, mocker, contentful, sync):
+        contentful.publish("a", "First")
+        sync()
+        contentful.publish("b", "Second")
+        mocker.patch.object(contentful, "get_page", side_effect=OSError("Connection reset"))
+
+        with pytest.raises(OSError):
+            sync()
+
+        assert ContentfulSyncState.objects.get(id="space/master").sync_token == "1:0"
+        assert not ContentItem.objects.filter(external_id="b").exists()
+
+
+class TestSyncEntryIds:
+    @pytest.fixture
+    def sync_ids(self, contentful):
+        return lambda entry_ids: sync_entry_ids(ContentfulService(sync_client=contentful), entry_ids)
+
+    def test_fetches_entries_together(self, contentful, sync_ids):
+        contentful.publish("a", "First")
+        contentful.publish("b", "Second")
+
+        result = sync_ids(["a", "b", "a"])
+
+        assert contentful.requests == [{"sys.id[in]": "a,b"}]
+        assert result.as_dict() == {"synced_count": 2, "written_count": 2, "unpublished_count": 0}
+        assert ContentItem.objects.get(external_id="b").fields == {"title": "Second"}
+
+    def test_unpublishes_entries_no_longer_delivered(self, contentful, sync_ids):
+        contentful.publish("a", "First")
+        contentful.publish("b", "Second")
+        sync_ids(["a", "b"])
+        contentful.delete("a")
+
+        result = sync_ids(["a", "b"])
+
+        assert result.unpublished_count == 1
+        assert not ContentItem.objects.get(external_id="a").is_published
+        assert ContentItem.objects.get(external_id="b").is_published
+
+
+class TestApplyContentfulEvent:
+    @pytest.fixture
+    def apply_contentful_event(self, mocker, contentful, settings):
+        from tasks.content_tasks import apply_contentful_event
+
+        settings.REDIS_CONNECTION = None
+        mocker.patch.object(apply_contentful_event, "flush_task")
+        # The client class of CONTENTFUL_SYNC_CLIENT
+        mocker.patch("integrations.services.contentful_service.import_string", return_value=lambda **kwargs: contentful)
+        return apply_contentful_event
+
+    @pytest.fixture
+    def contentful_sync_lambda(self, mocker):
+        return mocker.patch("content.tasks.ContentfulSync")
+
+    def test_debounces_bursts_of_events(self, apply_contentful_event, contentful, contentful_sync_lambda):
+        contentful.publish("a", "First")
+
+        for _ in range(3):
+            apply_contentful_event.delay("a", "publish", "article")
+        apply_contentful_event.delay(entry_id="b", event="delete", content_type="article")
+        apply_contentful_event.flush()
+
+        apply_contentful_event.flush_task.apply_async.assert_called_once_with(countdown=2)
+        assert contentful.requests == [{"sys.id[in]": "a,b"}]
+        assert ContentItem.objects.get(external_id="a").is_published
+        contentful_sync_lambda.assert_not_called()
+
+    def test_ignores_unverified_deletions(self, apply_contentful_event, contentful, contentful_sync_lambda):
+        contentful.publish("a", "First")
+        apply_contentful_event.delay("a", "publish", "article")
+        apply_contentful_event.flush()
+
+        apply_contentful_event.delay("a", "delete", "article")
+        apply_contentful_event.flush()
+
+        assert ContentItem.objects.get(external_id="a").is_published
+
+    @pytest.mark.parametrize("content_type", ["demoItem", None])
+    def test_triggers_lambda_sync_of_contentful_models(
+        self, apply_contentful_event, contentful_sync_lambda, content_type
+    ):
+        apply_contentful_event.delay("a", "publish", content_type)
+        apply_contentful_event.delay("b", "publish", content_type)
+        apply_contentful_event.flush()
+
+        contentful_sync_lambda.assert_called_once_with("complete")
+        contentful_sync_lambda.return_value.apply.assert_called_once_with()
@@ -0,0 +1,81 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ..api.views import ContentfulWebhook
+from ..serializers import ContentfulWebhookSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+def handle_webhook(topic, payload):
+    request = Request(APIRequestFactory().post("/", HTTP_X_CONTENTFUL_TOPIC=topic))
+    serializer = ContentfulWebhookSerializer(data=payload, context={"request": request})
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+    return serializer
+
+
+class TestContentfulWebhookSerializer:
+    @pytest.fixture
+    def apply_contentful_event(self, mocker):
+        return mocker.patch("tasks.content_tasks.apply_contentful_event")
+
+    @pytest.mark.parametrize("event", ["publish", "unpublish", "delete"])
+    def test_applies_entry_events(self, apply_contentful_event, event):
+        handle_webhook(
+            f"ContentManagement.Entry.{event}",
+            {"sys": {"id": "entry-id", "type": "Entry", "contentType": {"sys": {"id": "article"}}}},
+        )
+
+        apply_contentful_event.delay.assert_called_once_with("entry-id", event, "article")
+
+    @pytest.mark.parametrize("topic", ["ContentManagement.Entry.auto_save", "ContentManagement.Asset.publish", ""])
+    def test_ignores_other_events(self, apply_contentful_event, topic):
+        handle_webhook(topic, {"sys": {"id": "entity-id"}})
+
+        apply_contentful_event.delay.assert_not_called()
+
+    def test_rejects_entry_events_without_id(self, apply_contentful_event):
+        request = Request(APIRequestFactory().post("/", HTTP_X_CONTENTFUL_TOPIC="ContentManagement.Entry.publish"))
+        serializer = ContentfulWebhookSerializer(data={"sys": {}}, context={"request": request})
+
+        assert not serializer.is_valid()
+        assert "sys" in serializer.errors
+
+
+class TestContentfulWebhook:
+    @pytest.fixture
+    def apply_contentful_event(self, mocker, settings):
+        settings.CONTENTFUL_WEBHOOK_SECRET = "webhook-secret"
+        return mocker.patch("tasks.content_tasks.apply_contentful_event")
+
+    def post(self, **headers):
+        request = APIRequestFactory().post(
+            "/",
+            {"sys": {"id": "entry-id"}},
+            format="json",
+            HTTP_X_CONTENTFUL_TOPIC="ContentManagement.Entry.delete",
+            **headers,
+        )
+        return ContentfulWebhook.as_view()(request)
+
+    def test_accepts_requests_with_the_secret(self, apply_contentful_event):
+        response = self.post(HTTP_X_CONTENTFUL_WEBHOOK_SECRET="webhook-secret")
+
+        assert response.status_code == 201
+        apply_contentful_event.delay.assert_called_once_with("entry-id", "delete", None)
+
+    @pytest.mark.parametrize("headers", [{}, {"HTTP_X_CONTENTFUL_WEBHOOK_SECRET": "guessed"}])
+    def test_refuses_other_requests(self, apply_contentful_event, headers):
+        response = self.post(**headers)
+
+        assert response.status_code in (401, 403)
+        apply_contentful_event.delay.assert_not_called()
+
+    def test_refuses_every_request_without_a_configured_secret(self, apply_contentful_event, settings):
+        settings.CONTENTFUL_WEBHOOK_SECRET = None
+
+        response = self.post(HTTP_X_CONTENTFUL_WEBHOOK_SECRET="")
+
+        assert response.status_code in (401, 403)
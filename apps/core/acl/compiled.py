@@ -0,0 +1,197 @@
+from dataclasses import asdict, dataclass
+
+from rest_access_policy import AccessPolicy, Statement
+from rest_access_policy.access_policy import AccessEnforcement, AnonymousUser
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledPrincipal:
+    any: bool
+    admin: bool
+    staff: bool
+    authenticated: bool
+    anonymous: bool
+    ids: frozenset
+    groups: frozenset
+
+    def matches(self, user, get_group_names) -> bool:
+        if self.any:
+            return True
+        if self.admin and user.is_superuser:
+            return True
+        if self.staff and user.is_staff:
+            return True
+        if self.authenticated and not user.is_anonymous:
+            return True
+        if self.anonymous and user.is_anonymous:
+            return True
+        if self.ids and str(user.pk) in self.ids:
+            return True
+        return bool(self.groups) and not self.groups.isdisjoint(get_group_names())
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class CompiledStatement:
+    index: int
+    allow: bool
+    principal: CompiledPrincipal
+    conditions: tuple
+    condition_expressions: tuple
+    # The statement as the library sees it, used for the condition_expression fallback
+    source: dict
+
+
+def _as_list(value) -> list:
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def compile_statement(index, statement, group_prefix, id_prefix) -> CompiledStatement:
+    if isinstance(statement, Statement):
+        statement = asdict(statement)
+
+    principals = set(_as_list(statement["principal"]))
+    source = {
+        "principal": sorted(principals),
+        "action": _as_list(statement["action"]),
+        "effect": statement.get("effect", "deny"),
+        "condition": _as_list(statement.get("condition")),
+        "condition_expression": _as_list(statement.get("condition_expression")),
+    }
+    principal = CompiledPrincipal(
+        any="*" in principals,
+        admin="admin" in principals,
+        staff="staff" in principals,
+        authenticated="authenticated" in principals,
+        anonymous="anonymous" in principals,
+        ids=frozenset(p.removeprefix(id_prefix) for p in principals if p.startswith(id_prefix)),
+        groups=frozenset(p.removeprefix(group_prefix) for p in principals if p.startswith(group_prefix)),
+    )
+    return CompiledStatement(
+        index=index,
+        allow=source["effect"] == "allow",
+        principal=principal,
+        conditions=tuple(source["condition"]),
+        condition_expressions=tuple(source["condition_expression"]),
+        source=source,
+    )
+
+
+class CompiledPolicy:
+    """
+    Lookup tables for the statements of one access policy class.
+
+    Statements are indexed by every action they name, so the candidates for an (action, HTTP method) pair are a
+    union of a few buckets. The union is memoized, which makes the action match a dict lookup after the first
+    request. Deny statements are ordered first so evaluation can stop at the first matching allow.
+    """
+
+    def __init__(self, statements, group_prefix, id_prefix):
+        self.statements = tuple(
+            compile_statement(index, statement, group_prefix, id_prefix) for index, statement in enumerate(statements)
+        )
+        self.by_action = {}
+        for statement in self.statements:
+            for action in statement.source["action"]:
+                self.by_action.setdefault(action, []).append(statement)
+        self._candidates = {}
+
+    def candidates(self, action, method) -> tuple:
+        key = (action, method)
+        if (candidates := self._candidates.get(key)) is None:
+            buckets = [action, "*", f"<method:{method.lower()}>"]
+            if method in SAFE_METHODS:
+                buckets.append("<safe_methods>")
+            matched = {statement for bucket in buckets for statement in self.by_action.get(bucket, ())}
+            candidates = tuple(sorted(matched, key=lambda statement: (statement.allow, statement.index)))
+            self._candidates[key] = candidates
+        return candidates
+
+
+def get_user_group_names(user) -> frozenset:
+    """
+    Return the names of the user's groups, querying them at most once per user instance.
+
+    Users resolved from a cached snapshot already carry the names, see `iam.services.user_snapshots`; the project's
+    user model serves them from its permission cache.
+    """
+    if user.is_anonymous:
+        return frozenset()
+
+    if hasattr(user, "get_group_names"):
+        return user.get_group_names()
+
+    if (group_names := getattr(user, "_group_names", None)) is None:
+        group_names = frozenset(user.groups.values_list("name", flat=True))
+        user._group_names = group_names
+    return group_names
+
+
+class CompiledAccessPolicy(AccessPolicy):
+    """
+    Drop-in `AccessPolicy` whose statements are compiled into lookup tables once, when the class is created.
+
+    Group principals are resolved with a single query per user instance and condition results are memoized on the
+    request, so stacking several policies on a view does not repeat either. Policies that build their statements
+    per request by overriding `get_policy_statements` fall back to the library's interpreter.
+    """
+
+    compiled_policy: CompiledPolicy | None = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.get_policy_statements is AccessPolicy.get_policy_statements:
+            cls.compiled_policy = CompiledPolicy(cls.statements, cls.group_prefix, cls.id_prefix)
+        else:
+            cls.compiled_policy = None
+
+    def has_permission(self, request, view) -> bool:
+        if self.compiled_policy is None:
+            return super().has_permission(request, view)
+
+        if not self.compiled_policy.statements:
+            return False
+
+        action = self._get_invoked_action(view)
+        allowed = self._evaluate_compiled(request, view, action)
+        request.access_enforcement = AccessEnforcement(action=action, allowed=allowed)
+        return allowed
+
+    def get_user_group_values(self, user):
+        return get_user_group_names(user)
+
+    def _evaluate_compiled(self, request, view, action) -> bool:
+        user = request.user or AnonymousUser()
+
+        for statement in self.compiled_policy.candidates(action, request.method):
+            if not statement.principal.matches(user, lambda: self.get_user_group_values(user)):
+                continue
+            if not all(self._check_condition(condition, request, view, action) for condition in statement.conditions):
+                continue
+            if statement.condition_expressions and not self._get_statements_matching_conditions(
+                request, view, action=action, statements=[statement.source], is_expression=True
+            ):
+                continue
+
+            # Deny statements come first, so the first matching allow cannot be revoked by a later statement
+            return statement.allow
+
+        return False
+
+    def _check_condition(self, condition: str, request, view, action: str):
+        """Memoize condition results for the lifetime of the request."""
+        parts = condition.split(":", 1)
+        method = self._get_condition_method(parts[0])
+        key = (getattr(method, "__func__", method), condition, action)
+
+        try:
+            memo = request._access_policy_conditions
+        except AttributeError:
+            memo = request._access_policy_conditions = {}
+
+        if key not in memo:
+            memo[key] = super()._check_condition(condition, request, view, action)
+        return memo[key]
@@ -1,29 +1,28 @@
-from rest_access_policy import AccessPolicy
-
+from .compiled import CompiledAccessPolicy
 from .helpers import Action, CommonGroups, Effect, Principal, TenantRoles, make_statement
 
 
-class AdminFullAccess(AccessPolicy):
+class AdminFullAccess(CompiledAccessPolicy):
     statements = [make_statement(principal=Principal.group(CommonGroups.Admin), action=Action.Any, effect=Effect.Allow)]
 
 
-class UserFullAccess(AccessPolicy):
+class UserFullAccess(CompiledAccessPolicy):
     statements = [make_statement(principal=Principal.group(CommonGroups.User), action=Action.Any, effect=Effect.Allow)]
 
 
-class IsAnonymousFullAccess(AccessPolicy):
+class IsAnonymousFullAccess(CompiledAccessPolicy):
     statements = [make_statement(principal=Principal.Anonymous, action=Action.Any, effect=Effect.Allow)]
 
 
-class IsAuthenticatedFullAccess(AccessPolicy):
+class IsAuthenticatedFullAccess(CompiledAccessPolicy):
     statements = [make_statement(principal=Principal.Authenticated, action=Action.Any, effect=Effect.Allow)]
 
 
-class AnyoneFullAccess(AccessPolicy):
+class AnyoneFullAccess(CompiledAccessPolicy):
     statements = [make_statement(principal=Principal.Any, action=Action.Any, effect=Effect.Allow)]
 
 
-class TenantDependentAccess(AccessPolicy):
+class TenantDependentAccess(CompiledAccessPolicy):
     def is_request_from_tenant_owner(self, request, view, action) -> bool:
         return request.user_role in TenantRoles.Owner
 
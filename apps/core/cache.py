@@ -0,0 +1,196 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from django.core.cache import cache
+
+MISSING = object()
+
+
+class LocalLRUCache:
+    """
+    Thread-safe, size-bounded in-process cache with a per-entry time to live.
+
+    Used as the first tier in front of the shared (Redis) cache, so that hot keys are served without any network
+    round trip. Entries are evicted in least-recently-used order once `maxsize` is reached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 5):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default=MISSING):
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return default
+
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value, ttl: float | None = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class VersionedCache:
+    """
+    Two-tier cache (per-worker LRU in front of the default Django cache) with versioned scopes.
+
+    Every entry belongs to a scope (for example a tenant id). Each scope has a version counter stored in the shared
+    cache and the version is part of every entry key, so invalidating a scope is a single `incr` no matter how many
+    entries it holds: stale entries are simply never read again and expire on their own.
+
+    The local tier also remembers scope versions for `local_ttl` seconds. Invalidations made in the current process
+    are visible immediately, invalidations made by other workers become visible within `local_ttl` seconds.
+
+    Version keys expire `version_timeout` seconds (twice the entry timeout by default) after they are created, so scopes
+    that are no longer used, e.g. ids taken from a request, do not pile up in the shared cache. A version outlives the
+    entries written right after it; a scope whose version expired starts over from a new version.
+
+    Values are wrapped before they are stored, so `None` is a valid cached value (useful for negative lookups).
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        timeout: int = 300,
+        local_ttl: float = 5,
+        local_maxsize: int = 1024,
+        version_timeout: int | None = None,
+    ):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.version_timeout = version_timeout or 2 * timeout
+        self.local = LocalLRUCache(maxsize=local_maxsize, ttl=local_ttl)
+
+    def _version_key(self, scope) -> str:
+        return f"{self.namespace}:{scope}:version"
+
+    def _entry_key(self, scope, key, version: int) -> str:
+        return f"{self.namespace}:{scope}:{version}:{key}"
+
+    @staticmethod
+    def _initial_version() -> int:
+        # Seeding with the current time (instead of 1) guarantees that a version key evicted from (or expired in) the
+        # shared cache never resurrects entries written under an older version.
+        return time.time_ns() // 1000
+
+    def get_version(self, scope) -> int:
+        version_key = self._version_key(scope)
+        version = self.local.get(version_key)
+        if version is MISSING:
+            version = cache.get(version_key)
+            if version is None:
+                version = self._initial_version()
+                if not cache.add(version_key, version, timeout=self.version_timeout):
+                    version = cache.get(version_key, version)
+            self.local.set(version_key, version)
+        return version
+
+    async def aget_version(self, scope) -> int:
+        version_key = self._version_key(scope)
+        version = self.local.get(version_key)
+        if version is MISSING:
+            version = await cache.aget(version_key)
+            if version is None:
+                version = self._initial_version()
+                if not await cache.aadd(version_key, version, timeout=self.version_timeout):
+                    version = await cache.aget(version_key, version)
+            self.local.set(version_key, version)
+        return version
+
+    def get(self, scope, key, default=MISSING):
+        entry_key = self._entry_key(scope, key, self.get_version(scope))
+        wrapped = self.local.get(entry_key)
+        if wrapped is MISSING:
+            wrapped = cache.get(entry_key)
+            if wrapped is None:
+                return default
+            self.local.set(entry_key, wrapped)
+        return wrapped[0]
+
+    async def aget(self, scope, key, default=MISSING):
+        entry_key = self._entry_key(scope, key, await self.aget_version(scope))
+        wrapped = self.local.get(entry_key)
+        if wrapped is MISSING:
+            wrapped = await cache.aget(entry_key)
+            if wrapped is None:
+                return default
+            self.local.set(entry_key, wrapped)
+        return wrapped[0]
+
+    def set(self, scope, key, value):
+        entry_key = self._entry_key(scope, key, self.get_version(scope))
+        wrapped = (value,)
+        cache.set(entry_key, wrapped, timeout=self.timeout)
+        self.local.set(entry_key, wrapped)
+
+    async def aset(self, scope, key, value):
+        entry_key = self._entry_key(scope, key, await self.aget_version(scope))
+        wrapped = (value,)
+        await cache.aset(entry_key, wrapped, timeout=self.timeout)
+        self.local.set(entry_key, wrapped)
+
+    def get_or_set(self, scope, key, loader: Callable[[], Any]):
+        value = self.get(scope, key)
+        if value is MISSING:
+            value = loader()
+            self.set(scope, key, value)
+        return value
+
+    def invalidate(self, scope):
+        version_key = self._version_key(scope)
+        self.local.delete(version_key)
+        try:
+            version = cache.incr(version_key)
+        except ValueError:
+            version = self._initial_version()
+            cache.set(version_key, version, timeout=self.version_timeout)
+        self.local.set(version_key, version)
+
+    def invalidate_many(self, scopes):
+        """
+        Invalidate several scopes with a single write to the shared cache.
+
+        Each scope gets a new time-seeded version instead of an incremented one, which would take a round trip per
+        scope; like an evicted version key, the new version never matches entries written under an older one.
+        """
+        versions = {}
+        for scope in scopes:
+            version_key = self._version_key(scope)
+            self.local.delete(version_key)
+            versions[version_key] = self._initial_version()
+        if not versions:
+            return
+
+        cache.set_many(versions, timeout=self.version_timeout)
+        for version_key, version in versions.items():
+            self.local.set(version_key, version)
+
+    def clear_local(self):
+        self.local.clear()
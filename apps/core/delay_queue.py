@@ -0,0 +1,93 @@
+import heapq
+import threading
+import time
+
+from .redis import get_redis_connection
+
+# Atomically removes and returns up to ARGV[2] members whose due time is <= ARGV[1]
+POP_DUE_SCRIPT = """
+local members = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #members > 0 then
+    redis.call('ZREM', KEYS[1], unpack(members))
+end
+return members
+"""
+
+
+class DelayQueue:
+    """
+    Time-ordered queue of members that become available at a given due time (a unix timestamp).
+
+    Backed by a Redis sorted set scored by due time, so finding the due members is a range read on the head of the set
+    and never a scan. Popping is atomic, so each member is handed to exactly one consumer. Without Redis the queue is a
+    heap in process memory; cancelled and rescheduled entries are dropped lazily when they reach its head.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._heap = []
+        self._due_at = {}
+        self._lock = threading.Lock()
+
+    @property
+    def key(self) -> str:
+        return f"delay_queue:{self.name}"
+
+    def schedule(self, member: str, due_at: float):
+        """Add a member, or move it to a new due time if it is already queued."""
+        if (redis := get_redis_connection()) is None:
+            with self._lock:
+                self._due_at[member] = due_at
+                heapq.heappush(self._heap, (due_at, member))
+            return
+
+        redis.zadd(self.key, {member: due_at})
+
+    def cancel(self, member: str):
+        if (redis := get_redis_connection()) is None:
+            with self._lock:
+                self._due_at.pop(member, None)
+            return
+
+        redis.zrem(self.key, member)
+
+    def pop_due(self, limit: int, now: float | None = None) -> list[str]:
+        """Remove and return up to `limit` members that are due, earliest first."""
+        now = time.time() if now is None else now
+        if (redis := get_redis_connection()) is None:
+            members = []
+            with self._lock:
+                while self._heap and len(members) < limit:
+                    due_at, member = self._heap[0]
+                    if self._due_at.get(member) != due_at:
+                        heapq.heappop(self._heap)
+                        continue
+                    if due_at > now:
+                        break
+                    heapq.heappop(self._heap)
+                    del self._due_at[member]
+                    members.append(member)
+            return members
+
+        members = redis.eval(POP_DUE_SCRIPT, 1, self.key, now, limit)
+        return [member.decode() if isinstance(member, bytes) else member for member in members]
+
+    def next_due_at(self) -> float | None:
+        """Due time of the earliest queued member, or None when the queue is empty."""
+        if (redis := get_redis_connection()) is None:
+            with self._lock:
+                while self._heap and self._due_at.get(self._heap[0][1]) != self._heap[0][0]:
+                    heapq.heappop(self._heap)
+                return self._heap[0][0] if self._heap else None
+
+        head = redis.zrange(self.key, 0, 0, withscores=True)
+        return head[0][1] if head else None
+
+    def clear(self):
+        if (redis := get_redis_connection()) is None:
+            with self._lock:
+                self._heap.clear()
+                self._due_at.clear()
+            return
+
+        redis.delete(self.key)
@@ -0,0 +1,141 @@
+"""
+Bulk email delivery.
+
+`deliver_messages` sends messages over one backend connection per batch of EMAIL_DELIVERY_BATCH_SIZE messages instead
+of opening and closing a connection for each `.send()`. Failures are tracked per recipient: when a message could not
+be delivered to some of its recipients, only those recipients are retried, up to EMAIL_DELIVERY_MAX_ATTEMPTS attempts,
+on a fresh connection. Recipients refused with a permanent (5xx) SMTP reply are not retried.
+
+Django's SMTP backend drops the recipients a server refused while accepting the others; `SMTPEmailBackend` keeps them on
+the message so they can be retried too.
+"""
+
+import contextlib
+import copy
+import logging
+import smtplib
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.smtp import EmailBackend
+from django.core.mail.message import sanitize_address
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPEmailBackend(EmailBackend):
+    """
+    SMTP backend that records the recipients refused by the server in `message.refused_recipients`, as
+    `{address: (code, reply)}` like `smtplib.SMTPRecipientsRefused.recipients`.
+    """
+
+    def _send(self, email_message):
+        if not email_message.recipients():
+            return False
+        encoding = email_message.encoding or settings.DEFAULT_CHARSET
+        from_email = sanitize_address(email_message.from_email, encoding)
+        recipients = {sanitize_address(address, encoding): address for address in email_message.recipients()}
+        message = email_message.message()
+        try:
+            refused = self.connection.sendmail(from_email, list(recipients), message.as_bytes(linesep="\r\n"))
+        except smtplib.SMTPException:
+            if not self.fail_silently:
+                raise
+            return False
+        email_message.refused_recipients = {
+            recipients.get(address, address): reply for address, reply in refused.items()
+        }
+        return True
+
+
+class EmailDeliveryError(Exception):
+    """A message could not be delivered to some of its recipients; `args[0]` maps them to their last error."""
+
+
+@dataclass
+class DeliveryResult:
+    message: EmailMessage
+    failed_recipients: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def sent(self) -> bool:
+        return not self.failed_recipients
+
+
+def _restrict_recipients(message: EmailMessage, recipients) -> EmailMessage:
+    retry = copy.copy(message)
+    retry.to = [address for address in message.to if address in recipients]
+    retry.cc = [address for address in message.cc if address in recipients]
+    retry.bcc = [address for address in message.bcc if address in recipients]
+    return retry
+
+
+def _refused_errors(refused: dict) -> tuple[dict[str, str], set[str]]:
+    """Errors of refused recipients and the ones worth retrying: 5xx replies are permanent failures."""
+    errors = {}
+    for address, (code, reply) in refused.items():
+        errors[address] = f"{code} {reply.decode(errors='replace') if isinstance(reply, bytes) else reply}"
+    return errors, {address for address, (code, _) in refused.items() if code < 500}
+
+
+def _send_batch(batch: list[tuple[DeliveryResult, EmailMessage]]) -> list[tuple[DeliveryResult, EmailMessage]]:
+    """Send a batch over one connection; returns the messages to retry, restricted to their failed recipients."""
+    failed = []
+    connection = get_connection(fail_silently=False)
+    try:
+        for result, message in batch:
+            message.__dict__.pop("refused_recipients", None)
+            try:
+                # Opening is a no-op while the connection is open
+                connection.open()
+                connection.send_messages([message])
+            except smtplib.SMTPRecipientsRefused as e:
+                errors, retry = _refused_errors(e.recipients)
+            except Exception as e:
+                errors = dict.fromkeys(message.recipients(), str(e) or e.__class__.__name__)
+                retry = set(errors)
+                # The connection may be unusable after a failure, the next message opens a new one
+                with contextlib.suppress(Exception):
+                    connection.close()
+            else:
+                errors, retry = _refused_errors(getattr(message, "refused_recipients", None) or {})
+
+            recipients = set(message.recipients())
+            result.failed_recipients = {
+                address: error for address, error in result.failed_recipients.items() if address not in recipients
+            } | errors
+            if retry:
+                failed.append((result, _restrict_recipients(message, retry)))
+    finally:
+        with contextlib.suppress(Exception):
+            connection.close()
+    return failed
+
+
+def deliver_messages(
+    messages: list[EmailMessage],
+    batch_size: int | None = None,
+    max_attempts: int | None = None,
+    retry_delay: float | None = None,
+) -> list[DeliveryResult]:
+    """Send messages over reused connections; returns one result per message, in order."""
+    batch_size = batch_size or settings.EMAIL_DELIVERY_BATCH_SIZE
+    max_attempts = max_attempts or settings.EMAIL_DELIVERY_MAX_ATTEMPTS
+    retry_delay = settings.EMAIL_DELIVERY_RETRY_DELAY if retry_delay is None else retry_delay
+
+    results = [DeliveryResult(message) for message in messages]
+    pending = list(zip(results, messages))
+    for attempt in range(1, max_attempts + 1):
+        failed = []
+        for start in range(0, len(pending), batch_size):
+            failed.extend(_send_batch(pending[start : start + batch_size]))
+        if not failed:
+            break
+        logger.warning(f"Email delivery attempt {attempt} failed for {len(failed)} messages")
+        pending = failed
+        if attempt < max_attempts:
+            time.sleep(retry_delay * attempt)
+
+    return results
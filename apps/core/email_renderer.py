@@ -0,0 +1,245 @@
+"""
+Pool of long-lived Node email renderer processes.
+
+Starting `node` and loading the renderer bundle costs far more than rendering an email, so the renderer processes
+(`scripts/runtime/email/worker.cjs`) are started once and serve requests over a JSON-lines protocol on stdin/stdout.
+The pool holds at most `size` processes, which is also the number of concurrent renders; a process is checked with a
+ping when it has been idle for `health_check_interval` seconds and replaced when it crashed, stopped answering within
+`timeout` or served `max_renders` requests. `render_many` pipelines a batch of renders over the processes instead of
+waiting for each answer before sending the next request.
+"""
+
+import itertools
+import json
+import os
+import queue
+import select
+import shutil
+import subprocess
+import threading
+import time
+
+from django.conf import settings
+
+WORKER_SCRIPT = "email/worker.cjs"
+
+
+class EmailRenderError(Exception):
+    """The renderer answered a request with an error; the process itself is still healthy."""
+
+
+class EmailRendererCrashed(EmailRenderError):
+    """The renderer process died or did not answer in time and has been stopped."""
+
+
+class EmailRendererProcess:
+    def __init__(self, cwd: str, timeout: float):
+        self.timeout = timeout
+        self.renders = 0
+        self.last_used_at = time.monotonic()
+        self._ids = itertools.count(1)
+        self._buffer = b""
+        self._process = subprocess.Popen(
+            [shutil.which("node") or "node", WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=cwd,
+            # Environmental variables are mapped manually to avoid secret values from being exposed to email renderer
+            # script that is usually maintained by non-backend developers
+            env={
+                "DEBUG": str(settings.DEBUG),
+                "EMAIL_ASSETS_URL": os.environ.get("EMAIL_ASSETS_URL", ""),
+                "WEB_APP_URL": os.environ.get("WEB_APP_URL", ""),
+            },
+        )
+        # Requests are written as the pipe accepts them, interleaved with reading the answers, see `_exchange`
+        os.set_blocking(self._process.stdin.fileno(), False)
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process.poll() is None
+
+    def ping(self) -> bool:
+        try:
+            return self.request_many([{"type": "ping"}])[0] == "pong"
+        except EmailRenderError:
+            return False
+
+    def render_many(self, emails: list[tuple[str, dict]]) -> list:
+        """Rendered emails in the order of `emails`; an `EmailRenderError` instance for each email that failed."""
+        results = self.request_many(
+            [{"type": "render", "emailType": email_type, "emailData": email_data} for email_type, email_data in emails]
+        )
+        self.renders += len(emails)
+        return results
+
+    def request_many(self, requests: list[dict]) -> list:
+        """Pipeline the requests, then read their answers; raises `EmailRendererCrashed` if the process fails."""
+        requests = [{**request, "id": next(self._ids)} for request in requests]
+        deadline = time.monotonic() + self.timeout * len(requests)
+        try:
+            payload = b"".join(json.dumps(request).encode() + b"\n" for request in requests)
+            responses = [json.loads(line) for line in self._exchange(payload, len(requests), deadline)]
+        except (OSError, EOFError, ValueError) as e:
+            self.stop()
+            raise EmailRendererCrashed(f"Email renderer failed: {e}") from e
+        finally:
+            self.last_used_at = time.monotonic()
+
+        results = []
+        for request, response in zip(requests, responses, strict=True):
+            if response.get("id") != request["id"]:
+                self.stop()
+                raise EmailRendererCrashed(f"Email renderer answered request {response.get('id')} for {request['id']}")
+            results.append(EmailRenderError(response["error"]) if "error" in response else response["result"])
+        return results
+
+    def _exchange(self, payload: bytes, count: int, deadline: float) -> list[bytes]:
+        """
+        Write `payload` to the process and read `count` answer lines, both bounded by `deadline`.
+
+        The process answers while it is still being sent requests, so a large batch is written as the pipe accepts it
+        while the answers are read: finishing the write first would deadlock once both pipes are full.
+        """
+        stdin = self._process.stdin.fileno()
+        stdout = self._process.stdout.fileno()
+        lines = []
+        while True:
+            while b"\n" in self._buffer and len(lines) < count:
+                line, self._buffer = self._buffer.split(b"\n", 1)
+                lines.append(line)
+            if len(lines) == count:
+                return lines
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("Email renderer did not answer in time")
+            readable, writable, _ = select.select([stdout], [stdin] if payload else [], [], remaining)
+            if not readable and not writable:
+                raise TimeoutError("Email renderer did not answer in time")
+            if writable:
+                payload = payload[os.write(stdin, payload[:65536]) :]
+            if readable:
+                chunk = os.read(stdout, 65536)
+                if not chunk:
+                    raise EOFError(f"Email renderer exited with code {self._process.wait()}")
+                self._buffer += chunk
+
+    def stop(self):
+        if self.is_alive:
+            self._process.kill()
+        self._process.wait()
+        for pipe in (self._process.stdin, self._process.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+
+class EmailRendererPool:
+    def __init__(self, cwd: str, size: int, timeout: float, health_check_interval: float, max_renders: int):
+        self.cwd = cwd
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.max_renders = max_renders
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._idle = None
+        self._slots = None
+
+    def render(self, email_type: str, email_data: dict) -> dict:
+        (result,) = self.render_many([(email_type, email_data)])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def render_many(self, emails: list[tuple[str, dict]]) -> list:
+        """
+        Render a batch of `(email_type, email_data)` pairs, spread over as many processes as are free; returns the
+        rendered emails in order, with an `EmailRenderError` instance for each email that failed.
+        """
+        if not emails:
+            return []
+        self._ensure_started()
+
+        # Every renderer taking part gets one slice of the batch, pipelined in a single exchange
+        renderers = [self._acquire()]
+        while len(renderers) < min(len(emails), self.size) and (renderer := self._acquire(block=False)):
+            renderers.append(renderer)
+
+        bounds = [len(emails) * index // len(renderers) for index in range(len(renderers) + 1)]
+        chunks = [emails[start:end] for start, end in itertools.pairwise(bounds)]
+        results = [None] * len(chunks)
+
+        def render_chunk(index, renderer):
+            try:
+                results[index] = renderer.render_many(chunks[index])
+            except EmailRendererCrashed as e:
+                results[index] = [e] * len(chunks[index])
+            finally:
+                self._release(renderer)
+
+        threads = [
+            threading.Thread(target=render_chunk, args=(index, renderer), daemon=True)
+            for index, renderer in enumerate(renderers[1:], start=1)
+        ]
+        for thread in threads:
+            thread.start()
+        render_chunk(0, renderers[0])
+        for thread in threads:
+            thread.join()
+
+        return list(itertools.chain.from_iterable(results))
+
+    def _ensure_started(self):
+        # Processes and threads do not survive a fork (e.g. Celery prefork workers), so the pool is set up per process
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Renderers are started on first use, a free slot without a process is represented by None
+            self._idle = queue.LifoQueue()
+            for _ in range(self.size):
+                self._idle.put(None)
+            self._slots = threading.BoundedSemaphore(self.size)
+            self._pid = os.getpid()
+
+    def _acquire(self, block: bool = True) -> EmailRendererProcess | None:
+        if not self._slots.acquire(blocking=block, timeout=self.timeout if block else None):
+            if block:
+                raise EmailRenderError("No email renderer became available in time")
+            return None
+
+        renderer = self._idle.get_nowait()
+        try:
+            return self._check(renderer)
+        except Exception:
+            self._idle.put(None)
+            self._slots.release()
+            raise
+
+    def _check(self, renderer: EmailRendererProcess | None) -> EmailRendererProcess:
+        if renderer is not None and renderer.is_alive and renderer.renders < self.max_renders:
+            if time.monotonic() - renderer.last_used_at < self.health_check_interval or renderer.ping():
+                return renderer
+
+        if renderer is not None:
+            renderer.stop()
+        return EmailRendererProcess(cwd=self.cwd, timeout=self.timeout)
+
+    def _release(self, renderer: EmailRendererProcess):
+        self._idle.put(renderer if renderer.is_alive else None)
+        self._slots.release()
+
+
+email_renderer_pool = EmailRendererPool(
+    cwd=settings.EMAIL_RENDERER_DIR,
+    size=settings.EMAIL_RENDERER_POOL_SIZE,
+    timeout=settings.EMAIL_RENDERER_TIMEOUT,
+    health_check_interval=settings.EMAIL_RENDERER_HEALTH_CHECK_INTERVAL,
+    max_renders=settings.EMAIL_RENDERER_MAX_RENDERS,
+)
@@ -0,0 +1,248 @@
+"""
+Batch rendering of Django email templates.
+
+Compiled templates are cached per (template name, locale). A batch of contexts sharing most of their values is not
+rendered once per recipient: the template is rendered a single time with markers in place of the values that differ
+between recipients, and every email is then assembled from the rendered parts and that recipient's values, escaped and
+localized as `{{ variable }}` would.
+
+This only holds when the differing values are printed as they are, HTML-escaped. Markers record being tested, compared,
+measured, iterated, indexed or converted to a plain string (`{% if %}`, `|default`, `|length`, loops, `|first`, string
+filters...), and print differently when escaped, so that markers printed unescaped (`{% autoescape off %}`, `|safe`)
+are found in the output; either way, or when the first email of the batch does not match its full render, the batch is
+rendered email by email.
+"""
+
+import functools
+import re
+import secrets
+
+from django.conf import settings
+from django.template import Context
+from django.template.base import render_value_in_context
+from django.template.loader import get_template
+from django.utils import translation
+
+
+@functools.lru_cache(maxsize=256)
+def _get_template(template_name: str, locale: str | None):
+    return get_template(template_name)
+
+
+def get_email_template(template_name: str) -> "EmailTemplate":
+    # Edited templates must show up without a restart during development
+    if settings.DEBUG:
+        return EmailTemplate(get_template(template_name))
+    return EmailTemplate(_get_template(template_name, translation.get_language()))
+
+
+class EmailTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def render(self, context: dict) -> str:
+        return self.template.render(context)
+
+    def render_many(self, contexts: list[dict]) -> list[str]:
+        """Render one email per context, rendering the parts shared by all of them once."""
+        if len(contexts) < 2:
+            return [self.render(context) for context in contexts]
+
+        shared_context, recipient_keys = _split_contexts(contexts)
+        skeleton = self._render_skeleton(shared_context, recipient_keys, contexts)
+        if skeleton is None:
+            return [self.render(context) for context in contexts]
+
+        parts, paths = skeleton
+        # Merged values are only ever printed where a marker was escaped
+        value_context = Context(autoescape=True)
+        first = self.render(contexts[0])
+        if _merge(parts, paths, contexts[0], value_context) != first:
+            return [first, *(self.render(context) for context in contexts[1:])]
+
+        return [first, *(_merge(parts, paths, context, value_context) for context in contexts[1:])]
+
+    def _render_skeleton(self, shared_context: dict, recipient_keys: list[str], contexts: list[dict]):
+        token = secrets.token_hex(8)
+        paths = []
+        usage = _MarkerUsage()
+
+        def markers(values, path):
+            # Nested dicts get a marker per leaf, covering the keys of every recipient
+            if all(isinstance(value, dict) for value in values):
+                keys = dict.fromkeys(key for value in values for key in value)
+                return _MarkerDict(
+                    usage, {key: markers([value.get(key) for value in values], (*path, key)) for key in keys}
+                )
+            if any(isinstance(value, dict | list | tuple | set) for value in values):
+                raise TypeError("Only printed values can be merged in")
+            paths.append(path)
+            return _Marker(usage, f"EMAILVAR{token}R{len(paths) - 1}E", f"EMAILVAR{token}N{len(paths) - 1}E")
+
+        try:
+            recipient_context = {
+                key: markers([context.get(key) for context in contexts], (key,)) for key in recipient_keys
+            }
+        except TypeError:
+            return None
+
+        rendered = self.render({**shared_context, **recipient_context})
+        if usage.used:
+            # A tag or filter looked at a marker (e.g. `{% if %}`, `|length`), its outcome may differ per recipient
+            return None
+        parts = re.split(f"EMAILVAR{token}N(\\d+)E", rendered)
+        if any(token in literal.lower() for literal in parts[::2]):
+            # A marker was printed unescaped or transformed by a filter, the values cannot simply be merged in
+            return None
+        return parts, paths
+
+
+class _MarkerUsage:
+    used = False
+
+
+class _Marker(str):
+    """
+    Printed in place of a recipient value; records any other use, which could depend on the actual value. Only the
+    escaped form, printed by `conditional_escape`, is merged. Converting the marker to a plain string (as string
+    filters do), indexing or formatting it is recorded too: a filter such as `|first` or `|truncatechars` would bake
+    a part of the marker into the output, which no longer looks like a marker.
+    """
+
+    def __new__(cls, usage: _MarkerUsage, value: str, escaped: str):
+        marker = super().__new__(cls, value)
+        marker._usage = usage
+        marker._escaped = escaped
+        return marker
+
+    def __html__(self):
+        return self._escaped
+
+    def _record(self):
+        self._usage.used = True
+
+    def __bool__(self):
+        self._record()
+        return True
+
+    def __str__(self):
+        self._record()
+        return super().__str__()
+
+    def __format__(self, format_spec):
+        self._record()
+        return super().__format__(format_spec)
+
+    def __len__(self):
+        self._record()
+        return super().__len__()
+
+    def __iter__(self):
+        self._record()
+        return super().__iter__()
+
+    def __getitem__(self, key):
+        self._record()
+        return super().__getitem__(key)
+
+    def __mod__(self, values):
+        self._record()
+        return super().__mod__(values)
+
+    def format(self, *args, **kwargs):
+        self._record()
+        return super().format(*args, **kwargs)
+
+    def __contains__(self, item):
+        self._record()
+        return super().__contains__(item)
+
+    def __eq__(self, other):
+        self._record()
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        self._record()
+        return super().__ne__(other)
+
+    def __lt__(self, other):
+        self._record()
+        return super().__lt__(other)
+
+    def __gt__(self, other):
+        self._record()
+        return super().__gt__(other)
+
+    __le__ = __lt__
+    __ge__ = __gt__
+    __hash__ = str.__hash__
+
+
+class _MarkerDict(dict):
+    def __init__(self, usage: _MarkerUsage, value: dict):
+        super().__init__(value)
+        self._usage = usage
+
+    def _record(self):
+        self._usage.used = True
+
+    def __bool__(self):
+        self._record()
+        return True
+
+    def __len__(self):
+        self._record()
+        return super().__len__()
+
+    def __iter__(self):
+        self._record()
+        return super().__iter__()
+
+    def __eq__(self, other):
+        self._record()
+        return super().__eq__(other)
+
+    def items(self):
+        self._record()
+        return super().items()
+
+    def keys(self):
+        self._record()
+        return super().keys()
+
+    def values(self):
+        self._record()
+        return super().values()
+
+    __hash__ = None
+
+
+def _split_contexts(contexts: list[dict]) -> tuple[dict, list[str]]:
+    """Values equal in every context, and the keys of those that differ."""
+    first = contexts[0]
+    keys = set().union(*contexts)
+    recipient_keys = sorted(
+        key for key in keys if any(key not in context or context[key] != first.get(key) for context in contexts)
+    )
+    shared_context = {key: first[key] for key in keys - set(recipient_keys)}
+    return shared_context, recipient_keys
+
+
+def _resolve(context: dict, path: tuple):
+    value = context
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return ""
+        value = value[key]
+    return value
+
+
+def _merge(parts: list[str], paths: list[tuple], context: dict, value_context: Context) -> str:
+    merged = []
+    for index, part in enumerate(parts):
+        if index % 2:
+            value = _resolve(context, paths[int(part)])
+            merged.append(render_value_in_context(value, value_context))
+        else:
+            merged.append(part)
+    return "".join(merged)
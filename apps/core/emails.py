@@ -1,12 +1,11 @@
-import json
-import os
-import subprocess
-
-from celery import shared_task, states
-from celery.exceptions import Ignore
 from django.conf import settings
 from django.core.mail import EmailMessage
 
+from tasks.batching import BatchItem, batched_task
+
+from .email_delivery import EmailDeliveryError, deliver_messages
+from .email_renderer import EmailRenderError, email_renderer_pool
+
 
 class BaseEmail:
     """Base class for all email types."""
@@ -48,58 +47,45 @@ class Email(BaseEmail):
             send_data = serializer.data
 
         # TODO: Handle due_date
-        send_email.apply_async((self.to, self.name, send_data))
-
-
-@shared_task(bind=True)
-def send_email(self, to: str | list[str], email_type: str, email_data: dict):
-    render_script = '''
-    const { renderEmail } = require('./email');
-    console.log(JSON.stringify(renderEmail('%s', %s)));
-    process.exit(0);
-    ''' % (
-        email_type,
-        json.dumps(email_data),
-    )
-
-    try:
-        node_process = subprocess.run(
-            ["node"],
-            shell=True,
-            input=bytes(render_script, 'utf-8'),
-            capture_output=True,
-            check=True,
-            cwd='/app/scripts/runtime',
-            # Environmental variables are mapped manually to avoid secret values from being exposed to email renderer
-            # script that is usually maintained by non-backend developers
-            env={
-                'DEBUG': str(settings.DEBUG),
-                'EMAIL_ASSETS_URL': os.environ.get('EMAIL_ASSETS_URL', ''),
-                'WEB_APP_URL': os.environ.get('WEB_APP_URL', ''),
-            },
-        )
-    except subprocess.CalledProcessError as e:
-        self.update_state(
-            state=states.FAILURE,
-            meta={
-                'return_code': e.returncode,
-                'cmd': e.cmd,
-                'output': e.output,
-                'stderr': e.stderr,
-            },
+        send_email.delay(self.to, self.name, send_data)
+
+
+@batched_task()
+def send_email(items: list[BatchItem]) -> list:
+    """
+    Render and send emails; called as `send_email.delay(to, email_type, email_data)`.
+
+    The emails of a batch are rendered in one pipelined exchange with the renderer pool and delivered over reused
+    backend connections.
+    """
+    calls = [_send_email_arguments(*item.args, **item.kwargs) for item in items]
+    rendered_emails = email_renderer_pool.render_many([(email_type, email_data) for _, email_type, email_data in calls])
+
+    results = [None] * len(items)
+    messages = {}
+    for index, ((to, _, _), rendered_email) in enumerate(zip(calls, rendered_emails, strict=True)):
+        if isinstance(rendered_email, EmailRenderError):
+            results[index] = rendered_email
+            continue
+
+        if isinstance(to, str):
+            to = (to,)
+
+        email = EmailMessage(
+            rendered_email['subject'],
+            rendered_email['html'],
+            settings.EMAIL_FROM_ADDRESS,
+            to,
+            reply_to=settings.EMAIL_REPLY_ADDRESS,
         )
-        raise Ignore()
-
-    if isinstance(to, str):
-        to = (to,)
-
-    rendered_email = json.loads(node_process.stdout)
-    email = EmailMessage(
-        rendered_email['subject'],
-        rendered_email['html'],
-        settings.EMAIL_FROM_ADDRESS,
-        to,
-        reply_to=settings.EMAIL_REPLY_ADDRESS,
-    )
-    email.content_subtype = 'html'
-    return {'sent_emails_count': email.send()}
+        email.content_subtype = 'html'
+        messages[index] = email
+
+    for index, delivery in zip(messages, deliver_messages(list(messages.values())), strict=True):
+        results[index] = {'sent_emails_count': 1} if delivery.sent else EmailDeliveryError(delivery.failed_recipients)
+
+    return results
+
+
+def _send_email_arguments(to: str | list[str], email_type: str, email_data: dict):
+    return to, email_type, email_data
@@ -0,0 +1,221 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHECK_CACHE_KEY = "core:health_check"
+
+
+# Connection of the database probe in the current process, see `check_database`
+_database_connection = None
+
+
+def get_database_connection():
+    global _database_connection
+
+    # A connection inherited through a fork is shared with the parent process, it must not be used
+    if _database_connection is None or _database_connection[0] != os.getpid():
+        connection = connections.create_connection(DEFAULT_DB_ALIAS)
+        # Probes run on any thread of the executor, one at a time
+        connection.inc_thread_sharing()
+        _database_connection = (os.getpid(), connection)
+    return _database_connection[1]
+
+
+def check_database():
+    """Runs every couple of seconds, so it keeps its own connection open instead of connecting each time."""
+    connection = get_database_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except Exception:
+        # Reconnects on the next round
+        connection.close()
+        raise
+
+
+def check_cache():
+    value = str(time.monotonic_ns())
+    cache.set(HEALTH_CHECK_CACHE_KEY, value, timeout=30)
+    if cache.get(HEALTH_CHECK_CACHE_KEY) != value:
+        raise RuntimeError("Cache did not return the written value")
+
+
+def check_channel_layer():
+    from channels.layers import get_channel_layer
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    async def round_trip():
+        channel = await channel_layer.new_channel()
+        await channel_layer.send(channel, {"type": "health.check"})
+        await channel_layer.receive(channel)
+
+    async_to_sync(round_trip)()
+
+
+def check_migrations():
+    connection = connections[DEFAULT_DB_ALIAS]
+    try:
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    finally:
+        connection.close()
+
+    if plan:
+        raise RuntimeError(f"{len(plan)} unapplied migration(s)")
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    ok: bool
+    error: str = ""
+
+
+@dataclass(frozen=True)
+class ReadinessSnapshot:
+    checks: dict[str, ProbeResult]
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.checks) and all(result.ok for result in self.checks.values())
+
+    def as_dict(self) -> dict:
+        return {
+            "status": "ok" if self.ready else "unavailable",
+            "checks": {name: {"ok": result.ok, "error": result.error} for name, result in self.checks.items()},
+        }
+
+
+class ReadinessMonitor:
+    """
+    Keeps a readiness snapshot fresh from a background thread, so a readiness probe only reads memory.
+
+    Dependency probes (database, cache, channel layer) run in parallel every `interval` seconds and each one is
+    bounded by `timeout`; a probe that is still running from a previous round is reported as timed out instead of
+    being queued again. Loading the migration graph is expensive, so the migration state is refreshed on its own,
+    slower `migrations_interval` schedule.
+
+    The first snapshot of a process is taken synchronously when the monitor starts, so that the first readiness probe
+    does not report a process as unavailable just because nothing ran yet. It waits for the migration check for at most
+    `timeout` seconds too; a slower check is reported as pending until a later round collects it.
+    """
+
+    probes = {
+        "database": check_database,
+        "cache": check_cache,
+        "channel_layer": check_channel_layer,
+    }
+
+    def __init__(self, interval: float, timeout: float, migrations_interval: float):
+        self.interval = interval
+        self.timeout = timeout
+        self.migrations_interval = migrations_interval
+
+        self.snapshot = ReadinessSnapshot(checks={})
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+        self._pending = {}
+        self._migrations = None
+        self._migrations_checked_at = None
+
+    def ensure_started(self):
+        # Threads do not survive a fork (e.g. gunicorn --preload), so the monitor is started lazily per process
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._executor = ThreadPoolExecutor(
+                max_workers=len(self.probes) + 1, thread_name_prefix="readiness-probe"
+            )
+            self._pending = {}
+            self._migrations = None
+            self._migrations_checked_at = None
+            self.snapshot = ReadinessSnapshot(checks={})
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Readiness refresh failed: {e}")
+            threading.Thread(target=self._run, name="readiness-monitor", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Readiness refresh failed: {e}")
+
+    def _submit(self, name, probe):
+        future = self._pending.get(name)
+        if future is not None and not future.done():
+            return future
+        future = self._executor.submit(probe)
+        self._pending[name] = future
+        return future
+
+    @staticmethod
+    def _result(future) -> ProbeResult:
+        if not future.done():
+            return ProbeResult(ok=False, error="timeout")
+        if (error := future.exception()) is not None:
+            return ProbeResult(ok=False, error=str(error) or error.__class__.__name__)
+        return ProbeResult(ok=True)
+
+    def _collect_migrations(self):
+        future = self._pending.get("migrations")
+        if future is not None and future.done():
+            del self._pending["migrations"]
+            self._migrations = self._result(future)
+            self._migrations_checked_at = time.monotonic()
+
+    def _schedule_migrations(self):
+        self._collect_migrations()
+        if "migrations" in self._pending:
+            return self._pending["migrations"]
+
+        due = (
+            self._migrations is None
+            or not self._migrations.ok
+            or time.monotonic() - self._migrations_checked_at >= self.migrations_interval
+        )
+        if due:
+            return self._submit("migrations", check_migrations)
+        return None
+
+    def refresh(self):
+        migrations_future = self._schedule_migrations()
+        futures = {name: self._submit(name, probe) for name, probe in self.probes.items()}
+
+        wait([*futures.values(), *filter(None, [migrations_future])], timeout=self.timeout)
+
+        checks = {name: self._result(future) for name, future in futures.items()}
+        # A slow migration graph load is not a failure, the previous state is kept until it finishes
+        self._collect_migrations()
+        checks["migrations"] = self._migrations or ProbeResult(ok=False, error="pending")
+
+        self.snapshot = ReadinessSnapshot(checks=checks)
+
+
+readiness_monitor = ReadinessMonitor(
+    interval=settings.HEALTH_CHECK_INTERVAL,
+    timeout=settings.HEALTH_CHECK_PROBE_TIMEOUT,
+    migrations_interval=settings.HEALTH_CHECK_MIGRATIONS_INTERVAL,
+)
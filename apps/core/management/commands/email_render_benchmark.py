@@ -0,0 +1,80 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.template.loader import render_to_string
+
+from ...email_templates import EmailTemplate, get_email_template
+
+# Stands in for a real email layout: a long shared body with a few per-recipient values
+SAMPLE_TEMPLATE = """
+{% load i18n %}<!DOCTYPE html>
+<html lang="en">
+  <body>
+    <h1>{% blocktranslate %}Hello{% endblocktranslate %} {{ user.first_name }},</h1>
+    <p>{% translate "Here is what is new in" %} {{ product }}.</p>
+    {% for section in sections %}
+      <h2>{{ section.title|title }}</h2>
+      {% for paragraph in section.paragraphs %}<p>{{ paragraph|linebreaksbr }}</p>{% endfor %}
+    {% endfor %}
+    <p>{% translate "This email was sent to" %} {{ user.email }}.</p>
+  </body>
+</html>
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark email rendering: one render_to_string per recipient, one render per recipient of a cached template "
+        "and batch rendering, which renders the parts shared by all recipients once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--template", help="Email template name, defaults to a built-in sample layout")
+        parser.add_argument("--context", default="{}", help="JSON context shared by all recipients")
+        parser.add_argument("--recipients", type=int, default=1000, help="Emails rendered per round")
+        parser.add_argument("--rounds", type=int, default=3)
+
+    def handle(self, *args, **options):
+        shared_context = json.loads(options["context"])
+        if options["template"]:
+            template_name = options["template"]
+            template = get_email_template(template_name)
+        else:
+            template_name = None
+            template = EmailTemplate(engines["django"].from_string(SAMPLE_TEMPLATE))
+            shared_context = {
+                "product": "Django Template",
+                "sections": [
+                    {"title": f"section {index}", "paragraphs": ["Lorem ipsum dolor sit amet.\nConsectetur."] * 5}
+                    for index in range(10)
+                ],
+                **shared_context,
+            }
+
+        contexts = [
+            {**shared_context, "user": {"email": f"user{index}@example.org", "first_name": f"User <{index}>"}}
+            for index in range(options["recipients"])
+        ]
+
+        def render_each():
+            if template_name:
+                return [render_to_string(template_name, context) for context in contexts]
+            return [template.render(context) for context in contexts]
+
+        benchmarks = {
+            "render_to_string" if template_name else "render per recipient": render_each,
+            "batch render": lambda: template.render_many(contexts),
+        }
+
+        expected = render_each()
+        if template.render_many(contexts) != expected:
+            self.stdout.write(self.style.WARNING("Batch rendering differs from rendering each email"))
+
+        for round_number in range(1, options["rounds"] + 1):
+            for name, benchmark in benchmarks.items():
+                started = time.perf_counter()
+                benchmark()
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"Round {round_number}: {name}: {len(contexts) / elapsed:.0f} renders/s")
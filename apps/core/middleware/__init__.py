@@ -1,8 +1,10 @@
+from .channel_layer_publisher import ChannelLayerPublisherMiddleware
 from .health_check import HealthCheckMiddleware
 from .manage_cookies import ManageCookiesMiddleware
 from .set_auth_token_cookie import SetAuthTokenCookieMiddleware
 
 __all__ = [
+    "ChannelLayerPublisherMiddleware",
     "HealthCheckMiddleware",
     "ManageCookiesMiddleware",
     "SetAuthTokenCookieMiddleware",
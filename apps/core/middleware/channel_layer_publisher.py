@@ -0,0 +1,12 @@
+from ..publisher import channel_layer_publisher
+
+
+class ChannelLayerPublisherMiddleware:
+    """Send the channel layer messages committed while handling a request as one batch, once it has been handled."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with channel_layer_publisher.batch():
+            return self.get_response(request)
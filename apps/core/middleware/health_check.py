@@ -1,19 +1,33 @@
-from django.db import DEFAULT_DB_ALIAS, connections
-from django.db.migrations.executor import MigrationExecutor
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from rest_framework import status
-from config import settings
+
+from ..health import readiness_monitor
+
+LIVENESS_PATHS = ("/livez",)
+# /lbcheck is kept as a readiness alias for existing load balancer configurations
+READINESS_PATHS = ("/readyz", "/lbcheck")
+
 
 class HealthCheckMiddleware(MiddlewareMixin):
-    """Middleware for health checking the application."""
+    """
+    Middleware for health checking the application.
+
+    Liveness only tells that the process serves requests. Readiness reports the last snapshot taken by the
+    background readiness monitor (database, cache, channel layer and migration state), so a probe never touches
+    the database or the migration graph itself.
+    """
+
     def process_request(self, request):
-        if request.META["PATH_INFO"] == "/lbcheck":
-            response = HttpResponse()
+        path = request.META["PATH_INFO"]
 
-            executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
-            plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
-            if plan:
-                response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        if path in LIVENESS_PATHS:
+            return HttpResponse()
 
-            return response
+        if path in READINESS_PATHS:
+            readiness_monitor.ensure_started()
+            snapshot = readiness_monitor.snapshot
+            return JsonResponse(
+                snapshot.as_dict(),
+                status=status.HTTP_200_OK if snapshot.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
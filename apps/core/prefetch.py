@@ -0,0 +1,62 @@
+"""
+Prefetching iterator.
+
+`prefetch` consumes an iterable on a background thread while its items are processed, so that e.g. the next page of an
+API is being fetched while the current one is written to the database. At most `size` items wait in between, which
+bounds memory whatever the length of the iterable: the producer blocks until the consumer takes an item.
+"""
+
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(iterable: Iterable, size: int = 1) -> Iterator:
+    """
+    Yield the items of `iterable`, producing up to `size` items ahead on a background thread. An exception raised by
+    the iterable is raised by the iterator; closing the iterator early stops the thread.
+    """
+    items = queue.Queue(maxsize=size)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_Failure(e))
+        else:
+            put(_DONE)
+        finally:
+            # Lets a generator release its resources (e.g. an HTTP session) when the consumer stopped early
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while (item := items.get()) is not _DONE:
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
@@ -0,0 +1,208 @@
+"""
+Batched, transaction-aware publishing to the channel layer.
+
+`async_to_sync(channel_layer.group_send)` starts a fresh event loop for every message, and channels_redis keeps its
+connection pools per event loop, so every message also paid for new Redis connections. The publisher sends instead
+from one event loop running in a background thread of each process, which keeps its connections open:
+
+- messages are handed over on `transaction.on_commit`, so a rolled back transaction never announces its rows;
+- messages published during a request or a Celery task (see `batch()`) are held back and handed over together when it
+  ends, and messages reaching the loop within the same iteration are sent as one batch of concurrent `group_send`
+  calls, at most CHANNEL_LAYER_PUBLISH_BATCH_SIZE at a time.
+
+Batch sizes and publish latencies are kept in `metrics`, per process. Each process logs them every
+CHANNEL_LAYER_PUBLISH_METRICS_INTERVAL seconds it has published during, and when it exits.
+"""
+
+import asyncio
+import atexit
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Seconds an exiting process waits for the messages it has not sent yet
+EXIT_FLUSH_TIMEOUT = 5
+
+
+@dataclass
+class PublisherMetrics:
+    batches: int = 0
+    messages: int = 0
+    errors: int = 0
+    max_batch_size: int = 0
+    total_latency: float = 0
+    max_latency: float = 0
+
+    def record(self, batch_size: int, latency: float, errors: int):
+        self.batches += 1
+        self.messages += batch_size
+        self.errors += errors
+        self.max_batch_size = max(self.max_batch_size, batch_size)
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def as_dict(self) -> dict:
+        return {
+            "batches": self.batches,
+            "messages": self.messages,
+            "errors": self.errors,
+            "avg_batch_size": self.messages / self.batches if self.batches else 0,
+            "max_batch_size": self.max_batch_size,
+            "avg_latency": self.total_latency / self.batches if self.batches else 0,
+            "max_latency": self.max_latency,
+        }
+
+
+class ChannelLayerPublisher:
+    def __init__(self, batch_size: int, metrics_interval: float = 0):
+        self.batch_size = batch_size
+        self.metrics_interval = metrics_interval
+        self.metrics = PublisherMetrics()
+        self._reported_batches = 0
+
+        self._batch = contextvars.ContextVar("channel_layer_publisher_batch", default=None)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._buffer = []
+        self._flushing = set()
+
+    def publish(self, group: str, message: dict):
+        self.publish_many([(group, message)])
+
+    def publish_many(self, messages):
+        """Send `(group, message)` pairs once the current transaction commits; dropped if it rolls back."""
+        messages = list(messages)
+        if messages:
+            transaction.on_commit(lambda: self._enqueue(messages))
+
+    def start_batch(self):
+        """Hold back the messages committed from now on until `end_batch`; returns None inside a batch already."""
+        if self._batch.get() is not None:
+            return None
+        return self._batch.set([])
+
+    def end_batch(self, token):
+        """Hand the messages held back since `start_batch` over to the event loop together."""
+        if token is None:
+            return
+        messages = self._batch.get()
+        self._batch.reset(token)
+        self._submit(messages)
+
+    @contextlib.contextmanager
+    def batch(self):
+        token = self.start_batch()
+        try:
+            yield
+        finally:
+            self.end_batch(token)
+
+    def flush(self, timeout: float | None = None):
+        """Wait until the messages handed over so far have been sent."""
+        if self._pid != os.getpid() or self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._drain(), self._loop).result(timeout)
+
+    def ensure_started(self):
+        # Threads do not survive a fork (e.g. Celery prefork workers), so the loop is started lazily per process
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            loop = asyncio.new_event_loop()
+            self._buffer = []
+            self._flushing = set()
+            self.metrics = PublisherMetrics()
+            self._reported_batches = 0
+            if self.metrics_interval:
+                loop.call_soon(loop.call_later, self.metrics_interval, self._report_metrics_periodically)
+            threading.Thread(target=loop.run_forever, name="channel-layer-publisher", daemon=True).start()
+            self._loop = loop
+            self._pid = os.getpid()
+            atexit.register(self._flush_at_exit)
+
+    def _enqueue(self, messages):
+        if (batch := self._batch.get()) is not None:
+            batch.extend(messages)
+        else:
+            self._submit(messages)
+
+    def _submit(self, messages):
+        if not messages:
+            return
+        self.ensure_started()
+        self._loop.call_soon_threadsafe(self._buffer_messages, messages)
+
+    def _buffer_messages(self, messages):
+        if not self._buffer:
+            # Everything reaching the loop before the next iteration joins this batch
+            self._loop.call_soon(self._start_flush)
+        self._buffer.extend(messages)
+
+    def _start_flush(self):
+        messages, self._buffer = self._buffer, []
+        task = self._loop.create_task(self._send(messages))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _send(self, messages):
+        from channels.layers import get_channel_layer
+
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+
+        for start in range(0, len(messages), self.batch_size):
+            chunk = messages[start : start + self.batch_size]
+            started_at = time.perf_counter()
+            results = await asyncio.gather(
+                *(channel_layer.group_send(group, message) for group, message in chunk), return_exceptions=True
+            )
+            errors = [result for result in results if isinstance(result, Exception)]
+            self.metrics.record(len(chunk), time.perf_counter() - started_at, len(errors))
+            for error in errors:
+                logger.error(f"Channel layer publish failed: {error}")
+
+    async def _drain(self):
+        while self._buffer or self._flushing:
+            if self._flushing:
+                await asyncio.wait(set(self._flushing))
+            else:
+                await asyncio.sleep(0)
+
+    def report_metrics(self):
+        """Log the metrics of this process, unless nothing was published since the last report."""
+        if self.metrics.batches == self._reported_batches:
+            return
+        self._reported_batches = self.metrics.batches
+        logger.info(f"Channel layer publisher metrics: {self.metrics.as_dict()}")
+
+    def _report_metrics_periodically(self):
+        self.report_metrics()
+        self._loop.call_later(self.metrics_interval, self._report_metrics_periodically)
+
+    def _flush_at_exit(self):
+        try:
+            self.flush(timeout=EXIT_FLUSH_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Channel layer publisher flush failed: {e}")
+        self.report_metrics()
+
+
+channel_layer_publisher = ChannelLayerPublisher(
+    batch_size=settings.CHANNEL_LAYER_PUBLISH_BATCH_SIZE,
+    metrics_interval=settings.CHANNEL_LAYER_PUBLISH_METRICS_INTERVAL,
+)
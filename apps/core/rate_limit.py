@@ -0,0 +1,66 @@
+import secrets
+import threading
+import time
+from collections import defaultdict, deque
+
+from .redis import get_redis_connection
+
+
+class SlidingWindowCounter:
+    """
+    Counts events per key over the last `window` seconds.
+
+    Backed by one Redis sorted set per key (scored by timestamp), so every worker shares the same counts and a
+    decision never needs a COUNT query on the database. Without Redis the counts are kept in process memory.
+    """
+
+    def __init__(self, prefix: str, window: int):
+        self.prefix = prefix
+        self.window = window
+        self._local = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def _key(self, key) -> str:
+        return f"{self.prefix}:{key}"
+
+    def hit(self, key) -> int:
+        """Register an event and return the number of events in the window, including this one."""
+        now = time.time()
+        if (redis := get_redis_connection()) is None:
+            with self._lock:
+                events = self._local[key]
+                self._expire_local(events, now)
+                events.append(now)
+                return len(events)
+
+        redis_key = self._key(key)
+        pipeline = redis.pipeline()
+        pipeline.zremrangebyscore(redis_key, 0, now - self.window)
+        pipeline.zadd(redis_key, {f"{now}:{secrets.token_hex(4)}": now})
+        pipeline.zcard(redis_key)
+        pipeline.expire(redis_key, self.window)
+        return pipeline.execute()[2]
+
+    def count(self, key) -> int:
+        now = time.time()
+        if (redis := get_redis_connection()) is None:
+            with self._lock:
+                events = self._local.get(key)
+                if not events:
+                    return 0
+                self._expire_local(events, now)
+                return len(events)
+
+        return redis.zcount(self._key(key), now - self.window, "+inf")
+
+    def reset(self, key):
+        if (redis := get_redis_connection()) is None:
+            with self._lock:
+                self._local.pop(key, None)
+            return
+
+        redis.delete(self._key(key))
+
+    def _expire_local(self, events: deque, now: float):
+        while events and events[0] <= now - self.window:
+            events.popleft()
@@ -0,0 +1,14 @@
+from django.conf import settings
+
+
+def get_redis_connection():
+    """
+    Return the raw Redis client behind the default cache, or None when the project runs without Redis (local
+    development uses the in-memory cache). Callers provide an in-process fallback for the None case.
+    """
+    if not settings.REDIS_CONNECTION:
+        return None
+
+    from django_redis import get_redis_connection as get_django_redis_connection
+
+    return get_django_redis_connection("default")
@@ -0,0 +1,93 @@
+import pytest
+from rest_access_policy import AccessPolicy
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from multitenancy.constants import TenantUserRole
+
+from ..acl import policies
+from ..acl.compiled import CompiledAccessPolicy
+from ..acl.helpers import Action, Effect, Principal, make_statement
+
+pytestmark = pytest.mark.django_db
+
+
+class View:
+    action = "list"
+
+
+def make_request(user, method="get", **attrs):
+    request = Request(getattr(APIRequestFactory(), method)("/"))
+    request.user = user
+    for name, value in attrs.items():
+        setattr(request, name, value)
+    return request
+
+
+class TestCompiledAccessPolicy:
+    def test_group_principal(self, user_factory):
+        assert policies.AdminFullAccess().has_permission(make_request(user_factory(admin=True)), View())
+        assert not policies.AdminFullAccess().has_permission(make_request(user_factory()), View())
+
+    def test_groups_are_resolved_once_per_request(self, user_factory, django_assert_num_queries):
+        request = make_request(user_factory())
+        policies.AdminFullAccess().has_permission(request, View())
+
+        with django_assert_num_queries(0):
+            policies.UserFullAccess().has_permission(request, View())
+            policies.AdminFullAccess().has_permission(request, View())
+
+    def test_cached_group_names_skip_query(self, user_factory, django_assert_num_queries):
+        user = user_factory()
+        user._group_names = frozenset({"admin"})
+
+        with django_assert_num_queries(0):
+            assert policies.AdminFullAccess().has_permission(make_request(user), View())
+
+    def test_conditions_are_memoized_per_request(self, user_factory, mocker):
+        spy = mocker.spy(policies.TenantDependentAccess, "is_request_from_tenant_admin")
+        request = make_request(user_factory(), user_role=TenantUserRole.ADMIN)
+
+        assert policies.IsTenantAdminAccess().has_permission(request, View())
+        assert policies.IsTenantAdminAccess().has_permission(request, View())
+
+        assert spy.call_count == 1
+
+    def test_sets_access_enforcement(self, user_factory):
+        request = make_request(user_factory(), user_role=TenantUserRole.MEMBER)
+
+        assert not policies.IsTenantAdminAccess().has_permission(request, View())
+        assert request.access_enforcement.action == "list"
+        assert not request.access_enforcement.allowed
+
+
+class TestCompiledAccessPolicyEquivalence:
+    @pytest.mark.parametrize(
+        "principal",
+        [Principal.Any, Principal.Authenticated, Principal.Anonymous, "group:admin", "admin", "staff", "id:{user_id}"],
+    )
+    @pytest.mark.parametrize("effect", [Effect.Allow, Effect.Deny])
+    def test_matches_rest_access_policy(self, user_factory, principal, effect):
+        user = user_factory()
+        other_user = user_factory()
+        statements = [
+            make_statement(principal=principal.format(user_id=user.pk), action=Action.Any, effect=effect),
+            make_statement(principal=f"id:{other_user.pk}", action=Action.Any, effect=Effect.Allow),
+        ]
+        library_policy = type("LibraryPolicy", (AccessPolicy,), {"statements": statements})
+        compiled_policy = type("CompiledPolicy", (CompiledAccessPolicy,), {"statements": statements})
+
+        for request_user in (user, other_user):
+            allowed = library_policy().has_permission(make_request(request_user), View())
+            assert compiled_policy().has_permission(make_request(request_user), View()) == allowed
+
+    def test_id_principal(self, user_factory):
+        user = user_factory()
+        policy = type(
+            "IdPolicy",
+            (CompiledAccessPolicy,),
+            {"statements": [make_statement(principal=f"id:{user.pk}", action=Action.Any, effect=Effect.Allow)]},
+        )
+
+        assert policy().has_permission(make_request(user), View())
+        assert not policy().has_permission(make_request(user_factory()), View())
@@ -0,0 +1,62 @@
+import pytest
+from django.core.cache import cache
+
+from ..cache import MISSING, VersionedCache
+
+
+@pytest.fixture
+def versioned_cache():
+    cache.clear()
+    yield VersionedCache("test", timeout=60, local_ttl=5)
+    cache.clear()
+
+
+class TestVersionedCache:
+    def test_invalidate_drops_scope_entries(self, versioned_cache):
+        versioned_cache.set("scope", "key", "value")
+        versioned_cache.set("other", "key", "value")
+
+        versioned_cache.invalidate("scope")
+
+        assert versioned_cache.get("scope", "key") is MISSING
+        assert versioned_cache.get("other", "key") == "value"
+
+    def test_invalidate_many(self, versioned_cache, mocker):
+        for scope in ("first", "second", "other"):
+            versioned_cache.set(scope, "key", "value")
+        set_many = mocker.spy(cache, "set_many")
+
+        versioned_cache.invalidate_many(["first", "second"])
+
+        set_many.assert_called_once()
+        assert set_many.call_args.kwargs["timeout"] == 120
+        versioned_cache.clear_local()
+        assert versioned_cache.get("first", "key") is MISSING
+        assert versioned_cache.get("second", "key") is MISSING
+        assert versioned_cache.get("other", "key") == "value"
+
+    def test_none_is_cached(self, versioned_cache):
+        versioned_cache.set("scope", "key", None)
+
+        assert versioned_cache.get("scope", "key") is None
+
+    @pytest.mark.parametrize("create_version", ["get_version", "invalidate"])
+    def test_version_keys_expire_after_entries(self, versioned_cache, create_version, mocker):
+        cache_add = mocker.spy(cache, "add")
+        cache_set = mocker.spy(cache, "set")
+
+        getattr(versioned_cache, create_version)("scope")
+
+        (call,) = cache_add.call_args_list + cache_set.call_args_list
+        assert call.args[0] == "test:scope:version"
+        assert call.kwargs["timeout"] == 120
+
+    def test_expired_version_does_not_resurrect_entries(self, versioned_cache):
+        versioned_cache.set("scope", "key", "value")
+        versioned_cache.invalidate("scope")
+        versioned_cache.set("scope", "key", "new value")
+
+        cache.delete("test:scope:version")
+        versioned_cache.clear_local()
+
+        assert versioned_cache.get("scope", "key") is MISSING
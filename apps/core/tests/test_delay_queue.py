@@ -0,0 +1,43 @@
+import pytest
+
+from ..delay_queue import DelayQueue
+
+
+@pytest.fixture
+def queue(settings):
+    settings.REDIS_CONNECTION = None
+    return DelayQueue("test")
+
+
+class TestDelayQueue:
+    def test_pops_due_members_in_due_order(self, queue):
+        queue.schedule("late", 30)
+        queue.schedule("early", 10)
+        queue.schedule("future", 100)
+
+        assert queue.pop_due(10, now=50) == ["early", "late"]
+        assert queue.pop_due(10, now=50) == []
+        assert queue.next_due_at() == 100
+
+    def test_pop_respects_limit(self, queue):
+        for member in ("a", "b", "c"):
+            queue.schedule(member, 1)
+
+        assert queue.pop_due(2, now=10) == ["a", "b"]
+        assert queue.pop_due(2, now=10) == ["c"]
+
+    def test_reschedule_moves_member(self, queue):
+        queue.schedule("member", 10)
+        queue.schedule("member", 60)
+
+        assert queue.pop_due(10, now=50) == []
+        assert queue.next_due_at() == 60
+        assert queue.pop_due(10, now=60) == ["member"]
+
+    def test_cancel(self, queue):
+        queue.schedule("member", 10)
+
+        queue.cancel("member")
+
+        assert queue.pop_due(10, now=50) == []
+        assert queue.next_due_at() is None
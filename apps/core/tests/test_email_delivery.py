@@ -0,0 +1,101 @@
+import smtplib
+
+import pytest
+from django.core.mail import EmailMessage
+from django.core.mail.backends.base import BaseEmailBackend
+
+from ..email_delivery import deliver_messages
+
+
+class FakeBackend(BaseEmailBackend):
+    """Records connections and deliveries; `refusals` maps recipients to the SMTP replies of their next attempts."""
+
+    connections = []
+    delivered = []
+    refusals = {}
+
+    def open(self):
+        if not getattr(self, "is_open", False):
+            self.is_open = True
+            FakeBackend.connections.append(self)
+
+    def close(self):
+        self.is_open = False
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            refused = {}
+            for address in message.recipients():
+                if replies := self.refusals.get(address):
+                    reply = replies.pop(0)
+                    if reply == "disconnect":
+                        raise smtplib.SMTPServerDisconnected("Connection lost")
+                    refused[address] = reply
+            if refused and len(refused) == len(message.recipients()):
+                raise smtplib.SMTPRecipientsRefused(refused)
+            message.refused_recipients = refused
+            FakeBackend.delivered.append([address for address in message.recipients() if address not in refused])
+        return len(email_messages)
+
+
+@pytest.fixture(autouse=True)
+def backend(settings):
+    settings.EMAIL_BACKEND = f"{__name__}.FakeBackend"
+    FakeBackend.connections = []
+    FakeBackend.delivered = []
+    FakeBackend.refusals = {}
+    return FakeBackend
+
+
+def make_message(*to):
+    return EmailMessage("Subject", "Body", "from@example.org", list(to))
+
+
+class TestDeliverMessages:
+    def test_reuses_connection_per_batch(self, backend):
+        messages = [make_message(f"user{index}@example.org") for index in range(5)]
+
+        results = deliver_messages(messages, batch_size=2, retry_delay=0)
+
+        assert all(result.sent for result in results)
+        assert len(backend.connections) == 3
+        assert len(backend.delivered) == 5
+
+    def test_retries_only_failed_recipients(self, backend):
+        backend.refusals = {"flaky@example.org": [(451, b"Try again later")]}
+
+        (result,) = deliver_messages([make_message("ok@example.org", "flaky@example.org")], retry_delay=0)
+
+        assert result.sent
+        assert backend.delivered == [["ok@example.org"], ["flaky@example.org"]]
+
+    def test_does_not_retry_permanent_refusals(self, backend):
+        backend.refusals = {"missing@example.org": [(550, b"No such user")] * 3}
+
+        messages = [make_message("ok@example.org"), make_message("missing@example.org")]
+
+        ok, failed = deliver_messages(messages, retry_delay=0)
+
+        assert ok.sent
+        assert failed.failed_recipients == {"missing@example.org": "550 No such user"}
+        assert backend.refusals["missing@example.org"] == [(550, b"No such user")] * 2
+
+    def test_reconnects_after_failure(self, backend):
+        backend.refusals = {"first@example.org": ["disconnect"]}
+
+        messages = [make_message("first@example.org"), make_message("second@example.org")]
+
+        results = deliver_messages(messages, retry_delay=0)
+
+        assert all(result.sent for result in results)
+        assert backend.delivered == [["second@example.org"], ["first@example.org"]]
+        assert len(backend.connections) == 3
+
+    def test_gives_up_after_max_attempts(self, backend):
+        backend.refusals = {"flaky@example.org": [(451, b"Try again later")] * 5}
+
+        (result,) = deliver_messages([make_message("flaky@example.org")], max_attempts=2, retry_delay=0)
+
+        assert not result.sent
+        assert result.failed_recipients == {"flaky@example.org": "451 Try again later"}
+        assert len(backend.refusals["flaky@example.org"]) == 3
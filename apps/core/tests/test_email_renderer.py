@@ -0,0 +1,111 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+
+from ..email_renderer import EmailRendererCrashed, EmailRendererPool, EmailRenderError
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+
+FAKE_RENDERER = """
+module.exports = {
+  renderEmail: (emailType, emailData) => {
+    if (emailType === 'CRASH') process.exit(1);
+    if (emailType === 'HANG') while (true) {}
+    if (emailType === 'INVALID') throw Error('Unknown email type');
+    console.log('logged output does not break the protocol');
+    return { subject: emailType, html: JSON.stringify({ ...emailData, pid: process.pid }) };
+  },
+};
+"""
+
+
+@pytest.fixture
+def renderer_dir(tmp_path):
+    (tmp_path / "email").mkdir()
+    shutil.copy(Path(settings.EMAIL_RENDERER_DIR) / "email" / "worker.cjs", tmp_path / "email" / "worker.cjs")
+    (tmp_path / "email" / "index.js").write_text(FAKE_RENDERER)
+    (tmp_path / "package.json").write_text('{"type": "commonjs"}')
+    return tmp_path
+
+
+def make_pool(renderer_dir, **kwargs):
+    options = {"size": 2, "timeout": 5, "health_check_interval": 30, "max_renders": 100} | kwargs
+    return EmailRendererPool(cwd=str(renderer_dir), **options)
+
+
+def rendered_pid(rendered):
+    return int(rendered["html"].split('"pid":')[1].rstrip("}"))
+
+
+class TestEmailRendererPool:
+    def test_reuses_renderer_process(self, renderer_dir):
+        pool = make_pool(renderer_dir, size=1)
+
+        first = pool.render("WELCOME", {"name": "Ada"})
+        second = pool.render("WELCOME", {"name": "Grace"})
+
+        assert first["subject"] == "WELCOME"
+        assert '"name":"Ada"' in first["html"]
+        assert rendered_pid(first) == rendered_pid(second)
+
+    def test_renders_batch_in_order(self, renderer_dir):
+        pool = make_pool(renderer_dir)
+
+        results = pool.render_many([("WELCOME", {"index": index}) for index in range(5)] + [("INVALID", {})])
+
+        assert all(f'"index":{index},' in result["html"] for index, result in enumerate(results[:5]))
+        assert isinstance(results[5], EmailRenderError)
+        assert len({rendered_pid(result) for result in results[:5]}) == 2
+
+    def test_renders_batch_larger_than_pipe_buffers(self, renderer_dir):
+        pool = make_pool(renderer_dir, size=1)
+        # Requests and answers each add up to far more than the pipes buffer, so they must flow at the same time
+        emails = [("WELCOME", {"index": index, "text": "x" * 4096}) for index in range(200)]
+
+        results = pool.render_many(emails)
+
+        assert all(f'"index":{index},' in result["html"] for index, result in enumerate(results))
+
+    def test_render_error_keeps_process(self, renderer_dir):
+        pool = make_pool(renderer_dir, size=1)
+        pid = rendered_pid(pool.render("WELCOME", {}))
+
+        with pytest.raises(EmailRenderError, match="Unknown email type"):
+            pool.render("INVALID", {})
+
+        assert rendered_pid(pool.render("WELCOME", {})) == pid
+
+    def test_restarts_crashed_process(self, renderer_dir):
+        pool = make_pool(renderer_dir, size=1)
+        pid = rendered_pid(pool.render("WELCOME", {}))
+
+        with pytest.raises(EmailRendererCrashed):
+            pool.render("CRASH", {})
+
+        assert rendered_pid(pool.render("WELCOME", {})) != pid
+
+    def test_restarts_process_not_answering_in_time(self, renderer_dir):
+        pool = make_pool(renderer_dir, size=1, timeout=0.5)
+
+        with pytest.raises(EmailRendererCrashed):
+            pool.render("HANG", {})
+
+        assert pool.render("WELCOME", {})["subject"] == "WELCOME"
+
+    def test_stops_process_not_reading_requests_in_time(self, renderer_dir):
+        pool = make_pool(renderer_dir, size=1, timeout=0.02)
+        # The process hangs on the first request, so the rest of the batch does not fit in the pipe
+        emails = [("HANG", {})] + [("WELCOME", {"text": "x" * 4096})] * 100
+
+        results = pool.render_many(emails)
+
+        assert all(isinstance(result, EmailRendererCrashed) for result in results)
+
+    def test_replaces_process_after_max_renders(self, renderer_dir):
+        pool = make_pool(renderer_dir, size=1, max_renders=2)
+
+        pids = [rendered_pid(pool.render("WELCOME", {})) for _ in range(3)]
+
+        assert pids[0] == pids[1] != pids[2]
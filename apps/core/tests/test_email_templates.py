@@ -0,0 +1,93 @@
+import pytest
+from django.template import engines
+
+from ..email_templates import EmailTemplate
+
+
+def make_template(source):
+    return EmailTemplate(engines["django"].from_string(source))
+
+
+def render_each(template, contexts):
+    return [template.render(context) for context in contexts]
+
+
+@pytest.fixture
+def contexts():
+    return [
+        {"product": "Shop", "user": {"name": f"User <{index}>", "email": f"user{index}@example.org"}, "total": 1.5}
+        for index in range(5)
+    ]
+
+
+class TestEmailTemplate:
+    def test_renders_shared_parts_once(self, contexts, mocker):
+        template = make_template(
+            "{% for i in '123' %}<p>{{ product }} {{ i }}</p>{% endfor %}"
+            "Hi {{ user.name }} ({{ user.email }}) {{ total }}"
+        )
+        expected = render_each(template, contexts)
+        render = mocker.spy(template, "render")
+
+        assert template.render_many(contexts) == expected
+        assert "Hi User &lt;1&gt; (user1@example.org)" in expected[1]
+        # Once with markers, once for the first email to check the merge
+        assert render.call_count == 2
+
+    def test_recipient_values_in_tags_fall_back_to_full_renders(self, contexts):
+        contexts[0]["user"]["vip"] = True
+        template = make_template("{% if user.vip %}VIP {% endif %}{{ user.name }}")
+
+        assert template.render_many(contexts) == render_each(template, contexts)
+
+    def test_filtered_recipient_values_fall_back_to_full_renders(self, contexts, mocker):
+        template = make_template("{{ user.name|upper }}")
+        expected = render_each(template, contexts)
+        render = mocker.spy(template, "render")
+
+        assert template.render_many(contexts) == expected
+        assert render.call_count == len(contexts) + 1
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "{{ user.name|first }}",
+            "{{ user.name.0 }}",
+            "{{ user.name|slice:':1' }}",
+            "{{ user.name|truncatechars:2 }}",
+            "{{ user.name|stringformat:'.1s' }}",
+        ],
+    )
+    def test_indexed_recipient_values_fall_back_to_full_renders(self, contexts, source):
+        # The markers start with "E" too, so only rendering the other emails in full reveals a constant
+        contexts[0]["user"]["name"] = "Eve"
+        template = make_template(source)
+
+        assert template.render_many(contexts) == render_each(template, contexts)
+
+    def test_recipient_sequences_fall_back_to_full_renders(self, contexts):
+        for index, context in enumerate(contexts):
+            context["items"] = list(range(index))
+        template = make_template("{{ user.name }}:{% for item in items %}{{ item }}{% endfor %}")
+
+        assert template.render_many(contexts) == render_each(template, contexts)
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "{% autoescape off %}Hi {{ user.name }}{% endautoescape %}",
+            "Hi {{ user.name|safe }}",
+            "<a href='/unsubscribe?email={{ user.email|urlencode }}'>{{ user.name }}</a>",
+            "Hi {{ user.name|force_escape }}",
+        ],
+    )
+    def test_values_not_printed_escaped_fall_back_to_full_renders(self, contexts, source, mocker):
+        contexts[0]["user"]["name"] = "User"
+        for context in contexts:
+            context["user"]["email"] = context["user"]["email"].replace("@", "+tag@")
+        template = make_template(source)
+        expected = render_each(template, contexts)
+        render = mocker.spy(template, "render")
+
+        assert template.render_many(contexts) == expected
+        assert render.call_count == len(contexts) + 1
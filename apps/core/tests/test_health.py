@@ -0,0 +1,130 @@
+import threading
+from concurrent.futures import Future
+
+import pytest
+from django.test import RequestFactory
+
+from .. import health
+from ..health import ProbeResult, ReadinessMonitor, ReadinessSnapshot
+from ..middleware import HealthCheckMiddleware
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def readiness_monitor(mocker):
+    monitor = mocker.patch("core.middleware.health_check.readiness_monitor")
+    monitor.snapshot = ReadinessSnapshot(checks={"database": ProbeResult(ok=True)})
+    return monitor
+
+
+class TestHealthCheckMiddleware:
+    def test_liveness_does_not_start_readiness_monitor(self, readiness_monitor):
+        request = RequestFactory().get("/livez")
+
+        response = HealthCheckMiddleware(lambda r: None).process_request(request)
+
+        assert response.status_code == 200
+        readiness_monitor.ensure_started.assert_not_called()
+
+    @pytest.mark.parametrize("path", ["/readyz", "/lbcheck"])
+    def test_readiness_reports_snapshot(self, readiness_monitor, path):
+        request = RequestFactory().get(path)
+
+        response = HealthCheckMiddleware(lambda r: None).process_request(request)
+
+        assert response.status_code == 200
+        readiness_monitor.ensure_started.assert_called_once()
+
+    def test_readiness_unavailable_when_check_fails(self, readiness_monitor):
+        readiness_monitor.snapshot = ReadinessSnapshot(
+            checks={"database": ProbeResult(ok=True), "migrations": ProbeResult(ok=False, error="1 unapplied")}
+        )
+        request = RequestFactory().get("/readyz")
+
+        response = HealthCheckMiddleware(lambda r: None).process_request(request)
+
+        assert response.status_code == 503
+
+    def test_other_paths_pass_through(self, readiness_monitor):
+        request = RequestFactory().get("/api/")
+
+        assert HealthCheckMiddleware(lambda r: None).process_request(request) is None
+
+
+class TestReadinessMonitor:
+    def test_refresh_runs_all_probes(self, mocker):
+        mocker.patch("core.health.check_migrations")
+        monitor = ReadinessMonitor(interval=1, timeout=1, migrations_interval=60)
+        monitor.probes = {"database": lambda: None, "cache": lambda: None}
+        monitor._executor = mocker.Mock(submit=mocker.Mock(side_effect=_completed_future))
+
+        monitor.refresh()
+
+        assert monitor.snapshot.ready
+        assert set(monitor.snapshot.checks) == {"database", "cache", "migrations"}
+
+    def test_failing_probe_marks_snapshot_unavailable(self, mocker):
+        mocker.patch("core.health.check_migrations")
+
+        def failing_probe():
+            raise ConnectionError("connection refused")
+
+        monitor = ReadinessMonitor(interval=1, timeout=1, migrations_interval=60)
+        monitor.probes = {"database": failing_probe}
+        monitor._executor = mocker.Mock(submit=mocker.Mock(side_effect=_completed_future))
+
+        monitor.refresh()
+
+        assert not monitor.snapshot.ready
+        assert monitor.snapshot.checks["database"].error == "connection refused"
+
+    def test_is_ready_as_soon_as_started(self, mocker):
+        check_migrations = mocker.patch("core.health.check_migrations")
+        mocker.patch.object(ReadinessMonitor, "_run")
+        monitor = ReadinessMonitor(interval=60, timeout=1, migrations_interval=60)
+        monitor.probes = {"database": lambda: None}
+
+        monitor.ensure_started()
+
+        assert monitor.snapshot.ready
+        check_migrations.assert_called_once_with()
+
+    def test_start_does_not_wait_for_slow_migration_check(self, mocker):
+        release = threading.Event()
+        mocker.patch("core.health.check_migrations", side_effect=release.wait)
+        mocker.patch.object(ReadinessMonitor, "_run")
+        monitor = ReadinessMonitor(interval=60, timeout=0.1, migrations_interval=60)
+        monitor.probes = {"database": lambda: None}
+
+        try:
+            monitor.ensure_started()
+
+            assert monitor.snapshot.checks["migrations"] == ProbeResult(ok=False, error="pending")
+        finally:
+            release.set()
+
+        monitor._pending["migrations"].result(timeout=1)
+        monitor.refresh()
+        assert monitor.snapshot.ready
+
+
+class TestCheckDatabase:
+    def test_reuses_connection(self, mocker):
+        mocker.patch.object(health, "_database_connection", None)
+        create_connection = mocker.spy(health.connections, "create_connection")
+
+        health.check_database()
+        health.check_database()
+
+        create_connection.assert_called_once()
+        health.get_database_connection().close()
+
+
+def _completed_future(fn):
+    future = Future()
+    try:
+        future.set_result(fn())
+    except Exception as e:
+        future.set_exception(e)
+    return future
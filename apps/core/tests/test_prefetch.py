@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+
+from ..prefetch import prefetch
+
+
+class TestPrefetch:
+    def test_yields_items_in_order(self):
+        assert list(prefetch(range(10))) == list(range(10))
+
+    def test_produces_at_most_size_items_ahead(self):
+        produced = []
+
+        def pages():
+            for page in range(10):
+                produced.append(page)
+                yield page
+
+        iterator = prefetch(pages(), size=2)
+        assert next(iterator) == 0
+        deadline = time.monotonic() + 1
+        while len(produced) < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+
+        # One item consumed, two waiting and one held until the queue has room
+        assert produced == [0, 1, 2, 3]
+        assert list(iterator) == list(range(1, 10))
+
+    def test_raises_errors_of_the_iterable(self):
+        def pages():
+            yield 1
+            raise ValueError("Page could not be fetched")
+
+        iterator = prefetch(pages())
+
+        assert next(iterator) == 1
+        with pytest.raises(ValueError, match="Page could not be fetched"):
+            next(iterator)
+
+    def test_closing_stops_the_producer(self):
+        finished = threading.Event()
+
+        def pages():
+            try:
+                yield from range(100)
+            finally:
+                finished.set()
+
+        iterator = prefetch(pages())
+        next(iterator)
+        iterator.close()
+
+        assert finished.is_set()
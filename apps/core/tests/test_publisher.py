@@ -0,0 +1,118 @@
+import logging
+import time
+
+import pytest
+from django.db import transaction
+
+from ..publisher import ChannelLayerPublisher
+
+pytestmark = pytest.mark.django_db
+
+
+class FakeChannelLayer:
+    def __init__(self, failing_groups=()):
+        self.sent = []
+        self.failing_groups = failing_groups
+
+    async def group_send(self, group, message):
+        if group in self.failing_groups:
+            raise ConnectionError(group)
+        self.sent.append((group, message))
+
+
+@pytest.fixture
+def channel_layer(mocker):
+    channel_layer = FakeChannelLayer()
+    mocker.patch("channels.layers.get_channel_layer", return_value=channel_layer)
+    return channel_layer
+
+
+@pytest.fixture
+def publisher():
+    return ChannelLayerPublisher(batch_size=100)
+
+
+class TestChannelLayerPublisher:
+    def test_sends_once_committed(self, publisher, channel_layer, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            publisher.publish("group", {"type": "message"})
+            publisher.flush(timeout=5)
+            assert channel_layer.sent == []
+
+        publisher.flush(timeout=5)
+        assert channel_layer.sent == [("group", {"type": "message"})]
+
+    def test_drops_rolled_back_messages(self, publisher, channel_layer, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(RuntimeError), transaction.atomic():
+                publisher.publish("group", {"type": "message"})
+                raise RuntimeError
+
+        publisher.flush(timeout=5)
+        assert channel_layer.sent == []
+
+    def test_batch_sends_messages_together(self, publisher, channel_layer, django_capture_on_commit_callbacks):
+        with publisher.batch():
+            for index in range(3):
+                with django_capture_on_commit_callbacks(execute=True):
+                    publisher.publish(f"group_{index}", {"type": "message"})
+            publisher.flush(timeout=5)
+            assert channel_layer.sent == []
+
+        publisher.flush(timeout=5)
+        assert [group for group, _ in channel_layer.sent] == ["group_0", "group_1", "group_2"]
+        assert publisher.metrics.batches == 1
+        assert publisher.metrics.max_batch_size == 3
+
+    def test_splits_large_batches(self, channel_layer, django_capture_on_commit_callbacks):
+        publisher = ChannelLayerPublisher(batch_size=2)
+
+        with publisher.batch(), django_capture_on_commit_callbacks(execute=True):
+            publisher.publish_many((f"group_{index}", {"type": "message"}) for index in range(5))
+
+        publisher.flush(timeout=5)
+        assert len(channel_layer.sent) == 5
+        assert publisher.metrics.as_dict() | {"avg_latency": 0, "max_latency": 0} == {
+            "batches": 3,
+            "messages": 5,
+            "errors": 0,
+            "avg_batch_size": 5 / 3,
+            "max_batch_size": 2,
+            "avg_latency": 0,
+            "max_latency": 0,
+        }
+
+    def test_counts_failed_publishes(self, publisher, channel_layer, django_capture_on_commit_callbacks):
+        channel_layer.failing_groups = {"broken"}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            publisher.publish_many([("broken", {"type": "message"}), ("group", {"type": "message"})])
+
+        publisher.flush(timeout=5)
+        assert channel_layer.sent == [("group", {"type": "message"})]
+        assert publisher.metrics.errors == 1
+
+    def test_logs_metrics_periodically(self, channel_layer, django_capture_on_commit_callbacks, caplog):
+        publisher = ChannelLayerPublisher(batch_size=100, metrics_interval=0.05)
+
+        with caplog.at_level(logging.INFO, logger="core.publisher"):
+            with django_capture_on_commit_callbacks(execute=True):
+                publisher.publish("group", {"type": "message"})
+            publisher.flush(timeout=5)
+            time.sleep(0.2)
+
+        # Only rounds that published something are reported
+        reports = [record.getMessage() for record in caplog.records if "publisher metrics" in record.getMessage()]
+        assert len(reports) == 1
+        assert "'messages': 1" in reports[0]
+
+    def test_reports_only_new_metrics(self, publisher, channel_layer, django_capture_on_commit_callbacks, caplog):
+        with django_capture_on_commit_callbacks(execute=True):
+            publisher.publish("group", {"type": "message"})
+        publisher.flush(timeout=5)
+
+        with caplog.at_level(logging.INFO, logger="core.publisher"):
+            publisher.report_metrics()
+            publisher.report_metrics()
+
+        assert len(caplog.records) == 1
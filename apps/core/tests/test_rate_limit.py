@@ -0,0 +1,32 @@
+import pytest
+
+from ..rate_limit import SlidingWindowCounter
+
+
+@pytest.fixture
+def counter(settings):
+    settings.REDIS_CONNECTION = None
+    return SlidingWindowCounter("test", window=60)
+
+
+class TestSlidingWindowCounter:
+    def test_hit_counts_events_in_window(self, counter):
+        assert counter.hit("key") == 1
+        assert counter.hit("key") == 2
+        assert counter.count("key") == 2
+        assert counter.count("other") == 0
+
+    def test_events_expire_after_window(self, counter, mocker):
+        time = mocker.patch("core.rate_limit.time.time", return_value=1000)
+        counter.hit("key")
+
+        time.return_value = 1061
+
+        assert counter.count("key") == 0
+
+    def test_reset(self, counter):
+        counter.hit("key")
+
+        counter.reset("key")
+
+        assert counter.count("key") == 0
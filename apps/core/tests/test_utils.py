@@ -0,0 +1,34 @@
+import pytest
+from django.test import RequestFactory
+
+from ..utils import get_client_ip
+
+
+def make_request(remote_addr, forwarded_for=None):
+    headers = {"HTTP_X_FORWARDED_FOR": forwarded_for} if forwarded_for is not None else {}
+    return RequestFactory().get("/", REMOTE_ADDR=remote_addr, **headers)
+
+
+class TestGetClientIp:
+    @pytest.fixture(autouse=True)
+    def trusted_proxies(self, settings):
+        settings.TRUSTED_PROXY_NETWORKS = ["10.0.0.0/8"]
+
+    def test_without_proxy(self):
+        assert get_client_ip(make_request("203.0.113.7")) == "203.0.113.7"
+
+    def test_behind_load_balancer(self):
+        assert get_client_ip(make_request("10.0.1.5", "203.0.113.7")) == "203.0.113.7"
+
+    def test_ignores_entries_spoofed_by_the_client(self):
+        assert get_client_ip(make_request("10.0.1.5", "1.2.3.4, 203.0.113.7")) == "203.0.113.7"
+
+    def test_skips_every_trusted_proxy(self):
+        assert get_client_ip(make_request("10.0.1.5", "1.2.3.4, 203.0.113.7, 10.0.2.9")) == "203.0.113.7"
+
+    def test_ignores_header_from_untrusted_peer(self):
+        assert get_client_ip(make_request("198.51.100.2", "203.0.113.7")) == "198.51.100.2"
+
+    def test_invalid_entries(self):
+        assert get_client_ip(make_request("10.0.1.5", "not-an-ip")) == "10.0.1.5"
+        assert get_client_ip(make_request("10.0.1.5", "203.0.113.7, not-an-ip, 10.0.2.9")) == "10.0.2.9"
@@ -1,3 +1,7 @@
+import functools
+import ipaddress
+
+from django.conf import settings
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
 
@@ -22,8 +26,39 @@ def custom_exception_handler(exc, context):
     return response
 
 def get_client_ip(request):
-    """Retrieve client ip from x-forwarded-for header in case of load balancer usage"""
-    if x_forwarded_for := request.META.get("x-forwarded-for"):
-        return x_forwarded_for.split(",")[0]
+    """
+    Retrieve the client ip behind the load balancer.
+
+    Every proxy appends the address it received the request from to X-Forwarded-For, so only the right-most entries
+    added by our own proxies (TRUSTED_PROXY_NETWORKS) can be trusted; anything to their left is set by the client. The
+    client ip is the right-most address that is not one of our proxies.
+    """
+    remote_addr = request.META["REMOTE_ADDR"]
+    forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR", "")
+    if not forwarded_for or not _is_trusted_proxy(remote_addr):
+        return remote_addr
+
+    client_ip = remote_addr
+    for address in reversed([address.strip() for address in forwarded_for.split(",")]):
+        try:
+            ipaddress.ip_address(address)
+        except ValueError:
+            # Garbage set by the client, the last valid hop is as close to it as can be told
+            break
+        client_ip = address
+        if not _is_trusted_proxy(address):
+            break
+    return client_ip
+
+
+@functools.lru_cache(maxsize=1)
+def _trusted_proxy_networks(networks: tuple) -> tuple:
+    return tuple(ipaddress.ip_network(network) for network in networks)
+
 
-    return request.META["REMOTE_ADDR"]
\ No newline at end of file
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_proxy_networks(tuple(settings.TRUSTED_PROXY_NETWORKS)))
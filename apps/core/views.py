@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy, reverse
+from notifications import counters as notification_counters
 from notifications import models as notification_models
 from multitenancy import models as tenant_models
 
@@ -47,9 +48,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         ).order_by('-created_at')[:5]
         
         # Get unread notification count
-        context['unread_count'] = notification_models.Notification.objects.filter(
-            user=user, read_at__isnull=True
-        ).count()
+        context['unread_count'] = notification_counters.get_unread_count(user)
         
         # Get user's tenants
         context['tenants'] = tenant_models.TenantMembership.objects.filter(
@@ -5,14 +5,13 @@ from rest_framework import generics, status, viewsets, permissions, serializers
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt import tokens as jwt_tokens
 from rest_framework_simplejwt import views as jwt_views
 from rest_framework_simplejwt.views import TokenViewBase
 from social_core.actions import do_complete
 from social_django.utils import psa
 
 from config import settings
-from iam import models, serializers as iam_serializers, utils
+from iam import jwt, models, serializers as iam_serializers, utils
 from iam.models import Group
 from ..serializers import (
     CreateUserSerializer, UpdateUserSerializer, ListUserSerializer,
@@ -227,7 +226,7 @@ def complete(request, backend, *args, **kwargs):
             otp_auth_token = utils.generate_otp_auth_token(user)
             backend.strategy.set_otp_auth_token(otp_auth_token)
         else:
-            token = jwt_tokens.RefreshToken.for_user(user)
+            token = jwt.RefreshToken.for_user(user)
             backend.strategy.set_jwt(token)
 
     return do_complete(
@@ -1,11 +1,68 @@
+from channels.auth import get_user as get_session_user
 from channels.db import database_sync_to_async
 from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
 from django.http import parse_cookie
+from django.utils.translation import gettext_lazy as _
 from rest_framework import HTTP_HEADER_ENCODING
 from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_api_settings
 
+from .jwt import TOKEN_VERSION_CLAIM
+from .services import user_snapshots
 
-class JSONWebTokenCookieAuthentication(authentication.JWTAuthentication):
+
+class CachedUserAuthenticationMixin:
+    """
+    Resolves the token user from a short-lived cached snapshot instead of loading it on every request.
+
+    Enabled with the JWT_STATELESS_USER_ENABLED setting. The snapshot carries the user's token version, so tokens
+    issued before a password change or deactivation are rejected. Group changes only invalidate the snapshot.
+    """
+
+    def get_user(self, validated_token):
+        if not settings.JWT_STATELESS_USER_ENABLED:
+            user = super().get_user(validated_token)
+            if validated_token.get(TOKEN_VERSION_CLAIM, 0) != user.token_version:
+                raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+            return user
+
+        snapshot = user_snapshots.get_user_snapshot(self.get_user_id(validated_token))
+        return self.get_user_from_snapshot(validated_token, snapshot)
+
+    async def aget_user(self, validated_token):
+        """Async variant of `get_user`; only the snapshot lookup runs without a thread hop to the database."""
+        if not settings.JWT_STATELESS_USER_ENABLED:
+            return await database_sync_to_async(self.get_user)(validated_token)
+
+        snapshot = await user_snapshots.aget_user_snapshot(self.get_user_id(validated_token))
+        return self.get_user_from_snapshot(validated_token, snapshot)
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[jwt_api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def get_user_from_snapshot(self, validated_token, snapshot):
+        if snapshot is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if jwt_api_settings.CHECK_USER_IS_ACTIVE and not snapshot["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if validated_token.get(TOKEN_VERSION_CLAIM, 0) != snapshot["token_version"]:
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+
+        return user_snapshots.user_from_snapshot(snapshot)
+
+
+class JSONWebTokenAuthentication(CachedUserAuthenticationMixin, authentication.JWTAuthentication):
+    pass
+
+
+class JSONWebTokenCookieAuthentication(CachedUserAuthenticationMixin, authentication.JWTAuthentication):
     def get_header(self, request):
         """
         Extracts the header containing the JSON web token from the given
@@ -23,7 +80,7 @@ class JSONWebTokenCookieAuthentication(authentication.JWTAuthentication):
         return header
 
 
-class JSONWebTokenChannelsAuthentication(authentication.JWTAuthentication):
+class JSONWebTokenChannelsAuthentication(CachedUserAuthenticationMixin, authentication.JWTAuthentication):
     def get_header(self, scope):
         for name, value in scope.get("headers", []):
             if name == b"cookie":
@@ -48,21 +105,44 @@ class JSONWebTokenChannelsAuthentication(authentication.JWTAuthentication):
     def get_raw_token(self, header):
         return header
 
+    async def aauthenticate(self, scope):
+        """
+        Token validation is pure crypto and runs inline; with JWT_STATELESS_USER_ENABLED the user comes from the cached
+        snapshot, so a warm cache authenticates a connection without a thread hop to the database.
+        """
+        header = self.get_header(scope)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
 
 class JSONWebTokenCookieMiddleware:
+    """
+    Populates scope["user"] from the JWT access token cookie. Without a valid token the user comes from the session,
+    when the middleware runs inside `SessionMiddlewareStack`, so the session is only loaded for connections without
+    one; otherwise the connection is left anonymous so consumers can reject it.
+    """
+
     def __init__(self, app):
         self.app = app
 
-    @database_sync_to_async
-    def authenticate(self, scope):
-        auth_backend = JSONWebTokenChannelsAuthentication()
-        return auth_backend.authenticate(scope)
-
     async def __call__(self, scope, receive, send):
         scope = dict(scope)
-        result = await self.authenticate(scope)
-        if result is not None:
-            user, _ = result
-            scope["user"] = user
+        try:
+            result = await JSONWebTokenChannelsAuthentication().aauthenticate(scope)
+        except AuthenticationFailed:
+            result = None
 
+        if result is not None:
+            scope["user"] = result[0]
+        elif "session" in scope:
+            scope["user"] = await get_session_user(scope)
+        else:
+            scope["user"] = AnonymousUser()
         return await self.app(scope, receive, send)
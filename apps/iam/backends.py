@@ -1,26 +1,57 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.crypto import salted_hmac
 
 User = get_user_model()
 
 
 class EmailBackend(ModelBackend):
     """
-    Custom authentication backend that allows users to log in using their email address.
+    Authentication backend that allows users to log in with either their email address or their username.
+
+    The user is resolved with a single query and the password is hashed at most once per attempt; unknown users run
+    the default hasher once as well, so both cases take the same time. Failed credential pairs are remembered for
+    AUTH_FAILED_LOGIN_CACHE_TIMEOUT seconds and repeating them skips the hashing. A remembered failure only counts
+    while the user's token version is unchanged, so a password change or reactivation takes effect immediately.
     """
 
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            # Try to fetch the user by email
-            user = User.objects.get(email=username)
-        except User.DoesNotExist:
-            # Try to fetch by username as fallback
-            try:
-                user = User.objects.get(username=username)
-            except User.DoesNotExist:
-                return None
-
-        # Check the password
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        failed_login_key = self._failed_login_key(username, password)
+        failed_login = cache.get(failed_login_key)
+
+        # Email matches take precedence over username matches
+        users = sorted(
+            User.objects.filter(Q(email=username) | Q(username=username))[:2], key=lambda user: user.email != username
+        )
+        if not users:
+            if failed_login is None:
+                # Run the default password hasher once to reduce the timing difference between an existing and a
+                # nonexistent user
+                User().set_password(password)
+                cache.set(failed_login_key, (None, None), timeout=settings.AUTH_FAILED_LOGIN_CACHE_TIMEOUT)
+            return None
+
+        user = users[0]
+        user_state = (user.pk.id, user.token_version)
+        if failed_login == user_state:
+            return None
+
         if user.check_password(password) and self.user_can_authenticate(user):
             return user
+
+        cache.set(failed_login_key, user_state, timeout=settings.AUTH_FAILED_LOGIN_CACHE_TIMEOUT)
         return None
+
+    @staticmethod
+    def _failed_login_key(username, password) -> str:
+        # Keyed with SECRET_KEY, so cached entries cannot be used to brute force passwords offline
+        digest = salted_hmac("iam.backends.EmailBackend", f"{username}\0{password}", algorithm="sha256").hexdigest()
+        return f"iam:failed_login:{digest}"
@@ -1,9 +1,95 @@
-from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens as jwt_tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+TOKEN_VERSION_CLAIM = "token_version"
+
+# Blacklist state of refresh tokens by JTI, so refreshing does not need a blacklist query per request
+REVOKED = "revoked"
+VALID = "valid"
+
+
+def _jti_key(jti) -> str:
+    return f"iam:jti:{jti}"
+
+
+def _jti_timeout(exp=None) -> int:
+    if exp is None:
+        return int(jwt_api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+    return max(int(exp - timezone.now().timestamp()), 1)
+
+
+def mark_revoked(jtis):
+    cache.set_many({_jti_key(jti): REVOKED for jti in jtis}, timeout=_jti_timeout())
+
+
+def is_revoked(jti, exp=None) -> bool:
+    """
+    Check the token blacklist, answering from the cache when the state of the token is known.
+
+    Only unknown tokens hit the database. Their "valid" state is cached with `add`, so it can never overwrite a
+    revocation that happened in the meantime.
+    """
+    state = cache.get(_jti_key(jti))
+    if state is not None:
+        return state == REVOKED
+
+    revoked = BlacklistedToken.objects.filter(token__jti=jti).exists()
+    if revoked:
+        cache.set(_jti_key(jti), REVOKED, timeout=_jti_timeout(exp))
+    else:
+        cache.add(_jti_key(jti), VALID, timeout=_jti_timeout(exp))
+    return revoked
+
+
+class RefreshToken(jwt_tokens.RefreshToken):
+    """
+    Refresh token carrying the user's token version; access tokens derived from it inherit the claim.
+
+    Blacklist checks go through the cached JTI state, see `is_revoked`.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+    def check_blacklist(self):
+        if is_revoked(self.payload[jwt_api_settings.JTI_CLAIM], self.payload.get("exp")):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        jti = self.payload[jwt_api_settings.JTI_CLAIM]
+        token_id = OutstandingToken.objects.filter(jti=jti).values_list("id", flat=True).first()
+        if token_id is None:
+            # Not issued through for_user (e.g. created before the blacklist app was enabled)
+            result = super().blacklist()
+        else:
+            # Passing the token with its jti spares the post_save receiver a query, see iam.signals
+            result = BlacklistedToken.objects.get_or_create(token=OutstandingToken(id=token_id, jti=jti))
+        mark_revoked([jti])
+        return result
+
 
 def blacklist_user_tokens(user):
     """
-    Blacklist all outstanding tokens for a user.
+    Blacklist all outstanding, unexpired tokens for a user.
+
+    Takes a constant number of queries regardless of how many sessions the user has: one select, and one
+    INSERT ... ON CONFLICT DO NOTHING for the tokens that are not blacklisted yet.
     """
-    outstanding_tokens = OutstandingToken.objects.filter(user=user)
-    for token in outstanding_tokens:
-        BlacklistedToken.objects.get_or_create(token=token)
+    outstanding_tokens = list(
+        OutstandingToken.objects.filter(user=user, expires_at__gt=timezone.now()).values_list("id", "jti")
+    )
+    if not outstanding_tokens:
+        return
+
+    BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token_id=token_id) for token_id, jti in outstanding_tokens], ignore_conflicts=True
+    )
+    mark_revoked([jti for token_id, jti in outstanding_tokens])
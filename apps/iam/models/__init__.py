@@ -1,6 +1,7 @@
 from .user import User, UserProfile, UserAvatar
 from .groups import Group
 from .permissions import Permission
+from .login_attempt import LoginAttempt
 
 
-__all__ = ['User', 'Group', 'Permission', 'UserProfile', 'UserAvatar']
\ No newline at end of file
+__all__ = ['User', 'Group', 'Permission', 'UserProfile', 'UserAvatar', 'LoginAttempt']
\ No newline at end of file
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from .user import User
 import hashid_field
 
@@ -23,7 +24,8 @@ class LoginAttempt(models.Model):
     city = models.CharField(max_length=100, blank=True)
     two_factor_required = models.BooleanField(default=False)
     two_factor_verified = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: attempts are buffered and bulk inserted later, so the time of the attempt is set explicitly
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         db_table = "login_attempts"
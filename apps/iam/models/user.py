@@ -50,6 +50,16 @@ class UserManager(BaseUserManager):
 
         return user
 
+    def bump_token_version(self, user_ids):
+        """Invalidate issued tokens and cached snapshots of the given users without loading them."""
+        from ..services import user_snapshots
+
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        self.filter(pk__in=user_ids).update(token_version=models.F("token_version") + 1)
+        user_snapshots.invalidate_user_snapshots(user_ids)
+
     # def filter_admins(self):
     #     return self.filter(groups__name=CommonGroups.Admin)
 
@@ -73,6 +83,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     otp_base32 = models.CharField(max_length=255, blank=True, default="")
     otp_auth_url = models.CharField(max_length=255, blank=True, default="")
 
+    # Bumped whenever issued tokens must stop being trusted (password change, deactivation)
+    token_version = models.PositiveIntegerField(default=0)
+
     groups = models.ManyToManyField(
         "iam.Group",
         verbose_name="groups",
@@ -94,6 +107,10 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = "username"
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__original_is_active = self.__dict__.get("is_active")
+
     def __str__(self) -> str:
         return self.username
 
@@ -101,8 +118,59 @@ class User(AbstractBaseUser, PermissionsMixin):
     def is_staff(self):
         return self.is_superuser
 
+    def get_group_names(self) -> frozenset:
+        # Users built from a cached snapshot carry their group names, see iam.services.user_snapshots
+        if (group_names := getattr(self, "_group_names", None)) is None:
+            from ..services import effective_permissions
+
+            group_names = self._group_names = effective_permissions.get_effective_permissions(self).groups
+        return group_names
+
     def has_group(self, name):
-        return self.groups.filter(name=name).exists()
+        return name in self.get_group_names()
+
+    def has_perm(self, perm, obj=None):
+        """Answer model-level permission checks from the cached effective-permission bitmap."""
+        if obj is not None:
+            return super().has_perm(perm, obj)
+        if not self.is_active:
+            return False
+        if self.is_superuser:
+            return True
+
+        from ..services import effective_permissions
+
+        return effective_permissions.has_perm(self, perm)
+
+    def has_module_perms(self, app_label):
+        if not self.is_active:
+            return False
+        if self.is_superuser:
+            return True
+
+        from ..services import effective_permissions
+
+        return effective_permissions.has_module_perms(self, app_label)
+
+    def save(self, *args, **kwargs):
+        # set_password keeps the raw password until the save, while check_password clears it before saving a hash
+        # upgrade, which must not sign the user out
+        password_changed = self._password is not None
+        is_active_changed = (
+            self.__original_is_active is not None and self.__dict__.get("is_active") != self.__original_is_active
+        )
+        if not self._state.adding and (password_changed or is_active_changed):
+            self.token_version += 1
+            if (update_fields := kwargs.get("update_fields")) is not None:
+                kwargs["update_fields"] = {*update_fields, "token_version"}
+
+        super().save(*args, **kwargs)
+
+        self.__original_is_active = self.__dict__.get("is_active")
+
+    def bump_token_version(self):
+        User.objects.bump_token_version([self.pk])
+        self.token_version += 1
 
 
 class UserAvatar(ImageWithThumbnailMixin, models.Model):
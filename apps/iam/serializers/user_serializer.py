@@ -10,11 +10,12 @@ from rest_framework_simplejwt import serializers as jwt_serializers
 from rest_framework_simplejwt import tokens as jwt_tokens
 from rest_framework_simplejwt.serializers import PasswordField
 from rest_framework_simplejwt.settings import api_settings as jwt_api_settings
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from core.decorators import context_user_required
+from core.utils import get_client_ip
 
 from .. import jwt, models, notifications, tokens
+from ..services import login_attempts
 from ..services import otp as otp_services
 from ..services.users import get_role_names
 from ..utils import generate_otp_auth_token
@@ -81,7 +82,7 @@ class UserSignupSerializer(serializers.ModelSerializer):
             validated_data["password"],
         )
 
-        refresh = jwt_tokens.RefreshToken.for_user(user)
+        refresh = jwt.RefreshToken.for_user(user)
 
         if jwt_api_settings.UPDATE_LAST_LOGIN:
             update_last_login(None, user)
@@ -150,7 +151,7 @@ class UserAccountChangePasswordSerializer(serializers.Serializer):
         user.set_password(new_password)
         user.save()
 
-        refresh = jwt_tokens.RefreshToken.for_user(user)
+        refresh = jwt.RefreshToken.for_user(user)
 
         return {
             'access': str(refresh.access_token),
@@ -220,6 +221,7 @@ class PasswordResetConfirmationSerializer(serializers.Serializer):
 
 class CookieTokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
     username_field = get_user_model().USERNAME_FIELD
+    token_class = jwt.RefreshToken
 
     default_error_messages = {'no_active_account': _('No active account found with the given credentials')}
 
@@ -234,11 +236,28 @@ class CookieTokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer)
     refresh = serializers.CharField(read_only=True, default=None)
 
     def validate(self, attrs):
+        request = self.context["request"]
+        email = attrs[self.username_field]
+        ip_address = get_client_ip(request)
+        user_agent = request.META.get("HTTP_USER_AGENT", "")
+
+        if login_attempts.is_locked_out(email, ip_address):
+            login_attempts.record_login_attempt(
+                email, ip_address, success=False, user_agent=user_agent, failure_reason=login_attempts.LOCKED_OUT
+            )
+            raise exceptions.Throttled(
+                wait=settings.LOGIN_LOCKOUT_WINDOW, detail=_("Too many failed login attempts, try again later")
+            )
+
         try:
             data = super().validate(attrs)
         except exceptions.AuthenticationFailed as e:
+            login_attempts.record_login_attempt(
+                email, ip_address, success=False, user_agent=user_agent, failure_reason="invalid_credentials"
+            )
             raise exceptions.ValidationError(e.detail)
 
+        login_attempts.record_login_attempt(email, ip_address, success=True, user=self.user, user_agent=user_agent)
         return data
 
     def create(self, validated_data):
@@ -254,6 +273,7 @@ class CookieTokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
 
     default_error_messages = {
         'invalid_token': _('No valid token found in cookie \'refresh_token\' or field \'refresh\''),
+        'token_revoked': _('Token has been revoked'),
     }
 
     def validate(self, attrs):
@@ -264,10 +284,15 @@ class CookieTokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
             self.fail('invalid_token')
 
         try:
-            refresh = jwt_tokens.RefreshToken(raw_token)
+            refresh = jwt.RefreshToken(raw_token)
         except (jwt_exceptions.InvalidToken, jwt_exceptions.TokenError):
             self.fail('invalid_token')
 
+        # Tokens issued before a password change, deactivation or group change must not mint new ones
+        user = get_user_model().objects.filter(id=refresh.get(jwt_api_settings.USER_ID_CLAIM)).first()
+        if user is None or not user.is_active or refresh.get(jwt.TOKEN_VERSION_CLAIM, 0) != user.token_version:
+            self.fail('token_revoked')
+
         if jwt_api_settings.ROTATE_REFRESH_TOKENS:
             if jwt_api_settings.BLACKLIST_AFTER_ROTATION:
                 try:
@@ -275,8 +300,7 @@ class CookieTokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
                 except AttributeError:
                     pass
 
-            user = get_user_model().objects.get(id=refresh[jwt_api_settings.USER_ID_CLAIM])
-            new_refresh = jwt_tokens.RefreshToken.for_user(user)
+            new_refresh = jwt.RefreshToken.for_user(user)
 
             return {'access': str(new_refresh.access_token), 'refresh': str(new_refresh)}
 
@@ -299,7 +323,7 @@ class LogoutSerializer(serializers.Serializer):
             self.fail('invalid_token')
 
         try:
-            refresh = jwt_tokens.RefreshToken(raw_token)
+            refresh = jwt.RefreshToken(raw_token)
         except (jwt_exceptions.InvalidToken, jwt_exceptions.TokenError):
             self.fail('invalid_token')
 
@@ -369,7 +393,7 @@ class ValidateOTPSerializer(serializers.Serializer):
         return attrs
 
     def create(self, validated_data):
-        refresh = RefreshToken.for_user(self.user)
+        refresh = jwt.RefreshToken.for_user(self.user)
         return {"refresh": str(refresh), "access": str(refresh.access_token)}
 
 
@@ -0,0 +1,160 @@
+"""
+Login attempt recording and lockout.
+
+Attempts are not inserted one by one: they are appended to a buffer (a Redis list, or process memory without Redis)
+and written with `bulk_create` by the `flush_login_attempts` periodic task. Lockout decisions come from sliding-window
+counters of failed attempts per email and per IP address, never from COUNT queries on the login_attempts table.
+"""
+
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.rate_limit import SlidingWindowCounter
+from core.redis import get_redis_connection
+
+from ..models import LoginAttempt, User
+
+BUFFER_KEY = "iam:login_attempts:buffer"
+LOCKED_OUT = "locked_out"
+
+logger = logging.getLogger(__name__)
+
+failed_logins_by_email = SlidingWindowCounter("iam:failed_logins:email", window=settings.LOGIN_LOCKOUT_WINDOW)
+failed_logins_by_ip = SlidingWindowCounter("iam:failed_logins:ip", window=settings.LOGIN_LOCKOUT_WINDOW)
+
+_local_buffer = []
+_local_buffer_lock = threading.Lock()
+
+
+def is_locked_out(email: str, ip_address: str) -> bool:
+    return (
+        failed_logins_by_email.count(email.lower()) >= settings.LOGIN_LOCKOUT_MAX_FAILURES_PER_EMAIL
+        or failed_logins_by_ip.count(ip_address) >= settings.LOGIN_LOCKOUT_MAX_FAILURES_PER_IP
+    )
+
+
+def record_login_attempt(
+    email: str, ip_address: str, success: bool, user=None, user_agent: str = "", failure_reason: str = ""
+):
+    """
+    Buffer a login attempt for the next flush and update the lockout counters.
+
+    Attempts rejected by the lockout itself are recorded but not counted, so the counters stay bounded during an
+    attack and the lockout expires LOGIN_LOCKOUT_WINDOW seconds after the last real credential check.
+    """
+    if success:
+        failed_logins_by_email.reset(email.lower())
+    elif failure_reason != LOCKED_OUT:
+        failed_logins_by_email.hit(email.lower())
+        failed_logins_by_ip.hit(ip_address)
+
+    attempt = {
+        "user_id": str(user.pk) if user is not None else None,
+        # The identifier is whatever the client sent, it must not fail the batch insert for being too long
+        "email": _truncate("email", email),
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "success": success,
+        "failure_reason": _truncate("failure_reason", failure_reason),
+        "created_at": timezone.now().isoformat(),
+    }
+
+    if (redis := get_redis_connection()) is None:
+        with _local_buffer_lock:
+            _local_buffer.append(attempt)
+            should_flush = len(_local_buffer) >= settings.LOGIN_ATTEMPT_FLUSH_BATCH_SIZE
+        if should_flush:
+            flush_login_attempts()
+        return
+
+    pipeline = redis.pipeline()
+    pipeline.rpush(BUFFER_KEY, json.dumps(attempt))
+    # Under a credential stuffing attack the buffer must not grow without bound if flushing falls behind
+    pipeline.ltrim(BUFFER_KEY, -settings.LOGIN_ATTEMPT_BUFFER_MAX_LENGTH, -1)
+    pipeline.execute()
+
+
+def _truncate(field_name: str, value: str) -> str:
+    return value[: LoginAttempt._meta.get_field(field_name).max_length]
+
+
+def _pop_batch(batch_size: int) -> list[dict]:
+    if (redis := get_redis_connection()) is None:
+        with _local_buffer_lock:
+            batch = _local_buffer[:batch_size]
+            del _local_buffer[:batch_size]
+        return batch
+
+    pipeline = redis.pipeline(transaction=True)
+    pipeline.lrange(BUFFER_KEY, 0, batch_size - 1)
+    pipeline.ltrim(BUFFER_KEY, batch_size, -1)
+    entries, _ = pipeline.execute()
+    return [json.loads(entry) for entry in entries]
+
+
+def _requeue(batch: list[dict]):
+    if (redis := get_redis_connection()) is None:
+        with _local_buffer_lock:
+            _local_buffer[:0] = batch
+        return
+
+    redis.lpush(BUFFER_KEY, *(json.dumps(attempt) for attempt in reversed(batch)))
+
+
+def _write_one_by_one(batch: list[dict], attempts: list[LoginAttempt]) -> int:
+    """Write the attempts of a failed batch separately, dropping the ones the database rejects."""
+    written = 0
+    for index, attempt in enumerate(attempts):
+        try:
+            with transaction.atomic():
+                attempt.save(force_insert=True)
+        except (DataError, IntegrityError) as e:
+            # Requeueing a row the database rejects would fail every later flush
+            logger.error(f"Dropping a login attempt the database rejected: {e}")
+        except Exception:
+            _requeue(batch[index:])
+            raise
+        else:
+            written += 1
+    return written
+
+
+def flush_login_attempts(batch_size: int | None = None) -> int:
+    """Write buffered login attempts to the database in batches; returns the number of attempts written."""
+    batch_size = batch_size or settings.LOGIN_ATTEMPT_FLUSH_BATCH_SIZE
+    flushed = 0
+
+    while batch := _pop_batch(batch_size):
+        # Users deleted since the attempt was buffered would fail the whole batch on the foreign key
+        user_ids = {attempt["user_id"] for attempt in batch} - {None}
+        existing_user_ids = {str(pk) for pk in User.objects.filter(pk__in=user_ids).values_list("pk", flat=True)}
+        attempts = [
+            LoginAttempt(
+                **{
+                    **attempt,
+                    "user_id": attempt["user_id"] if attempt["user_id"] in existing_user_ids else None,
+                    "created_at": parse_datetime(attempt["created_at"]),
+                }
+            )
+            for attempt in batch
+        ]
+
+        try:
+            with transaction.atomic():
+                LoginAttempt.objects.bulk_create(attempts)
+        except (DataError, IntegrityError) as e:
+            logger.warning(f"Batch of {len(attempts)} login attempts failed, writing them one by one: {e}")
+            flushed += _write_one_by_one(batch, attempts)
+        except Exception:
+            _requeue(batch)
+            raise
+        else:
+            flushed += len(batch)
+
+    return flushed
@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from ..models import User
+
+# Only non-sensitive fields are cached; everything else (e.g. password) stays deferred on snapshot users and is
+# loaded from the database on first access
+SNAPSHOT_FIELDS = (
+    "id",
+    "last_login",
+    "created",
+    "username",
+    "email",
+    "is_confirmed",
+    "is_active",
+    "is_superuser",
+    "otp_enabled",
+    "otp_verified",
+    "token_version",
+)
+
+
+def _snapshot_key(user_id) -> str:
+    # Accepts hashids (token claims), Hashid objects and raw integer ids alike
+    return f"iam:user_snapshot:{User._meta.pk.get_prep_value(user_id)}"
+
+
+def _snapshot_fields(user: User) -> dict:
+    snapshot = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+    snapshot["id"] = user.pk.id
+    return snapshot
+
+
+def make_user_snapshot(user: User) -> dict:
+    snapshot = _snapshot_fields(user)
+    snapshot["groups"] = list(user.groups.values_list("name", flat=True))
+    return snapshot
+
+
+async def amake_user_snapshot(user: User) -> dict:
+    snapshot = _snapshot_fields(user)
+    snapshot["groups"] = [name async for name in user.groups.values_list("name", flat=True)]
+    return snapshot
+
+
+def get_user_snapshot(user_id) -> dict | None:
+    """
+    Return the cached snapshot of a user, loading it from the database on a cache miss.
+
+    Returns None if the user does not exist.
+    """
+    try:
+        snapshot_key = _snapshot_key(user_id)
+    except ValueError:
+        return None
+
+    if (snapshot := cache.get(snapshot_key)) is not None:
+        return snapshot
+
+    try:
+        user = User.objects.only(*SNAPSHOT_FIELDS).get(pk=user_id)
+    except User.DoesNotExist:
+        return None
+
+    snapshot = make_user_snapshot(user)
+    cache.set(snapshot_key, snapshot, timeout=settings.JWT_USER_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+async def aget_user_snapshot(user_id) -> dict | None:
+    """Async variant of `get_user_snapshot`, for use in ASGI code paths such as the WebSocket handshake."""
+    try:
+        snapshot_key = _snapshot_key(user_id)
+    except ValueError:
+        return None
+
+    if (snapshot := await cache.aget(snapshot_key)) is not None:
+        return snapshot
+
+    try:
+        user = await User.objects.only(*SNAPSHOT_FIELDS).aget(pk=user_id)
+    except User.DoesNotExist:
+        return None
+
+    snapshot = await amake_user_snapshot(user)
+    await cache.aset(snapshot_key, snapshot, timeout=settings.JWT_USER_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def invalidate_user_snapshots(user_ids):
+    cache.delete_many([_snapshot_key(user_id) for user_id in user_ids])
+
+
+def user_from_snapshot(snapshot: dict) -> User:
+    """
+    Build a User instance from a snapshot without hitting the database.
+
+    The instance behaves like a user loaded with `.only(*SNAPSHOT_FIELDS)`: it can be used in queries and saved,
+    and the remaining fields are fetched lazily if they are ever accessed.
+    """
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in snapshot]
+    user = User.from_db(DEFAULT_DB_ALIAS, field_names, [snapshot[name] for name in field_names])
+    user._group_names = frozenset(snapshot["groups"])
+    return user
@@ -0,0 +1,112 @@
+from django.contrib.auth.models import Permission as BasePermission
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .. import jwt
+from ..models import Group, Permission, User
+from ..services import effective_permissions, user_snapshots
+
+
+def invalidate_permissions_on_commit(user_ids):
+    # Invalidating before the commit would let a concurrent request cache the old assignments under the new version
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: effective_permissions.invalidate_users(user_ids))
+
+
+def invalidate_user_caches_on_commit(user_ids):
+    # Group changes only drop the cached snapshots (which carry the group names) and permissions; issued tokens stay
+    # valid, so they do not sign the users out
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: user_snapshots.invalidate_user_snapshots(user_ids))
+    invalidate_permissions_on_commit(user_ids)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_snapshot(sender, instance: User, created=False, **kwargs):
+    user_snapshots.invalidate_user_snapshots([instance.pk])
+    if created:
+        # Drops entries left by a deleted user with the same id; nobody else sees the new user before the commit
+        effective_permissions.invalidate_users([instance.pk])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_user_caches_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        # user.groups.add/remove/clear()
+        instance.__dict__.pop("_group_names", None)
+        user_ids = [instance.pk]
+    elif action == "pre_clear":
+        # group.user_set.clear()
+        user_ids = instance.user_set.values_list("pk", flat=True)
+    else:
+        # group.user_set.add/remove()
+        user_ids = pk_set
+
+    invalidate_user_caches_on_commit(user_ids)
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_permissions_on_user_permission_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        # user.user_permissions.add/remove/clear()
+        user_ids = [instance.pk]
+    elif action == "pre_clear":
+        # permission.user_set.clear()
+        user_ids = instance.user_set.values_list("pk", flat=True)
+    else:
+        # permission.user_set.add/remove()
+        user_ids = pk_set
+
+    invalidate_permissions_on_commit(user_ids)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_permissions_on_group_permission_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        # group.permissions.add/remove/clear()
+        users = User.objects.filter(groups__pk=instance.pk)
+    elif action == "pre_clear":
+        # permission.group_set.clear()
+        users = User.objects.filter(groups__permissions=instance)
+    else:
+        # permission.group_set.add/remove()
+        users = User.objects.filter(groups__pk__in=pk_set)
+
+    invalidate_permissions_on_commit(users.values_list("pk", flat=True).distinct())
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_user_caches_on_group_delete(sender, instance: Group, **kwargs):
+    invalidate_user_caches_on_commit(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver([post_save, post_delete], sender=BasePermission)
+@receiver([post_save, post_delete], sender=Permission)
+def invalidate_permission_catalog(sender, **kwargs):
+    effective_permissions.invalidate_catalog()
+
+
+@receiver(post_migrate)
+def invalidate_permission_catalog_after_migrate(sender, **kwargs):
+    # Default permissions are created with bulk_create, which sends no post_save
+    effective_permissions.invalidate_catalog()
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def mark_jti_revoked(sender, instance: BlacklistedToken, created, **kwargs):
+    # Tokens blacklisted outside iam.jwt, e.g. from the admin
+    if created:
+        jwt.mark_revoked([instance.token.jti])
@@ -0,0 +1,24 @@
+import factory
+from django.conf import settings
+
+from core.acl.helpers import CommonGroups
+
+from .. import models
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    username = factory.Sequence(lambda n: f"user{n}@example.com")
+    email = factory.LazyAttribute(lambda user: user.username)
+    password = factory.django.Password("secret")
+    is_confirmed = True
+
+    class Meta:
+        model = models.User
+        skip_postgeneration_save = True
+
+    @factory.post_generation
+    def admin(self, create, extracted, **kwargs):
+        if not create:
+            return
+        group_names = [settings.DEFAULT_USER_GROUP, *([CommonGroups.Admin] if extracted else [])]
+        self.groups.add(*(models.Group.objects.get_or_create(name=name)[0] for name in group_names))
@@ -0,0 +1,73 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from ..backends import EmailBackend
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_failed_logins():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def authenticate(username, password):
+    return EmailBackend().authenticate(None, username=username, password=password)
+
+
+class TestEmailBackend:
+    def test_authenticates_with_a_single_query(self, user_factory, django_assert_num_queries):
+        user = user_factory()
+
+        with django_assert_num_queries(1):
+            assert authenticate(user.email, "secret") == user
+
+    def test_email_takes_precedence_over_username(self, user_factory):
+        user = user_factory(username="alice", email="alice@example.com")
+        user_factory(username="alice@example.com", email="other@example.com")
+
+        assert authenticate("alice@example.com", "secret") == user
+        assert authenticate("alice", "secret") == user
+
+    def test_unknown_user_hashes_password_once(self, mocker):
+        set_password = mocker.spy(User, "set_password")
+
+        assert authenticate("unknown@example.com", "secret") is None
+        assert authenticate("unknown@example.com", "secret") is None
+
+        set_password.assert_called_once()
+
+    def test_wrong_password_is_remembered(self, user_factory, mocker):
+        user = user_factory()
+        check_password = mocker.spy(User, "check_password")
+
+        assert authenticate(user.email, "wrong") is None
+        assert authenticate(user.email, "wrong") is None
+
+        assert check_password.call_count == 1
+        assert authenticate(user.email, "secret") == user
+
+    def test_password_change_forgets_failures(self, user_factory):
+        user = user_factory()
+        assert authenticate(user.email, "changed") is None
+
+        user.set_password("changed")
+        user.save()
+
+        assert authenticate(user.email, "changed") == user
+
+    def test_inactive_user_is_rejected(self, user_factory):
+        user = user_factory(is_active=False)
+
+        assert authenticate(user.email, "secret") is None
+
+    def test_missing_credentials(self, user_factory):
+        user = user_factory()
+
+        assert authenticate(user.email, None) is None
+        assert authenticate(None, "secret") is None
@@ -0,0 +1,61 @@
+import pytest
+from django.core.cache import cache
+
+from core.acl.helpers import CommonGroups
+
+from ..models import Group
+from ..services import effective_permissions
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_permission_cache():
+    cache.clear()
+    effective_permissions.permission_cache.clear_local()
+    yield
+    effective_permissions.permission_cache.clear_local()
+
+
+def get_groups(user):
+    return effective_permissions.get_effective_permissions(user).groups
+
+
+class TestInvalidation:
+    def test_group_change_invalidates_on_commit(self, user_factory, django_capture_on_commit_callbacks):
+        user = user_factory()
+        admin_group = Group.objects.get_or_create(name=CommonGroups.Admin)[0]
+        assert CommonGroups.Admin not in get_groups(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user.groups.add(admin_group)
+            # A request reading before the commit must not cache the old groups under a new version
+            assert CommonGroups.Admin not in get_groups(user)
+
+        assert CommonGroups.Admin in get_groups(user)
+
+    def test_group_members_change_invalidates_on_commit(self, user_factory, django_capture_on_commit_callbacks):
+        users = user_factory.create_batch(2)
+        admin_group = Group.objects.get_or_create(name=CommonGroups.Admin)[0]
+        assert not any(CommonGroups.Admin in get_groups(user) for user in users)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_group.user_set.add(*users)
+
+        assert all(CommonGroups.Admin in get_groups(user) for user in users)
+
+    def test_invalidates_users_with_a_single_cache_write(self, user_factory, mocker, django_assert_num_queries):
+        users = user_factory.create_batch(3)
+        for user in users:
+            get_groups(user)
+        set_many = mocker.spy(cache, "set_many")
+        incr = mocker.spy(cache, "incr")
+
+        effective_permissions.invalidate_users([user.pk for user in users])
+
+        set_many.assert_called_once()
+        incr.assert_not_called()
+        # Group names and direct permissions of each user are loaded again
+        with django_assert_num_queries(2 * len(users)):
+            for user in users:
+                get_groups(user)
@@ -0,0 +1,254 @@
+from importlib import import_module
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .. import jwt
+from ..models import Group
+from ..authentication import JSONWebTokenAuthentication, JSONWebTokenCookieMiddleware
+from ..serializers.user_serializer import CookieTokenRefreshSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+def refresh_tokens(refresh):
+    request = APIRequestFactory().post("/")
+    request.COOKIES[settings.REFRESH_TOKEN_COOKIE] = str(refresh)
+    serializer = CookieTokenRefreshSerializer(data={}, context={"request": request})
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+@pytest.fixture(autouse=True)
+def clear_jti_states():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestCookieTokenRefreshSerializer:
+    def test_rotates_tokens_at_current_version(self, user_factory):
+        user = user_factory()
+
+        data = refresh_tokens(jwt.RefreshToken.for_user(user))
+
+        assert jwt.RefreshToken(data["refresh"])[jwt.TOKEN_VERSION_CLAIM] == user.token_version
+
+    def test_rejects_tokens_issued_before_password_change(self, user_factory):
+        user = user_factory()
+        refresh = jwt.RefreshToken.for_user(user)
+        user.set_password("changed")
+        user.save()
+
+        with pytest.raises(ValidationError, match="revoked"):
+            refresh_tokens(refresh)
+
+    def test_keeps_tokens_valid_on_password_hash_upgrade(self, user_factory, settings):
+        user = user_factory()
+        user.set_password("secret")
+        user.save()
+        refresh = jwt.RefreshToken.for_user(user)
+        settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher", *settings.PASSWORD_HASHERS]
+
+        assert user.check_password("secret")
+
+        user.refresh_from_db()
+        assert user.password.startswith("md5$")
+        refresh_tokens(refresh)
+
+    def test_keeps_tokens_valid_on_group_change(self, user_factory, django_capture_on_commit_callbacks):
+        user = user_factory()
+        refresh = jwt.RefreshToken.for_user(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user.groups.add(Group.objects.create(name="editors"))
+            Group.objects.get(name="editors").delete()
+
+        refresh_tokens(refresh)
+
+    def test_rejects_tokens_after_version_bump(self, user_factory):
+        user = user_factory()
+        refresh = jwt.RefreshToken.for_user(user)
+        user.bump_token_version()
+
+        with pytest.raises(ValidationError, match="revoked"):
+            refresh_tokens(refresh)
+
+    def test_rejects_tokens_of_inactive_users(self, user_factory):
+        user = user_factory()
+        refresh = jwt.RefreshToken.for_user(user)
+        type(user).objects.filter(pk=user.pk).update(is_active=False)
+
+        with pytest.raises(ValidationError, match="revoked"):
+            refresh_tokens(refresh)
+
+    def test_rejected_token_is_not_blacklisted(self, user_factory):
+        user = user_factory()
+        refresh = jwt.RefreshToken.for_user(user)
+        user.bump_token_version()
+
+        with pytest.raises(ValidationError):
+            refresh_tokens(refresh)
+
+        assert not jwt.is_revoked(refresh["jti"])
+
+
+class TestJSONWebTokenAuthentication:
+    @pytest.mark.parametrize("stateless", [True, False])
+    def test_rejects_access_tokens_of_an_older_version(self, user_factory, settings, stateless):
+        settings.JWT_STATELESS_USER_ENABLED = stateless
+        user = user_factory()
+        access = JSONWebTokenAuthentication().get_validated_token(str(jwt.RefreshToken.for_user(user).access_token))
+        assert JSONWebTokenAuthentication().get_user(access).pk == user.pk
+
+        user.bump_token_version()
+
+        with pytest.raises(AuthenticationFailed):
+            JSONWebTokenAuthentication().get_user(access)
+
+    def test_group_change_refreshes_cached_snapshot(self, user_factory, settings, django_capture_on_commit_callbacks):
+        settings.JWT_STATELESS_USER_ENABLED = True
+        user = user_factory()
+        access = JSONWebTokenAuthentication().get_validated_token(str(jwt.RefreshToken.for_user(user).access_token))
+        assert not JSONWebTokenAuthentication().get_user(access).has_group("editors")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user.groups.add(Group.objects.create(name="editors"))
+
+        assert JSONWebTokenAuthentication().get_user(access).has_group("editors")
+
+
+class TestTokenBlacklist:
+    def test_valid_state_is_cached(self, user_factory, django_assert_num_queries):
+        jti = jwt.RefreshToken.for_user(user_factory())["jti"]
+        assert not jwt.is_revoked(jti)
+
+        with django_assert_num_queries(0):
+            assert not jwt.is_revoked(jti)
+
+    def test_revoked_state_is_cached(self, user_factory, django_assert_num_queries):
+        refresh = jwt.RefreshToken.for_user(user_factory())
+        assert not jwt.is_revoked(refresh["jti"])
+
+        refresh.blacklist()
+
+        with django_assert_num_queries(0):
+            assert jwt.is_revoked(refresh["jti"])
+            with pytest.raises(TokenError):
+                refresh.check_blacklist()
+
+    def test_revocation_from_the_database_is_cached(self, user_factory, django_assert_num_queries):
+        refresh = jwt.RefreshToken.for_user(user_factory())
+        # Skips the post_save receiver, like a token blacklisted by another deployment
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=OutstandingToken.objects.get(jti=refresh["jti"]))])
+
+        assert jwt.is_revoked(refresh["jti"])
+        with django_assert_num_queries(0):
+            assert jwt.is_revoked(refresh["jti"])
+
+    def test_blacklisting_outside_iam_invalidates_cached_state(self, user_factory, django_assert_num_queries):
+        refresh = jwt.RefreshToken.for_user(user_factory())
+        assert not jwt.is_revoked(refresh["jti"])
+
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=refresh["jti"]))
+
+        with django_assert_num_queries(0):
+            assert jwt.is_revoked(refresh["jti"])
+
+    def test_blacklist_user_tokens(self, user_factory, django_assert_num_queries):
+        user = user_factory()
+        refresh_tokens = [jwt.RefreshToken.for_user(user) for _ in range(3)]
+        other_user_refresh = jwt.RefreshToken.for_user(user_factory())
+        expired = jwt.RefreshToken.for_user(user)
+        OutstandingToken.objects.filter(jti=expired["jti"]).update(expires_at=timezone.now())
+        # Already blacklisted tokens conflict with the bulk insert
+        refresh_tokens[0].blacklist()
+        for refresh in refresh_tokens:
+            assert jwt.is_revoked(refresh["jti"]) == (refresh is refresh_tokens[0])
+
+        with django_assert_num_queries(2):
+            jwt.blacklist_user_tokens(user)
+
+        assert all(jwt.is_revoked(refresh["jti"]) for refresh in refresh_tokens)
+        assert set(BlacklistedToken.objects.values_list("token__jti", flat=True)) == {
+            refresh["jti"] for refresh in refresh_tokens
+        }
+        assert not jwt.is_revoked(other_user_refresh["jti"])
+
+    def test_blacklist_user_tokens_without_tokens(self, user_factory, django_assert_num_queries):
+        user = user_factory()
+
+        with django_assert_num_queries(1):
+            jwt.blacklist_user_tokens(user)
+
+
+def connect(cookies=None, session=None):
+    """The user JSONWebTokenCookieMiddleware puts in the scope of a WebSocket connection."""
+    connected = {}
+
+    async def app(scope, receive, send):
+        connected["user"] = scope["user"]
+
+    scope = {"type": "websocket", "headers": []}
+    if cookies:
+        cookie = "; ".join(f"{name}={value}" for name, value in cookies.items())
+        scope["headers"].append((b"cookie", cookie.encode()))
+    if session is not None:
+        scope["session"] = session
+
+    async_to_sync(JSONWebTokenCookieMiddleware(app))(scope, None, None)
+    return connected["user"]
+
+
+def login_session(user):
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    return session
+
+
+class TestJSONWebTokenCookieMiddleware:
+    @pytest.mark.parametrize("stateless", [True, False])
+    def test_authenticates_access_token_cookie(self, user_factory, settings, stateless):
+        settings.JWT_STATELESS_USER_ENABLED = stateless
+        user = user_factory()
+        access = jwt.RefreshToken.for_user(user).access_token
+
+        assert connect({settings.ACCESS_TOKEN_COOKIE: str(access)}).pk == user.pk
+
+    @pytest.mark.parametrize("stateless", [True, False])
+    def test_revoked_access_token_is_anonymous(self, user_factory, settings, stateless):
+        settings.JWT_STATELESS_USER_ENABLED = stateless
+        user = user_factory()
+        access = jwt.RefreshToken.for_user(user).access_token
+        user.bump_token_version()
+
+        assert connect({settings.ACCESS_TOKEN_COOKIE: str(access)}).is_anonymous
+
+    def test_falls_back_to_session(self, user_factory):
+        user = user_factory()
+
+        assert connect(session=login_session(user)).pk == user.pk
+        assert connect({settings.ACCESS_TOKEN_COOKIE: "invalid"}, session=login_session(user)).pk == user.pk
+
+    def test_token_takes_precedence_over_session(self, user_factory, mocker):
+        user = user_factory()
+        session = login_session(user_factory())
+        get_session_user = mocker.patch("iam.authentication.get_session_user")
+
+        access = jwt.RefreshToken.for_user(user).access_token
+
+        assert connect({settings.ACCESS_TOKEN_COOKIE: str(access)}, session).pk == user.pk
+        get_session_user.assert_not_called()
+
+    def test_without_token_nor_session_is_anonymous(self):
+        assert connect().is_anonymous
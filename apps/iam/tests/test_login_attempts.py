@@ -0,0 +1,123 @@
+import pytest
+
+from ..models import LoginAttempt
+from ..services import login_attempts
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def local_buffers(settings):
+    settings.REDIS_CONNECTION = None
+    settings.LOGIN_LOCKOUT_MAX_FAILURES_PER_EMAIL = 3
+    settings.LOGIN_LOCKOUT_MAX_FAILURES_PER_IP = 5
+    settings.LOGIN_ATTEMPT_FLUSH_BATCH_SIZE = 100
+    for counter in (login_attempts.failed_logins_by_email, login_attempts.failed_logins_by_ip):
+        counter._local.clear()
+    login_attempts._local_buffer.clear()
+    yield
+    login_attempts._local_buffer.clear()
+
+
+def fail(email, ip_address="203.0.113.7", **kwargs):
+    login_attempts.record_login_attempt(email, ip_address, success=False, failure_reason="invalid_credentials", **kwargs)
+
+
+class TestLockout:
+    def test_locks_out_email_after_max_failures(self):
+        for _ in range(3):
+            assert not login_attempts.is_locked_out("user@example.com", "203.0.113.7")
+            fail("User@example.com", ip_address="203.0.113.7")
+
+        assert login_attempts.is_locked_out("user@example.com", "198.51.100.2")
+        assert not login_attempts.is_locked_out("other@example.com", "198.51.100.2")
+
+    def test_locks_out_ip_after_max_failures(self):
+        for index in range(5):
+            fail(f"user{index}@example.com")
+
+        assert login_attempts.is_locked_out("new@example.com", "203.0.113.7")
+        assert not login_attempts.is_locked_out("new@example.com", "198.51.100.2")
+
+    def test_success_resets_email_failures(self, user_factory):
+        user = user_factory()
+        fail(user.email)
+        fail(user.email)
+
+        login_attempts.record_login_attempt(user.email, "203.0.113.7", success=True, user=user)
+        fail(user.email)
+
+        assert not login_attempts.is_locked_out(user.email, "198.51.100.2")
+
+    def test_locked_out_attempts_are_not_counted(self):
+        for _ in range(3):
+            fail("user@example.com")
+
+        for _ in range(10):
+            login_attempts.record_login_attempt(
+                "user@example.com", "198.51.100.2", success=False, failure_reason=login_attempts.LOCKED_OUT
+            )
+
+        assert login_attempts.failed_logins_by_email.count("user@example.com") == 3
+        assert not login_attempts.is_locked_out("other@example.com", "198.51.100.2")
+
+
+class TestFlushLoginAttempts:
+    def test_writes_buffered_attempts_in_batches(self, user_factory, django_assert_max_num_queries):
+        user = user_factory()
+        for index in range(5):
+            fail(f"user{index}@example.com")
+        login_attempts.record_login_attempt(user.email, "203.0.113.7", success=True, user=user)
+        assert not LoginAttempt.objects.exists()
+
+        # One user lookup and one INSERT per batch, the INSERT inside a savepoint
+        with django_assert_max_num_queries(4 * 3):
+            assert login_attempts.flush_login_attempts(batch_size=2) == 6
+
+        assert LoginAttempt.objects.count() == 6
+        assert LoginAttempt.objects.get(success=True).user_id == user.pk
+        assert login_attempts.flush_login_attempts() == 0
+
+    def test_flushes_when_buffer_is_full(self, settings):
+        settings.LOGIN_ATTEMPT_FLUSH_BATCH_SIZE = 3
+
+        for index in range(3):
+            fail(f"user{index}@example.com")
+
+        assert LoginAttempt.objects.count() == 3
+
+    def test_drops_deleted_users(self, user_factory):
+        user = user_factory()
+        login_attempts.record_login_attempt(user.email, "203.0.113.7", success=True, user=user)
+        user.delete()
+
+        login_attempts.flush_login_attempts()
+
+        assert LoginAttempt.objects.get().user_id is None
+
+    def test_requeues_batch_when_write_fails(self, mocker):
+        fail("user@example.com")
+        mocker.patch.object(LoginAttempt.objects, "bulk_create", side_effect=RuntimeError("Database unavailable"))
+
+        with pytest.raises(RuntimeError):
+            login_attempts.flush_login_attempts()
+
+        assert len(login_attempts._local_buffer) == 1
+
+    def test_truncates_long_identifiers(self):
+        fail("x" * 300)
+
+        login_attempts.flush_login_attempts()
+
+        assert LoginAttempt.objects.get().email == "x" * LoginAttempt._meta.get_field("email").max_length
+
+    def test_drops_rejected_attempts_and_writes_the_rest(self):
+        for email in ("first@example.com", "rejected@example.com", "last@example.com"):
+            fail(email)
+        login_attempts._local_buffer[1]["success"] = None
+
+        assert login_attempts.flush_login_attempts() == 2
+
+        assert set(LoginAttempt.objects.values_list("email", flat=True)) == {"first@example.com", "last@example.com"}
+        assert not login_attempts._local_buffer
+        assert login_attempts.flush_login_attempts() == 0
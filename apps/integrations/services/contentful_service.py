@@ -1,22 +1,53 @@
+import itertools
 import logging
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from typing import Any
 
 from django.conf import settings
+from django.utils.module_loading import import_string
+
+from core.prefetch import prefetch
+
+from .contentful_sync import sync_token_from_url
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class SyncChanges:
+    """
+    A page of changes returned by the Sync API; an initial sync lists every published entry. Only the last page has a
+    `next_sync_token`.
+    """
+
+    next_sync_token: str
+    initial: bool
+    entries: list[dict[str, Any]] = field(default_factory=list)
+    deleted_ids: list[str] = field(default_factory=list)
+
+
 class ContentfulService:
     """Service for interacting with Contentful CMS."""
 
-    def __init__(self):
+    def __init__(self, sync_client=None):
+        self.space_id = getattr(settings, "CONTENTFUL_SPACE_ID", None)
+        self.access_token = getattr(settings, "CONTENTFUL_ACCESS_TOKEN", None)
+        self.environment = getattr(settings, "CONTENTFUL_ENVIRONMENT", "master")
+
+        # The Sync API is called over plain HTTP, it does not need the contentful package
+        self.sync_client = sync_client
+        if self.sync_client is None and self.space_id and self.access_token:
+            self.sync_client = import_string(settings.CONTENTFUL_SYNC_CLIENT)(
+                base_url=settings.CONTENTFUL_API_URL,
+                space_id=self.space_id,
+                environment=self.environment,
+                access_token=self.access_token,
+            )
+
         try:
             import contentful
 
-            self.space_id = getattr(settings, "CONTENTFUL_SPACE_ID", None)
-            self.access_token = getattr(settings, "CONTENTFUL_ACCESS_TOKEN", None)
-            self.environment = getattr(settings, "CONTENTFUL_ENVIRONMENT", "master")
-
             if self.space_id and self.access_token:
                 self.client = contentful.Client(self.space_id, self.access_token, environment=self.environment)
             else:
@@ -61,30 +92,81 @@ class ContentfulService:
             return []
 
     def get_all_entries(self) -> list[dict[str, Any]]:
-        """Get all entries from Contentful."""
+        """Get all entries from Contentful; `iter_entry_pages` processes them without holding them all in memory."""
         if not self.is_configured():
             return []
 
         try:
-            all_entries = []
-            skip = 0
-            limit = 1000
-
-            while True:
-                entries = self.client.entries({"skip": skip, "limit": limit, "include": 0})
-                if not entries:
-                    break
-                all_entries.extend([self._serialize_entry(entry) for entry in entries])
-                skip += limit
-
-                if len(entries) < limit:
-                    break
-
-            return all_entries
+            return list(itertools.chain.from_iterable(self.iter_entry_pages()))
         except Exception as e:
             logger.error(f"Error fetching all entries: {e}")
             return []
 
+    def iter_entry_pages(self, page_size: int = 1000) -> Iterator[list[dict[str, Any]]]:
+        """
+        Yield all entries page by page. The next page is fetched and serialized on a background thread while the
+        current one is processed, so at most three pages are held in memory. Errors are raised.
+        """
+        if not self.is_configured():
+            return iter(())
+        return prefetch(self._fetch_entry_pages(page_size))
+
+    def _fetch_entry_pages(self, page_size: int) -> Iterator[list[dict[str, Any]]]:
+        skip = 0
+        while True:
+            entries = self.client.entries({"skip": skip, "limit": page_size, "include": 0})
+            if not entries:
+                return
+            yield [self._serialize_entry(entry) for entry in entries]
+            if len(entries) < page_size:
+                return
+            skip += page_size
+
+    def sync(self, sync_token: str | None = None) -> Iterator[SyncChanges]:
+        """
+        Yield the entries published and deleted since `sync_token` was returned, or every published entry without it,
+        page by page; the next page is fetched on a background thread while the current one is processed. Errors are
+        raised: the caller must not store a new sync token when some changes could not be fetched.
+        """
+        if self.sync_client is None:
+            raise RuntimeError("Contentful credentials not configured")
+        return prefetch(self._fetch_sync_pages(sync_token))
+
+    def _fetch_sync_pages(self, sync_token: str | None) -> Iterator[SyncChanges]:
+        initial = not sync_token
+        params = {"initial": "true", "type": "Entry"} if initial else {"sync_token": sync_token}
+        while True:
+            page = self.sync_client.get_page(params)
+            changes = SyncChanges(next_sync_token="", initial=initial)
+            for item in page["items"]:
+                item_type = item["sys"]["type"]
+                if item_type == "Entry":
+                    changes.entries.append(self._serialize_sync_entry(item))
+                elif item_type == "DeletedEntry":
+                    changes.deleted_ids.append(item["sys"]["id"])
+
+            if "nextPageUrl" not in page:
+                changes.next_sync_token = sync_token_from_url(page["nextSyncUrl"])
+                yield changes
+                return
+            yield changes
+            params = {"sync_token": sync_token_from_url(page["nextPageUrl"])}
+
+    def fetch_entries(self, entry_ids: list[str]) -> list[dict[str, Any]]:
+        """
+        Fetch the published entries among `entry_ids`, serialized like the entries of `sync`; unpublished and deleted
+        entries are missing from the result. Errors are raised.
+        """
+        if self.sync_client is None:
+            raise RuntimeError("Contentful credentials not configured")
+
+        entries = []
+        # Ids are sent in the query string, which the Content Delivery API limits in length
+        for chunk in itertools.batched(entry_ids, 100):
+            items = self.sync_client.get_entries(list(chunk))["items"]
+            entries.extend(self._serialize_sync_entry(item) for item in items)
+        return entries
+
     def get_content_types(self) -> list[dict[str, Any]]:
         """Get all content types."""
         if not self.is_configured():
@@ -140,6 +222,36 @@ class ContentfulService:
             "updated_at": entry.sys.get("updated_at"),
         }
 
+    def _serialize_sync_entry(self, item: dict) -> dict[str, Any]:
+        """
+        Serialize an entry of the Sync API like `_serialize_entry` does an unresolved (`include=0`) SDK entry. The Sync
+        API returns the values of every locale, only those of CONTENTFUL_LOCALE are kept.
+        """
+        locale = settings.CONTENTFUL_LOCALE
+        fields = {}
+        for field_name, values in item.get("fields", {}).items():
+            if locale not in values:
+                continue
+            value = values[locale]
+            if isinstance(value, list):
+                fields[field_name] = [self._serialize_sync_value(v) for v in value]
+            else:
+                fields[field_name] = self._serialize_sync_value(value)
+
+        sys = item["sys"]
+        return {
+            "id": sys["id"],
+            "content_type": sys["contentType"]["sys"]["id"],
+            "fields": fields,
+            "created_at": sys.get("createdAt"),
+            "updated_at": sys.get("updatedAt"),
+        }
+
+    def _serialize_sync_value(self, value) -> Any:
+        if isinstance(value, dict) and value.get("sys", {}).get("type") == "Link":
+            return {"id": value["sys"]["id"], "type": "Link"}
+        return value
+
     def _serialize_value(self, value) -> Any:
         """Serialize a single value."""
         import contentful
@@ -0,0 +1,46 @@
+from django.conf import settings
+
+from core.cache import MISSING, VersionedCache  # noqa: F401
+
+# Tenant objects and user roles are cached per tenant scope; bumping the scope version drops both at once
+tenant_cache = VersionedCache(
+    "multitenancy:tenant",
+    timeout=settings.TENANT_CACHE_TIMEOUT,
+    local_ttl=settings.TENANT_CACHE_LOCAL_TTL,
+    local_maxsize=settings.TENANT_CACHE_LOCAL_MAXSIZE,
+)
+
+TENANT_KEY = "tenant"
+
+
+def _role_key(user_id) -> str:
+    return f"role:{user_id}"
+
+
+def get_cached_tenant(tenant_id):
+    return tenant_cache.get(str(tenant_id), TENANT_KEY)
+
+
+def set_cached_tenant(tenant_id, tenant):
+    tenant_cache.set(str(tenant_id), TENANT_KEY, tenant)
+
+
+def get_cached_user_role(tenant_id, user_id):
+    return tenant_cache.get(str(tenant_id), _role_key(user_id))
+
+
+def set_cached_user_role(tenant_id, user_id, role):
+    tenant_cache.set(str(tenant_id), _role_key(user_id), role)
+
+
+async def aget_cached_user_role(tenant_id, user_id):
+    return await tenant_cache.aget(str(tenant_id), _role_key(user_id))
+
+
+async def aset_cached_user_role(tenant_id, user_id, role):
+    await tenant_cache.aset(str(tenant_id), _role_key(user_id), role)
+
+
+def invalidate_tenant(tenant_id):
+    """Drop the cached tenant and every cached membership role of the tenant."""
+    tenant_cache.invalidate(str(tenant_id))
@@ -1,5 +1,6 @@
 from django.utils.functional import SimpleLazyObject
 
+from . import cache
 from .models import Tenant, TenantMembership
 
 
@@ -7,22 +8,37 @@ def get_current_tenant(tenant_id):
     """
     Retrieve the current tenant based on the provided tenant ID.
 
+    The tenant is served from the tenant cache when possible, so a warm cache resolves it without touching the
+    database. Unknown tenant IDs are cached as well to keep repeated bad lookups cheap.
+
     Args:
         tenant_id (str): The ID of the tenant.
 
     Returns:
         Tenant or None: The retrieved tenant or None if not found.
     """
+    if tenant_id is None:
+        return None
+
+    tenant = cache.get_cached_tenant(tenant_id)
+    if tenant is not cache.MISSING:
+        return tenant
+
     try:
-        return Tenant.objects.get(pk=tenant_id)
+        tenant = Tenant.objects.get(pk=tenant_id)
     except (Tenant.DoesNotExist, TypeError, ValueError):
-        return None
+        tenant = None
+
+    cache.set_cached_tenant(tenant_id, tenant)
+    return tenant
 
 
 def get_current_user_role(tenant, user):
     """
     Retrieve the user role within the specified tenant.
 
+    The role is served from the tenant cache when possible; membership changes invalidate it.
+
     Args:
         tenant (Tenant): The current tenant.
         user (User): The user for whom the role is to be retrieved.
@@ -30,14 +46,46 @@ def get_current_user_role(tenant, user):
     Returns:
         str or None: The user role or None if not found or invalid conditions.
     """
-    if user and user.is_authenticated and tenant:
-        try:
-            membership = TenantMembership.objects.get(user=user, tenant=tenant)
-            return membership.role
-        except TenantMembership.DoesNotExist:
-            return None
-
-    return None
+    if not (user and user.is_authenticated and tenant):
+        return None
+
+    role = cache.get_cached_user_role(tenant.pk, user.pk)
+    if role is not cache.MISSING:
+        return role
+
+    role = TenantMembership.objects.filter(user=user, tenant=tenant).values_list("role", flat=True).first()
+    cache.set_cached_user_role(tenant.pk, user.pk, role)
+    return role
+
+
+async def aget_current_user_role(tenant_id, user):
+    """
+    Async variant of `get_current_user_role` for ASGI code paths, e.g. WebSocket consumers.
+
+    Takes the tenant ID rather than the tenant, so a warm cache answers without loading the tenant at all.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        user (User): The user for whom the role is to be retrieved.
+
+    Returns:
+        str or None: The user role or None if the user is not a member of the tenant.
+    """
+    if not (user and user.is_authenticated and tenant_id):
+        return None
+
+    role = await cache.aget_cached_user_role(tenant_id, user.pk)
+    if role is not cache.MISSING:
+        return role
+
+    try:
+        memberships = TenantMembership.objects.filter(user=user, tenant_id=tenant_id)
+    except (TypeError, ValueError):
+        return None
+
+    role = await memberships.values_list("role", flat=True).afirst()
+    await cache.aset_cached_user_role(tenant_id, user.pk, role)
+    return role
 
 
 class TenantMiddleware:
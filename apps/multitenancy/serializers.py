@@ -64,9 +64,10 @@ class AcceptTenantInvitationSerializer(TenantInvitationActionSerializer):
         user = self.context["request"].user
         membership = models.TenantMembership.objects.get_not_accepted().filter(pk=membership_id, user=user).first()
         if membership:
-            models.TenantMembership.objects.get_not_accepted().filter(pk=membership_id, user=user).update(
-                is_accepted=True, invitation_accepted_at=timezone.now()
-            )
+            # Saved rather than updated in the queryset, so post_save invalidates the cached role of the new member
+            membership.is_accepted = True
+            membership.invitation_accepted_at = timezone.now()
+            membership.save(update_fields=["is_accepted", "invitation_accepted_at", "updated_at"])
             notifications.send_accepted_tenant_invitation_notification(membership, str(membership_id))
         return {"ok": True}
 
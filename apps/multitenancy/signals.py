@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache
+from .models import Tenant, TenantMembership
+
+
+def invalidate_on_commit(tenant_id):
+    # Invalidating before the commit would let a concurrent request cache the old rows again under the new version
+    transaction.on_commit(lambda: cache.invalidate_tenant(tenant_id))
+
+
+@receiver([post_save, post_delete], sender=Tenant)
+def invalidate_tenant_cache(sender, instance: Tenant, **kwargs):
+    invalidate_on_commit(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=TenantMembership)
+def invalidate_tenant_membership_cache(sender, instance: TenantMembership, **kwargs):
+    invalidate_on_commit(instance.tenant_id)
+
+
+@receiver(m2m_changed, sender=Tenant.members.through)
+def invalidate_tenant_members_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    # tenant.members.add() creates the memberships with bulk_create, which sends no post_save
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        # tenant.members.add/remove/clear()
+        tenant_ids = [instance.pk]
+    elif action == "pre_clear":
+        # user.tenants.clear()
+        tenant_ids = instance.tenant_memberships.values_list("tenant_id", flat=True)
+    else:
+        # user.tenants.add/remove()
+        tenant_ids = pk_set
+
+    for tenant_id in tenant_ids:
+        invalidate_on_commit(tenant_id)
@@ -0,0 +1,110 @@
+from unittest.mock import Mock
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from .. import cache
+from ..constants import TenantUserRole
+from ..middleware import aget_current_user_role, get_current_tenant, get_current_user_role
+from ..serializers import AcceptTenantInvitationSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_local_tenant_cache():
+    cache.tenant_cache.clear_local()
+    yield
+    cache.tenant_cache.clear_local()
+
+
+class TestGetCurrentTenantCache:
+    def test_warm_cache_does_not_query_database(self, tenant, django_assert_num_queries):
+        get_current_tenant(tenant.id)
+
+        with django_assert_num_queries(0):
+            result = get_current_tenant(tenant.id)
+
+        assert result == tenant
+
+    def test_missing_tenant_is_cached(self, django_assert_num_queries):
+        assert get_current_tenant("9999") is None
+
+        with django_assert_num_queries(0):
+            assert get_current_tenant("9999") is None
+
+    def test_tenant_save_invalidates_cache(self, tenant, django_capture_on_commit_callbacks):
+        get_current_tenant(tenant.id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            tenant.name = "Renamed tenant"
+            tenant.save()
+
+        assert get_current_tenant(tenant.id).name == "Renamed tenant"
+
+
+class TestGetCurrentUserRoleCache:
+    def test_warm_cache_does_not_query_database(
+        self, tenant, user, tenant_membership_factory, django_assert_num_queries
+    ):
+        tenant_membership_factory(user=user, tenant=tenant, role="ADMIN")
+        get_current_user_role(tenant, user)
+
+        with django_assert_num_queries(0):
+            result = get_current_user_role(tenant, user)
+
+        assert result == "ADMIN"
+
+    def test_membership_change_invalidates_cache(
+        self, tenant, user, tenant_membership_factory, django_capture_on_commit_callbacks
+    ):
+        membership = tenant_membership_factory(user=user, tenant=tenant, role="ADMIN")
+        assert get_current_user_role(tenant, user) == "ADMIN"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            membership.role = "MEMBER"
+            membership.save()
+
+        assert get_current_user_role(tenant, user) == "MEMBER"
+
+    def test_membership_delete_invalidates_cache(
+        self, tenant, user, tenant_membership_factory, django_capture_on_commit_callbacks
+    ):
+        membership = tenant_membership_factory(user=user, tenant=tenant, role="ADMIN")
+        assert get_current_user_role(tenant, user) == "ADMIN"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            membership.hard_delete()
+
+        assert get_current_user_role(tenant, user) is None
+
+    def test_invitation_acceptance_invalidates_cache(
+        self, mocker, tenant, user, tenant_membership_factory, django_capture_on_commit_callbacks
+    ):
+        mocker.patch("multitenancy.notifications.send_accepted_tenant_invitation_notification")
+        membership = tenant_membership_factory(user=user, tenant=tenant, role="ADMIN", is_accepted=False)
+        assert get_current_user_role(tenant, user) is None
+
+        with django_capture_on_commit_callbacks(execute=True):
+            AcceptTenantInvitationSerializer(context={"request": Mock(user=user)}).create({"id": membership.pk})
+
+        assert get_current_user_role(tenant, user) == "ADMIN"
+
+    def test_members_add_invalidates_cache(self, tenant, user, django_capture_on_commit_callbacks):
+        assert get_current_user_role(tenant, user) is None
+
+        with django_capture_on_commit_callbacks(execute=True):
+            tenant.members.add(
+                user, through_defaults={"tenant": tenant, "role": TenantUserRole.OWNER, "is_accepted": True}
+            )
+
+        assert get_current_user_role(tenant, user) == TenantUserRole.OWNER
+
+    def test_async_lookup_shares_cache(self, tenant, user, tenant_membership_factory, django_assert_num_queries):
+        tenant_membership_factory(user=user, tenant=tenant, role="ADMIN")
+        get_current_user_role(tenant, user)
+
+        with django_assert_num_queries(0):
+            result = async_to_sync(aget_current_user_role)(str(tenant.pk), user)
+
+        assert result == "ADMIN"
@@ -6,3 +6,9 @@ from . import models
 @admin.register(models.Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ("id", "type", "user")
+
+
+@admin.register(models.NotificationBroadcast)
+class NotificationBroadcastAdmin(admin.ModelAdmin):
+    list_display = ("id", "type", "tenant", "recipients_count", "created_at", "completed_at")
+    readonly_fields = ("cursor", "recipients_count", "completed_at")
@@ -3,34 +3,35 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .. import models, serializers
+from .. import counters, models, serializers
+from ..pagination import NotificationCursorPagination
+from ..services import NotificationService
 
 
 class NotificationViewSet(viewsets.ModelViewSet):
     serializer_class = serializers.NotificationSerializer
     permission_classes = [IsAuthenticated]
     http_method_names = ["get", "patch", "delete"]
+    pagination_class = NotificationCursorPagination
 
     def get_queryset(self):
-        return models.Notification.objects.filter(user=self.request.user).order_by("-created_at")
+        return models.Notification.objects.filter(user=self.request.user).order_by("-created_at", "-id")
 
     @action(detail=False, methods=["get"])
     def unread_count(self, request):
-        count = models.Notification.objects.filter(user=request.user, read_at__isnull=True).count()
+        count = counters.get_unread_count(request.user)
         return Response({"unread_count": count}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=["patch"])
     def mark_read(self, request, pk=None):
         notification = self.get_object()
-        # Use property setter logic or direct field update?
-        # Model property setter handles converting True to timezone.now()
-        notification.is_read = True 
-        notification.save()
+        # A conditional UPDATE, so concurrent requests cannot both decrement the unread counter
+        self.get_queryset().filter(pk=notification.pk).mark_read()
+        notification.refresh_from_db()
         serializer = self.get_serializer(notification)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["post"])
     def mark_all_read(self, request):
-        from django.utils import timezone
-        models.Notification.objects.filter(user=request.user, read_at__isnull=True).update(read_at=timezone.now())
+        NotificationService.mark_read_all_user_notifications(request.user)
         return Response({"message": "All notifications marked as read"}, status=status.HTTP_200_OK)
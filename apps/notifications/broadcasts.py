@@ -0,0 +1,111 @@
+"""
+Chunked notification broadcasts.
+
+A broadcast never enqueues a task per recipient: recipients are read in chunks ordered by user id, filtered by their
+in-app preferences (one query per chunk), written with a single `bulk_create` and published to the channel layer as
+one batch once committed. The chunk is committed together with the broadcast's cursor, so a broadcast interrupted by
+a dying worker resumes after the last committed chunk and never notifies a user twice.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from core.publisher import channel_layer_publisher
+
+from . import counters
+from .models import Notification, NotificationBroadcast, NotificationPreference
+from .preferences import load_preference_matrices
+
+User = get_user_model()
+
+IN_APP_CHANNEL = NotificationPreference.Channels.IN_APP
+
+
+def get_user_group_name(user_id) -> str:
+    return f"notifications_{user_id}"
+
+
+def make_notification_event(notification: Notification) -> dict:
+    return {
+        "type": "notification_message",
+        "notification": {
+            "id": str(notification.id),
+            "type": notification.type,
+            "data": notification.data,
+            "is_read": notification.is_read,
+            "created_at": notification.created_at.isoformat(),
+        },
+    }
+
+
+def publish_notifications(notifications: list[Notification]):
+    """Send notifications to their users' groups in one batch, once the current transaction commits."""
+    channel_layer_publisher.publish_many(
+        (get_user_group_name(notification.user_id), make_notification_event(notification))
+        for notification in notifications
+    )
+
+
+def get_recipient_ids(broadcast: NotificationBroadcast):
+    """Ids of the broadcast's recipients not delivered yet, in delivery order."""
+    from multitenancy.models import TenantMembership
+
+    cursor = User._meta.pk.to_python(broadcast.cursor)
+    if broadcast.tenant_id:
+        return (
+            TenantMembership.objects.filter(
+                tenant_id=broadcast.tenant_id, is_active=True, user__isnull=False, user_id__gt=cursor
+            )
+            .order_by("user_id")
+            .values_list("user_id", flat=True)
+        )
+    return User.objects.filter(is_active=True, id__gt=cursor).order_by("id").values_list("id", flat=True)
+
+
+def deliver_chunk(broadcast_id, chunk_size: int) -> NotificationBroadcast:
+    """
+    Deliver the next chunk of a broadcast and advance its cursor; marks the broadcast completed when no recipients are
+    left.
+
+    The broadcast row stays locked until the chunk commits, so two workers resuming the same broadcast take turns
+    instead of delivering the same chunk twice.
+    """
+    with transaction.atomic():
+        broadcast = NotificationBroadcast.objects.select_for_update().get(pk=broadcast_id)
+        if broadcast.completed_at is not None:
+            return broadcast
+
+        user_ids = list(get_recipient_ids(broadcast)[:chunk_size])
+        if not user_ids:
+            broadcast.completed_at = timezone.now()
+            broadcast.save(update_fields=["completed_at", "updated_at"])
+            return broadcast
+
+        preferences = load_preference_matrices(user_ids)
+        recipient_ids = [
+            user_id for user_id in user_ids if preferences[user_id].is_enabled(broadcast.type, IN_APP_CHANNEL)
+        ]
+        notifications = Notification.objects.bulk_create(
+            [Notification(user_id=user_id, type=broadcast.type, data=broadcast.data) for user_id in recipient_ids]
+        )
+        counters.add_unread({user_id: 1 for user_id in recipient_ids})
+        broadcast.cursor = user_ids[-1].id
+        broadcast.recipients_count += len(recipient_ids)
+        broadcast.save(update_fields=["cursor", "recipients_count", "updated_at"])
+
+        publish_notifications(notifications)
+
+    return broadcast
+
+
+def deliver_broadcast(broadcast_id, chunk_size: int | None = None, on_progress=None) -> NotificationBroadcast:
+    """Deliver all remaining chunks of a broadcast, calling `on_progress(broadcast)` after each of them."""
+    chunk_size = chunk_size or settings.NOTIFICATION_BROADCAST_CHUNK_SIZE
+
+    while (broadcast := deliver_chunk(broadcast_id, chunk_size)).completed_at is None:
+        if on_progress is not None:
+            on_progress(broadcast)
+
+    return broadcast
@@ -0,0 +1,98 @@
+"""
+Per-user unread notification counters.
+
+Counter updates are `UPDATE ... SET count = count + n` statements issued in the transaction that changes the
+notifications, so they commit or roll back together with them. Paths that bypass the model (raw updates, queryset
+deletes, cascades) may leave a counter off; `reconcile_unread_counts` recomputes them periodically.
+"""
+
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+
+from .models import Notification, UnreadNotificationCounter
+
+User = get_user_model()
+
+
+def get_unread_count(user) -> int:
+    return UnreadNotificationCounter.objects.filter(user=user).values_list("count", flat=True).first() or 0
+
+
+def add_unread(deltas: dict):
+    """Apply `{user_id: delta}` to the unread counters, with one UPDATE per distinct delta."""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    UnreadNotificationCounter.objects.bulk_create(
+        [UnreadNotificationCounter(user_id=user_id) for user_id in deltas], ignore_conflicts=True
+    )
+
+    user_ids_by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        user_ids_by_delta[delta].append(user_id)
+
+    for delta, user_ids in user_ids_by_delta.items():
+        UnreadNotificationCounter.objects.filter(user_id__in=user_ids).update(
+            # A counter that drifted below the real count must not fail the transaction
+            count=Greatest(F("count") + delta, Value(0))
+        )
+
+
+def reconcile_user_unread_counts(user_ids: list) -> int:
+    """
+    Reset the counters of the given users to their real unread counts; returns the number of counters fixed.
+
+    The counter rows stay locked while the notifications are counted, so updates of concurrent transactions are applied
+    on top of the reconciled value instead of being overwritten by it.
+    """
+    with transaction.atomic():
+        stored = dict(
+            UnreadNotificationCounter.objects.select_for_update()
+            .filter(user_id__in=user_ids)
+            .values_list("user_id", "count")
+        )
+        actual = dict(
+            Notification.objects.filter(user_id__in=user_ids)
+            .filter_unread()
+            .order_by()
+            .values("user_id")
+            .annotate(unread_count=Count("id"))
+            .values_list("user_id", "unread_count")
+        )
+
+        counters_to_create = []
+        counters_to_update = []
+        for user_id in user_ids:
+            unread_count = actual.get(user_id, 0)
+            if user_id not in stored:
+                if unread_count:
+                    counters_to_create.append(UnreadNotificationCounter(user_id=user_id, count=unread_count))
+            elif stored[user_id] != unread_count:
+                counters_to_update.append(UnreadNotificationCounter(user_id=user_id, count=unread_count))
+
+        UnreadNotificationCounter.objects.bulk_create(counters_to_create, ignore_conflicts=True)
+        UnreadNotificationCounter.objects.bulk_update(counters_to_update, ["count"])
+
+    return len(counters_to_create) + len(counters_to_update)
+
+
+def reconcile_unread_counts(chunk_size: int = 1000) -> int:
+    """Reconcile the counters of all users, `chunk_size` users per transaction; returns the number of counters fixed."""
+    fixed_count = 0
+    cursor = None
+
+    while True:
+        users = User.objects.order_by("id")
+        if cursor is not None:
+            users = users.filter(id__gt=cursor)
+        user_ids = list(users.values_list("id", flat=True)[:chunk_size])
+        if not user_ids:
+            return fixed_count
+
+        fixed_count += reconcile_user_unread_counts(user_ids)
+        cursor = user_ids[-1]
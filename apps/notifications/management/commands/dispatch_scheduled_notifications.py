@@ -0,0 +1,46 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ...scheduled import dispatch_queued_notifications, scheduled_notifications_queue
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Send scheduled notifications from the delay queue as they become due"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.SCHEDULED_NOTIFICATION_DISPATCH_CHUNK_SIZE)
+        parser.add_argument(
+            "--poll-interval", type=float, default=settings.SCHEDULED_NOTIFICATION_DISPATCH_POLL_INTERVAL
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        poll_interval = options["poll_interval"]
+
+        while True:
+            next_due_at = self.dispatch(batch_size)
+
+            # Sleep until the next entry is due; entries scheduled earlier meanwhile wait at most one poll interval
+            if next_due_at is None:
+                time.sleep(poll_interval)
+            elif (wait := next_due_at - time.time()) > 0:
+                time.sleep(min(wait, poll_interval))
+
+    def dispatch(self, batch_size: int) -> float | None:
+        """Send the due notifications; returns when the next one is due. Errors are logged, the loop keeps going."""
+        # Like a request, each iteration must not reuse a connection the database has closed meanwhile
+        close_old_connections()
+        try:
+            sent_count = dispatch_queued_notifications(batch_size)
+            if sent_count:
+                self.stdout.write(f"Sent {sent_count} scheduled notifications")
+            return scheduled_notifications_queue.next_due_at()
+        except Exception:
+            logger.exception("Dispatching scheduled notifications failed")
+            return None
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 
@@ -9,8 +9,28 @@ class NotificationQuerySet(models.QuerySet):
     def filter_unread(self):
         return self.filter(read_at__isnull=True)
 
-    def mark_read(self):
-        self.update(read_at=timezone.now())
+    def mark_read(self) -> int:
+        """
+        Mark the unread notifications in the queryset as read and update their users' unread counters; returns the
+        number of notifications marked.
+
+        Notifications are updated per user, so each counter is decremented by exactly the number of rows its UPDATE
+        changed, even when other requests mark some of them read at the same time.
+        """
+        from . import counters
+
+        now = timezone.now()
+        unread = self.filter_unread()
+        user_ids = list(unread.order_by().values_list("user_id", flat=True).distinct())
+
+        deltas = {}
+        with transaction.atomic():
+            for user_id in user_ids:
+                if updated := unread.filter(user_id=user_id).update(read_at=now):
+                    deltas[user_id] = -updated
+            counters.add_unread(deltas)
+
+        return -sum(deltas.values())
 
 
 NotificationManager = models.Manager.from_queryset(NotificationQuerySet)
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.10 on 2026-10-18 04:01
+
+import django.db.models.deletion
+import hashid_field.field
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multitenancy', '0001_initial'),
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationBroadcast',
+            fields=[
+                ('id', hashid_field.field.HashidAutoField(alphabet='abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890', min_length=7, prefix='', primary_key=True, serialize=False)),
+                ('type', models.CharField(max_length=64)),
+                ('data', models.JSONField(default=dict)),
+                ('cursor', models.PositiveBigIntegerField(default=0)),
+                ('recipients_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notification_broadcasts', to='multitenancy.tenant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['completed_at', 'updated_at'], name='notificatio_complet_fb1431_idx')],
+            },
+        ),
+    ]
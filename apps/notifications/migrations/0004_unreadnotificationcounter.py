@@ -0,0 +1,47 @@
+# Generated by Django 5.2.10 on 2026-10-18 04:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_unread_counters(apps, schema_editor):
+    Notification = apps.get_model("notifications", "Notification")
+    UnreadNotificationCounter = apps.get_model("notifications", "UnreadNotificationCounter")
+
+    unread_counts = (
+        Notification.objects.filter(read_at__isnull=True)
+        .order_by()
+        .values("user_id")
+        .annotate(unread_count=Count("id"))
+        .values_list("user_id", "unread_count")
+    )
+    UnreadNotificationCounter.objects.bulk_create(
+        (UnreadNotificationCounter(user_id=user_id, count=unread_count) for user_id, unread_count in unread_counts),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('iam', '0004_loginattempt'),
+        ('notifications', '0003_scheduled_notification_due_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadNotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('read_at__isnull', True)), fields=['user'], name='notification_unread_idx'),
+        ),
+        migrations.RunPython(populate_unread_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,99 @@
+import datetime
+
+from django.conf import settings
+from django.db import migrations
+
+
+def add_months(month, months):
+    years, month_index = divmod(month.month - 1 + months, 12)
+    return month.replace(year=month.year + years, month=month_index + 1)
+
+
+def partition_notifications(apps, schema_editor):
+    """
+    Turn notifications_notification into a table range-partitioned by created_at (PostgreSQL only).
+
+    The existing table is not copied: it is attached as the partition of everything up to the end of the current month,
+    which retention archives and drops as a whole once it has expired. Monthly partitions follow, plus a default
+    partition so inserts never fail if partition maintenance falls behind; maintenance moves its rows to monthly
+    partitions (see `notifications.partitions.create_partitions`).
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    Notification = apps.get_model("notifications", "Notification")
+    table = Notification._meta.db_table
+    legacy_table = f"{table}_legacy"
+    quote_name = schema_editor.quote_name
+    current_month = datetime.datetime.now(datetime.UTC).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    next_month = add_months(current_month, 1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT GREATEST(MAX(id), pg_sequence_last_value(pg_get_serial_sequence(%s, 'id'))) "
+            f"FROM {quote_name(table)}",
+            [table],
+        )
+        next_id = (cursor.fetchone()[0] or 0) + 1
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", [table])
+        index_names = [row[0] for row in cursor.fetchall()]
+
+    # The partitioned table takes over the original index names, which Django refers to in later migrations
+    for index_name in index_names:
+        legacy_index_name = f"{index_name[:56]}_legacy"
+        schema_editor.execute(f"ALTER INDEX {quote_name(index_name)} RENAME TO {quote_name(legacy_index_name)}")
+    schema_editor.execute(f"ALTER TABLE {quote_name(table)} RENAME TO {quote_name(legacy_table)}")
+    schema_editor.execute(f"ALTER TABLE {quote_name(legacy_table)} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+    # A partition cannot keep a primary key of its own: it gets the (id, created_at) one of the partitioned table, which
+    # ATTACH PARTITION adopts from the legacy table instead of building a second index
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'", [legacy_table]
+        )
+        (primary_key_name,) = cursor.fetchone()
+    schema_editor.execute(
+        f"ALTER TABLE {quote_name(legacy_table)} DROP CONSTRAINT {quote_name(primary_key_name)}, "
+        "ADD PRIMARY KEY (id, created_at)"
+    )
+    schema_editor.execute(f"ALTER TABLE {quote_name(legacy_table)} ALTER COLUMN id DROP DEFAULT")
+
+    schema_editor.execute(
+        f"CREATE TABLE {quote_name(table)} (LIKE {quote_name(legacy_table)} INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    schema_editor.execute(
+        f"ALTER TABLE {quote_name(table)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY (START WITH {next_id})"
+    )
+    # Unique constraints of a partitioned table must include the partition key
+    schema_editor.execute(f"ALTER TABLE {quote_name(table)} ADD PRIMARY KEY (id, created_at)")
+    schema_editor.execute(
+        f"ALTER TABLE {quote_name(table)} ATTACH PARTITION {quote_name(legacy_table)} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{next_month.isoformat()}')"
+    )
+
+    # Created on the parent, foreign keys and indexes are attached to their equivalents on the legacy partition
+    for field in Notification._meta.local_fields:
+        if field.remote_field and field.db_constraint:
+            schema_editor.execute(schema_editor._create_fk_sql(Notification, field, "_fk_%(to_table)s_%(to_column)s"))
+    for statement in schema_editor._model_indexes_sql(Notification):
+        schema_editor.execute(statement)
+
+    for offset in range(settings.NOTIFICATION_PARTITION_MONTHS_AHEAD):
+        month = add_months(next_month, offset)
+        schema_editor.execute(
+            f"CREATE TABLE {quote_name(f'{table}_p{month:%Y%m}')} PARTITION OF {quote_name(table)} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+    schema_editor.execute(f"CREATE TABLE {quote_name(f'{table}_default')} PARTITION OF {quote_name(table)} DEFAULT")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_notification_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_notifications),
+    ]
@@ -24,18 +24,61 @@ class Notification(models.Model):
 
     objects = managers.NotificationManager()
 
+    class Meta:
+        indexes = [
+            # Serves the keyset-paginated feeds, see notifications.pagination
+            models.Index(fields=["user", "-created_at", "-id"], name="notification_feed_idx"),
+            # The same order over unread notifications only, for unread feeds and reconciling the unread counters
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                condition=models.Q(read_at__isnull=True),
+                name="notification_unread_idx",
+            ),
+        ]
+
     def __str__(self) -> str:
         return str(self.id)
 
+    def delete(self, *args, **kwargs):
+        from . import counters
+
+        result = super().delete(*args, **kwargs)
+        if result[0] and not self.is_read:
+            counters.add_unread({self.user_id: -1})
+        return result
+
     @property
     def is_read(self) -> bool:
         return self.read_at is not None
 
     @is_read.setter
     def is_read(self, val: bool):
+        if val != self.is_read:
+            # Applied to the user's unread counter on save, see notifications.signals
+            self._unread_count_delta = getattr(self, "_unread_count_delta", 0) + (-1 if val else 1)
         self.read_at = timezone.now() if val else None
 
 
+class UnreadNotificationCounter(models.Model):
+    """
+    Denormalized number of unread notifications of a user, so unread badges never count the notifications table.
+
+    Kept up to date in the same transactions that create, read or delete notifications (see notifications.counters),
+    and periodically reconciled against the table.
+    """
+
+    user: settings.AUTH_USER_MODEL = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="unread_notification_counter",
+    )
+    count: int = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.user_id}: {self.count} unread"
+
+
 class ScheduledNotification(models.Model):
     """Model for scheduled notifications to be sent at a future time."""
 
@@ -56,6 +99,10 @@ class ScheduledNotification(models.Model):
         ordering = ["scheduled_for"]
         indexes = [
             models.Index(fields=["scheduled_for", "sent"]),
+            # Lets the dispatcher find due rows without scanning the ones already sent
+            models.Index(
+                fields=["scheduled_for"], condition=models.Q(sent=False), name="scheduled_notification_due_idx"
+            ),
         ]
 
     def __str__(self) -> str:
@@ -83,3 +130,38 @@ class NotificationPreference(models.Model):
     def __str__(self) -> str:
         status = "enabled" if self.enabled else "disabled"
         return f"{self.user}: {self.notification_type} via {self.channel} ({status})"
+
+
+class NotificationBroadcast(models.Model):
+    """
+    A notification fanned out to all active users, or to all active members of a tenant.
+
+    Recipients are processed in chunks ordered by user id; `cursor` is the last user id delivered, so an interrupted
+    broadcast resumes where it stopped instead of starting over.
+    """
+
+    id: str = hashid_field.HashidAutoField(primary_key=True)
+    type: str = models.CharField(max_length=64)
+    data: dict = models.JSONField(default=dict)
+    tenant = models.ForeignKey(
+        "multitenancy.Tenant",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="notification_broadcasts",
+    )
+
+    cursor: int = models.PositiveBigIntegerField(default=0)
+    recipients_count: int = models.PositiveIntegerField(default=0)
+
+    created_at: datetime.datetime = models.DateTimeField(auto_now_add=True)
+    updated_at: datetime.datetime = models.DateTimeField(auto_now=True)
+    completed_at: datetime.datetime | None = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["completed_at", "updated_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Broadcast: {self.type} ({self.recipients_count} sent)"
@@ -0,0 +1,58 @@
+"""
+Keyset pagination of notification feeds.
+
+Feeds are ordered by `(created_at, id)` descending and continue from the last row of the previous page, so every page
+is an index range scan on `notification_feed_idx` of the same cost: no OFFSET to skip and no COUNT of the whole feed.
+"""
+
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.pagination import CursorPagination
+
+from .models import Notification
+
+FEED_ORDERING = ("-created_at", "-id")
+
+
+class NotificationCursorPagination(CursorPagination):
+    ordering = FEED_ORDERING
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(notification: Notification) -> str:
+    position = json.dumps([notification.created_at.isoformat(), notification.id.id])
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, notification_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = parse_datetime(created_at)
+        notification_id = Notification._meta.pk.to_python(int(notification_id))
+    except (binascii.Error, json.JSONDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursor(cursor) from e
+    if created_at is None:
+        raise InvalidCursor(cursor)
+    return created_at, notification_id
+
+
+def paginate_feed(queryset, cursor: str | None, page_size: int) -> tuple[list[Notification], str | None]:
+    """Return a page of the feed following `cursor` (the first page when None) and the cursor of the next page."""
+    queryset = queryset.order_by(*FEED_ORDERING)
+    if cursor:
+        created_at, notification_id = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=notification_id))
+
+    notifications = list(queryset[: page_size + 1])
+    if len(notifications) <= page_size:
+        return notifications, None
+
+    notifications = notifications[:page_size]
+    return notifications, encode_cursor(notifications[-1])
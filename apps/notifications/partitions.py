@@ -0,0 +1,240 @@
+"""
+Monthly partitions and retention of notifications.
+
+On PostgreSQL `notifications_notification` is range-partitioned by `created_at`, one partition per month (see
+migration 0006). Feed queries read the partitions newest first and stop at their LIMIT, so they only touch recent
+months. Retention archives a whole expired partition to gzipped NDJSON and drops it, instead of DELETE-ing its rows.
+Partitions are created NOTIFICATION_PARTITION_MONTHS_AHEAD months ahead. Rows of months without a partition, should
+maintenance fall behind, land in a default partition instead of failing; maintenance then moves them to the partition
+of their month.
+
+Other databases keep a plain table: expired rows are archived with the same file layout and deleted in batches.
+"""
+
+import datetime
+import gzip
+import json
+import logging
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+TABLE = Notification._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+ARCHIVE_DIRECTORY = "notifications/archive"
+DELETE_BATCH_SIZE = 10_000
+
+PARTITION_UPPER_BOUND_RE = re.compile(r"TO \('([^']+)'\)")
+
+
+def is_partitioned() -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = %s::regclass", [TABLE])
+        return cursor.fetchone()[0] == "p"
+
+
+def month_start(value: datetime.datetime) -> datetime.datetime:
+    return value.astimezone(datetime.UTC).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime.datetime, months: int) -> datetime.datetime:
+    years, month_index = divmod(month.month - 1 + months, 12)
+    return month.replace(year=month.year + years, month=month_index + 1)
+
+
+def get_partition_name(month: datetime.datetime) -> str:
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def get_retention_cutoff(now=None) -> datetime.datetime:
+    """Notifications created before this moment are past retention."""
+    return add_months(month_start(now or timezone.now()), -settings.NOTIFICATION_RETENTION_MONTHS)
+
+
+def create_partitions(now=None) -> list[str]:
+    """
+    Create the missing partitions up to NOTIFICATION_PARTITION_MONTHS_AHEAD months after the current one, and the
+    partitions of the months with rows in the default partition, moving those rows there.
+    """
+    if not is_partitioned():
+        return []
+
+    current_month = month_start(now or timezone.now())
+    last_month = add_months(current_month, settings.NOTIFICATION_PARTITION_MONTHS_AHEAD)
+    partitions = get_partitions()
+    # Months before the highest bound are covered already, possibly by a partition spanning several months
+    month = max((upper_bound for _, upper_bound in partitions if upper_bound), default=current_month)
+    months = set()
+    while month <= last_month:
+        months.add(month)
+        month = add_months(month, 1)
+    default_months = get_default_partition_months() if DEFAULT_PARTITION in dict(partitions) else set()
+
+    created = []
+    for month in sorted(months | default_months):
+        name = get_partition_name(month)
+        if month in default_months:
+            split_default_partition(name, month)
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(_create_partition_sql(name, month))
+        created.append(name)
+    return created
+
+
+def _create_partition_sql(name: str, month: datetime.datetime) -> str:
+    return (
+        f"CREATE TABLE {connection.ops.quote_name(name)} PARTITION OF {connection.ops.quote_name(TABLE)} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def get_default_partition_months() -> set[datetime.datetime]:
+    """Months of the rows in the default partition."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC') "
+            f"FROM {connection.ops.quote_name(DEFAULT_PARTITION)}"
+        )
+        return {month.replace(tzinfo=datetime.UTC) for (month,) in cursor.fetchall()}
+
+
+def split_default_partition(name: str, month: datetime.datetime):
+    """
+    Create the partition of `month` and move its rows out of the default partition.
+
+    PostgreSQL refuses to create a partition for rows the default partition holds, so the default partition is
+    detached meanwhile; inserts into the table wait for the transaction.
+    """
+    quoted_table = connection.ops.quote_name(TABLE)
+    quoted_default = connection.ops.quote_name(DEFAULT_PARTITION)
+    bounds = [month, add_months(month, 1)]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {quoted_table} DETACH PARTITION {quoted_default}")
+        cursor.execute(_create_partition_sql(name, month))
+        cursor.execute(
+            f"INSERT INTO {quoted_table} SELECT * FROM {quoted_default} WHERE created_at >= %s AND created_at < %s",
+            bounds,
+        )
+        cursor.execute(f"DELETE FROM {quoted_default} WHERE created_at >= %s AND created_at < %s", bounds)
+        cursor.execute(f"ALTER TABLE {quoted_table} ATTACH PARTITION {quoted_default} DEFAULT")
+    logger.info(f"Moved notifications of {month:%Y-%m} out of the default partition")
+
+
+def get_partitions() -> list[tuple[str, datetime.datetime | None]]:
+    """Attached partitions with their exclusive upper bound; None for the default partition."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            """,
+            [TABLE],
+        )
+        partitions = []
+        for name, bound in cursor.fetchall():
+            match = PARTITION_UPPER_BOUND_RE.search(bound)
+            partitions.append((name, parse_datetime(match.group(1).replace(" ", "T")) if match else None))
+    return partitions
+
+
+def get_archive_storage():
+    return import_string(settings.NOTIFICATION_ARCHIVE_STORAGE)()
+
+
+def write_archive(name: str, sql: str, params=()) -> int:
+    """Write the rows returned by `sql` to `<ARCHIVE_DIRECTORY>/<name>.ndjson.gz`; returns the number of rows."""
+    storage = get_archive_storage()
+    path = f"{ARCHIVE_DIRECTORY}/{name}.ndjson.gz"
+    rows_count = 0
+
+    with tempfile.TemporaryFile() as archive:
+        with gzip.GzipFile(fileobj=archive, mode="wb") as gzip_file, connection.chunked_cursor() as cursor:
+            cursor.execute(sql, params)
+            # Server-side cursors only describe their columns once rows have been fetched
+            rows = cursor.fetchmany(1000)
+            columns = [column[0] for column in cursor.description]
+            while rows:
+                for row in rows:
+                    gzip_file.write(json.dumps(dict(zip(columns, row)), default=str).encode() + b"\n")
+                rows_count += len(rows)
+                rows = cursor.fetchmany(1000)
+
+        archive.seek(0)
+        # A rerun after a failed drop archives the same rows again under the same name
+        if storage.exists(path):
+            storage.delete(path)
+        storage.save(path, File(archive))
+
+    return rows_count
+
+
+def archive_expired_partitions(now=None) -> list[str]:
+    """Archive and drop the partitions entirely past retention; returns their names."""
+    cutoff = get_retention_cutoff(now)
+    quoted_table = connection.ops.quote_name(TABLE)
+    archived = []
+
+    for name, upper_bound in sorted(get_partitions(), key=lambda partition: partition[0]):
+        if upper_bound is None or upper_bound > cutoff:
+            continue
+
+        quoted_name = connection.ops.quote_name(name)
+        rows_count = write_archive(name, f"SELECT * FROM {quoted_name}")
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Deferred foreign key checks of rows written earlier in an enclosing transaction would block the drop
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute(f"ALTER TABLE {quoted_table} DETACH PARTITION {quoted_name}")
+            cursor.execute(f"DROP TABLE {quoted_name}")
+
+        logger.info(f"Archived notification partition {name} ({rows_count} rows)")
+        archived.append(name)
+
+    return archived
+
+
+def archive_expired_rows(now=None) -> list[str]:
+    """Plain table counterpart of `archive_expired_partitions`: archive expired rows per month, then delete them."""
+    cutoff = get_retention_cutoff(now)
+    oldest_created_at = (
+        Notification.objects.filter(created_at__lt=cutoff).order_by("created_at").values_list("created_at", flat=True)
+    ).first()
+    if oldest_created_at is None:
+        return []
+
+    archived = []
+    month = month_start(oldest_created_at)
+    while month < cutoff:
+        next_month = add_months(month, 1)
+        name = get_partition_name(month)
+        expired = Notification.objects.filter(created_at__gte=month, created_at__lt=next_month).order_by()
+        rows_count = write_archive(name, *expired.query.sql_with_params())
+        if rows_count:
+            while ids := list(expired.values_list("id", flat=True)[:DELETE_BATCH_SIZE]):
+                Notification.objects.filter(id__in=ids).delete()
+            logger.info(f"Archived notifications of {month:%Y-%m} ({rows_count} rows)")
+            archived.append(name)
+        month = next_month
+
+    return archived
+
+
+def apply_retention(now=None) -> list[str]:
+    """Archive and remove notifications past retention; returns the archive names written."""
+    if is_partitioned():
+        return archive_expired_partitions(now)
+    return archive_expired_rows(now)
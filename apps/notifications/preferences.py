@@ -0,0 +1,68 @@
+"""
+Notification preference matrices.
+
+A user's `NotificationPreference` rows form a matrix of (notification type, channel) -> enabled. Channels are enabled
+unless a row disables them. The matrix of a user is loaded with one query and cached (per-worker and shared, see
+`core.cache.VersionedCache`) until one of their preferences changes; bulk sends load the matrices of all their
+recipients with a single query instead.
+"""
+
+from django.conf import settings
+
+from core.cache import VersionedCache
+
+from .models import NotificationPreference
+
+preference_cache = VersionedCache(
+    "notifications:preferences",
+    timeout=settings.NOTIFICATION_PREFERENCES_CACHE_TIMEOUT,
+    local_ttl=settings.NOTIFICATION_PREFERENCES_CACHE_LOCAL_TTL,
+)
+
+
+class PreferenceMatrix:
+    __slots__ = ("_enabled",)
+
+    def __init__(self, enabled: dict[tuple[str, str], bool] | None = None):
+        self._enabled = enabled or {}
+
+    def is_enabled(self, type: str, channel: str | None) -> bool:
+        """Channel-less strategies cannot be disabled by preferences."""
+        if channel is None:
+            return True
+        return self._enabled.get((type, channel), True)
+
+    def get_enabled_channels(self, type: str, channels) -> list[str]:
+        return [channel for channel in channels if self.is_enabled(type, channel)]
+
+
+def _load_matrices(user_ids) -> dict:
+    enabled_by_user = {user_id: {} for user_id in user_ids}
+    preferences = NotificationPreference.objects.filter(user_id__in=user_ids).values_list(
+        "user_id", "notification_type", "channel", "enabled"
+    )
+    for user_id, notification_type, channel, enabled in preferences:
+        enabled_by_user[user_id][(notification_type, channel)] = enabled
+    return enabled_by_user
+
+
+def _get_user_id(user):
+    return user.pk if hasattr(user, "pk") else user
+
+
+def get_preference_matrix(user) -> PreferenceMatrix:
+    user_id = _get_user_id(user)
+    enabled = preference_cache.get_or_set(user_id, "matrix", lambda: _load_matrices([user_id])[user_id])
+    return PreferenceMatrix(enabled)
+
+
+def load_preference_matrices(users) -> dict:
+    """Matrices of many users by user id, loaded with one query; meant for bulk sends, so the cache is bypassed."""
+    user_ids = [_get_user_id(user) for user in users]
+    if not user_ids:
+        return {}
+    return {user_id: PreferenceMatrix(enabled) for user_id, enabled in _load_matrices(user_ids).items()}
+
+
+def invalidate_preferences(user_id):
+    preference_cache.invalidate(user_id)
@@ -0,0 +1,92 @@
+"""
+Dispatching of due scheduled notifications.
+
+Scheduled notifications are registered in a delay queue when saved, and the `dispatch_scheduled_notifications`
+command pops them the moment they are due. Scanning the table for due rows (`dispatch_due_notifications`) is only a
+periodic safety net for rows the queue missed, e.g. created with `bulk_create` or popped by a dispatcher that died
+before committing.
+
+Due rows are claimed in chunks with `SELECT ... FOR UPDATE SKIP LOCKED`: concurrent dispatchers each lock a different
+chunk instead of waiting on (or re-sending) another's, so any number of workers can drain a backlog in parallel. A
+chunk costs one select, one `bulk_create` and one `UPDATE ... WHERE id IN`, all committed together.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.delay_queue import DelayQueue
+
+from . import counters
+from .broadcasts import IN_APP_CHANNEL, publish_notifications
+from .models import Notification, ScheduledNotification
+from .preferences import load_preference_matrices
+
+scheduled_notifications_queue = DelayQueue("notifications:scheduled")
+
+
+def enqueue_scheduled_notification(scheduled: ScheduledNotification):
+    scheduled_notifications_queue.schedule(str(scheduled.id.id), scheduled.scheduled_for.timestamp())
+
+
+def dequeue_scheduled_notification(scheduled: ScheduledNotification):
+    scheduled_notifications_queue.cancel(str(scheduled.id.id))
+
+
+def _dispatch(queryset, chunk_size: int, now) -> int:
+    with transaction.atomic():
+        scheduled_notifications = list(
+            queryset.select_for_update(skip_locked=True)
+            .filter(scheduled_for__lte=now, sent=False)
+            .order_by("scheduled_for")
+            .only("id", "user_id", "type", "data")[:chunk_size]
+        )
+        if not scheduled_notifications:
+            return 0
+
+        preferences = load_preference_matrices({scheduled.user_id for scheduled in scheduled_notifications})
+        notifications = Notification.objects.bulk_create(
+            [
+                Notification(user_id=scheduled.user_id, type=scheduled.type, data=scheduled.data)
+                for scheduled in scheduled_notifications
+                if preferences[scheduled.user_id].is_enabled(scheduled.type, IN_APP_CHANNEL)
+            ]
+        )
+        counters.add_unread(Counter(notification.user_id for notification in notifications))
+        ScheduledNotification.objects.filter(id__in=[scheduled.id for scheduled in scheduled_notifications]).update(
+            sent=True, sent_at=now
+        )
+
+        publish_notifications(notifications)
+
+    return len(scheduled_notifications)
+
+
+def dispatch_due_chunk(chunk_size: int, now=None) -> int:
+    """Send one chunk of due scheduled notifications found in the database; returns the number sent."""
+    return _dispatch(ScheduledNotification.objects.all(), chunk_size, now or timezone.now())
+
+
+def dispatch_queued_notifications(limit: int, now=None) -> int:
+    """Pop up to `limit` due entries from the delay queue and send them; returns the number sent."""
+    now = now or timezone.now()
+    popped_ids = scheduled_notifications_queue.pop_due(limit, now=now.timestamp())
+    if not popped_ids:
+        return 0
+
+    to_hashid = ScheduledNotification._meta.pk.to_python
+    queryset = ScheduledNotification.objects.filter(id__in=[to_hashid(int(popped_id)) for popped_id in popped_ids])
+    return _dispatch(queryset, len(popped_ids), now)
+
+
+def dispatch_due_notifications(chunk_size: int | None = None) -> int:
+    """Send scheduled notifications due at call time until none are left; returns the number sent."""
+    chunk_size = chunk_size or settings.SCHEDULED_NOTIFICATION_DISPATCH_CHUNK_SIZE
+    now = timezone.now()
+
+    sent_count = 0
+    while sent := dispatch_due_chunk(chunk_size, now=now):
+        sent_count += sent
+    return sent_count
@@ -4,6 +4,7 @@ from django.conf import settings
 
 from . import strategies
 from .exceptions import NotificationStrategyException
+from .preferences import PreferenceMatrix, get_preference_matrix, load_preference_matrices
 
 
 @lru_cache
@@ -22,7 +23,24 @@ def get_enabled_strategies():
     return enabled_strategies
 
 
-def send_notification(user: str, type: str, data: dict, issuer: str):
-    for strategy in get_enabled_strategies():
-        if strategy.should_send_notification(user, type):
-            strategy.send_notification(user, type, data, issuer)
+def get_strategies_to_send(user: str, type: str, preferences: PreferenceMatrix) -> list:
+    """Strategies to send a notification through, resolved against the user's preferences for all channels at once."""
+    return [
+        strategy
+        for strategy in get_enabled_strategies()
+        if preferences.is_enabled(type, strategy.channel) and strategy.should_send_notification(user, type)
+    ]
+
+
+def send_notification(user: str, type: str, data: dict, issuer: str, preferences: PreferenceMatrix | None = None):
+    if preferences is None:
+        preferences = get_preference_matrix(user)
+    for strategy in get_strategies_to_send(user, type, preferences):
+        strategy.send_notification(user, type, data, issuer)
+
+
+def send_bulk_notification(users: list, type: str, data: dict, issuer: str = None):
+    """Send the same notification to many users, loading all their preferences with a single query."""
+    preferences_by_user_id = load_preference_matrices(users)
+    for user in users:
+        send_notification(user, type, data, issuer, preferences=preferences_by_user_id[user.pk])
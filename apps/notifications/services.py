@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 
+from . import counters
 from .models import Notification
 
 User = get_user_model()
@@ -12,4 +13,4 @@ class NotificationService:
 
     @classmethod
     def user_has_unread_notifications(cls, user: User):
-        return Notification.objects.filter_by_user(user).filter_unread().exists()
+        return counters.get_unread_count(user) > 0
@@ -1,20 +1,18 @@
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from . import models
+from core.publisher import channel_layer_publisher
+
+from . import counters, models, preferences, scheduled
 
 
 @receiver(post_save, sender=models.Notification)
 def notify_about_entry(sender, instance: models.Notification, created, update_fields, **kwargs):
     if created:
-        channel_layer = get_channel_layer()
-        user_group = f"user_{instance.user.id}"
-
-        # Send notification via WebSocket
-        async_to_sync(channel_layer.group_send)(
-            user_group,
+        # Send notification via WebSocket once committed
+        channel_layer_publisher.publish(
+            f"user_{instance.user_id}",
             {
                 "type": "notification_message",
                 "message": {
@@ -27,3 +25,35 @@ def notify_about_entry(sender, instance: models.Notification, created, update_fi
                 },
             },
         )
+
+
+@receiver(post_save, sender=models.Notification)
+def update_unread_counter(sender, instance: models.Notification, created, **kwargs):
+    if created:
+        delta = 0 if instance.is_read else 1
+        instance.__dict__.pop("_unread_count_delta", None)
+    else:
+        delta = instance.__dict__.pop("_unread_count_delta", 0)
+    counters.add_unread({instance.user_id: delta})
+
+
+@receiver(post_save, sender=models.ScheduledNotification)
+def enqueue_scheduled_notification(sender, instance: models.ScheduledNotification, **kwargs):
+    if instance.sent:
+        scheduled.dequeue_scheduled_notification(instance)
+    else:
+        # The dispatcher must not pop a row it cannot see yet
+        transaction.on_commit(lambda: scheduled.enqueue_scheduled_notification(instance))
+
+
+@receiver(post_delete, sender=models.ScheduledNotification)
+def dequeue_scheduled_notification(sender, instance: models.ScheduledNotification, **kwargs):
+    scheduled.dequeue_scheduled_notification(instance)
+
+
+@receiver(post_save, sender=models.NotificationPreference)
+@receiver(post_delete, sender=models.NotificationPreference)
+def invalidate_notification_preferences(sender, instance: models.NotificationPreference, **kwargs):
+    # A matrix loaded before the commit would otherwise be cached again under the new version
+    user_id = instance.user_id
+    transaction.on_commit(lambda: preferences.invalidate_preferences(user_id))
@@ -2,6 +2,9 @@ from . import models
 
 
 class BaseNotificationStrategy:
+    # NotificationPreference channel users can disable this strategy with; None means it cannot be disabled
+    channel: str | None = None
+
     @staticmethod
     def should_send_notification(user: str, type: str):
         """
@@ -17,6 +20,8 @@ class BaseNotificationStrategy:
 
 
 class InAppNotificationStrategy(BaseNotificationStrategy):
+    channel = models.NotificationPreference.Channels.IN_APP
+
     @staticmethod
     def send_notification(user: str, type: str, data: dict, issuer: str):
         models.Notification.objects.create(user=user, type=type, data=data, issuer=issuer)
@@ -0,0 +1,70 @@
+import pytest
+
+from .. import broadcasts
+from ..models import Notification, NotificationBroadcast
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def publish_notifications(mocker):
+    return mocker.patch("notifications.broadcasts.publish_notifications")
+
+
+class TestDeliverBroadcast:
+    def test_notifies_all_active_users_in_chunks(
+        self, user_factory, publish_notifications, django_capture_on_commit_callbacks
+    ):
+        users = user_factory.create_batch(5)
+        inactive_user = user_factory(is_active=False)
+        broadcast = NotificationBroadcast.objects.create(type="announcement", data={"title": "Hello"})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            broadcast = broadcasts.deliver_broadcast(broadcast.id, chunk_size=2)
+
+        assert broadcast.completed_at is not None
+        assert broadcast.recipients_count == 5
+        assert set(Notification.objects.values_list("user_id", flat=True)) == {user.id for user in users}
+        assert not Notification.objects.filter(user=inactive_user).exists()
+        assert Notification.objects.filter(type="announcement", data={"title": "Hello"}).count() == 5
+        assert publish_notifications.call_count == 3
+
+    def test_notifies_tenant_members(self, tenant, tenant_membership_factory, user_factory, publish_notifications):
+        membership = tenant_membership_factory(tenant=tenant)
+        user_factory()
+        broadcast = NotificationBroadcast.objects.create(type="announcement", tenant=tenant)
+
+        broadcasts.deliver_broadcast(broadcast.id)
+
+        assert list(Notification.objects.values_list("user_id", flat=True)) == [membership.user.id]
+
+    def test_resumes_after_cursor(self, user_factory, publish_notifications):
+        delivered_user, *remaining_users = sorted(user_factory.create_batch(3), key=lambda user: user.id.id)
+        broadcast = NotificationBroadcast.objects.create(
+            type="announcement", cursor=delivered_user.id.id, recipients_count=1
+        )
+
+        broadcast = broadcasts.deliver_broadcast(broadcast.id)
+
+        assert broadcast.recipients_count == 3
+        assert set(Notification.objects.values_list("user_id", flat=True)) == {user.id for user in remaining_users}
+
+    def test_chunk_queries_do_not_depend_on_chunk_size(
+        self, user_factory, publish_notifications, django_assert_max_num_queries
+    ):
+        user_factory.create_batch(20)
+        broadcast = NotificationBroadcast.objects.create(type="announcement")
+
+        with django_assert_max_num_queries(9):
+            broadcasts.deliver_chunk(broadcast.id, chunk_size=20)
+
+        assert Notification.objects.count() == 20
+
+    def test_completed_broadcast_is_not_delivered_again(self, user_factory, publish_notifications):
+        user_factory()
+        broadcast = NotificationBroadcast.objects.create(type="announcement")
+        broadcasts.deliver_broadcast(broadcast.id)
+
+        broadcasts.deliver_broadcast(broadcast.id)
+
+        assert Notification.objects.count() == 1
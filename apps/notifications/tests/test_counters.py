@@ -0,0 +1,88 @@
+import pytest
+from django.test import RequestFactory
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .. import counters, views
+from ..api.views import NotificationViewSet
+from ..models import Notification, UnreadNotificationCounter
+
+pytestmark = pytest.mark.django_db
+
+
+class TestUnreadCounters:
+    def test_created_notifications_are_counted(self, user_factory, notification_factory):
+        user = user_factory()
+        notification_factory.create_batch(3, user=user)
+
+        assert counters.get_unread_count(user) == 3
+
+    def test_counter_read_takes_one_query(self, user_factory, notification_factory, django_assert_num_queries):
+        user = user_factory()
+        notification_factory.create_batch(3, user=user)
+
+        with django_assert_num_queries(1):
+            counters.get_unread_count(user)
+
+    def test_marking_read_and_unread_updates_counter(self, user_factory, notification_factory):
+        user = user_factory()
+        notification, _ = notification_factory.create_batch(2, user=user)
+
+        notification.is_read = True
+        notification.save()
+        assert counters.get_unread_count(user) == 1
+
+        notification.is_read = False
+        notification.save()
+        assert counters.get_unread_count(user) == 2
+
+    def test_mark_read_queryset_updates_counters(self, user_factory, notification_factory):
+        user, other_user = user_factory.create_batch(2)
+        notification_factory.create_batch(3, user=user)
+        notification_factory.create_batch(2, user=other_user)
+
+        marked = Notification.objects.all().mark_read()
+
+        assert marked == 5
+        assert counters.get_unread_count(user) == 0
+        assert counters.get_unread_count(other_user) == 0
+        assert Notification.objects.all().mark_read() == 0
+
+    def test_concurrent_mark_read_requests_decrement_counter_once(self, mocker, user_factory, notification_factory):
+        user = user_factory()
+        notification, _ = notification_factory.create_batch(2, user=user)
+        # Both requests load the notification before either of them marks it read
+        for target, name in ((NotificationViewSet, "get_object"), (views, "get_object_or_404")):
+            mocker.patch.object(target, name, return_value=Notification.objects.get(pk=notification.pk))
+
+        api_request = APIRequestFactory().patch("/")
+        force_authenticate(api_request, user=user)
+        response = NotificationViewSet.as_view({"patch": "mark_read"})(api_request, pk=str(notification.pk))
+        request = RequestFactory().post("/")
+        request.user = user
+        views.mark_notification_read(request, pk=str(notification.pk))
+
+        assert response.data["is_read"]
+        assert counters.get_unread_count(user) == 1
+
+    def test_deleting_unread_notification_updates_counter(self, user_factory, notification_factory):
+        user = user_factory()
+        unread, read = notification_factory.create_batch(2, user=user)
+        read.is_read = True
+        read.save()
+
+        unread.delete()
+        read.delete()
+
+        assert counters.get_unread_count(user) == 0
+
+    def test_reconcile_fixes_drifted_counters(self, user_factory, notification_factory):
+        user, user_without_counter = user_factory.create_batch(2)
+        notification_factory.create_batch(2, user=user)
+        UnreadNotificationCounter.objects.filter(user=user).update(count=10)
+        Notification.objects.bulk_create([Notification(user=user_without_counter, type="bulk")])
+
+        assert counters.reconcile_unread_counts(chunk_size=1) == 2
+
+        assert counters.get_unread_count(user) == 2
+        assert counters.get_unread_count(user_without_counter) == 1
+        assert counters.reconcile_unread_counts() == 0
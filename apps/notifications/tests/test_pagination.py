@@ -0,0 +1,47 @@
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from .. import pagination
+from ..models import Notification
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def feed(user_factory, notification_factory):
+    user = user_factory()
+    created_at = timezone.now()
+    notifications = notification_factory.create_batch(5, user=user)
+    # Two notifications created at the same moment must still be ordered and paginated deterministically
+    for index, notification in enumerate(notifications):
+        notification.created_at = created_at - datetime.timedelta(minutes=index // 2)
+    Notification.objects.bulk_update(notifications, ["created_at"])
+    return Notification.objects.filter(user=user)
+
+
+class TestPaginateFeed:
+    def test_pages_cover_feed_in_order(self, feed):
+        pages = []
+        cursor = None
+        while True:
+            notifications, cursor = pagination.paginate_feed(feed, cursor, page_size=2)
+            pages.append(notifications)
+            if cursor is None:
+                break
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert [notification.id for page in pages for notification in page] == list(
+            feed.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+    def test_page_takes_single_query(self, feed, django_assert_num_queries):
+        _, cursor = pagination.paginate_feed(feed, None, page_size=2)
+
+        with django_assert_num_queries(1):
+            pagination.paginate_feed(feed, cursor, page_size=2)
+
+    def test_invalid_cursor(self, feed):
+        with pytest.raises(pagination.InvalidCursor):
+            pagination.paginate_feed(feed, "not-a-cursor", page_size=2)
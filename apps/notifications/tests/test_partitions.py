@@ -0,0 +1,117 @@
+import datetime
+import gzip
+import json
+
+import pytest
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
+from django.utils import timezone
+
+from .. import partitions
+from ..models import Notification
+
+pytestmark = pytest.mark.django_db
+
+NOW = datetime.datetime(2026, 3, 15, tzinfo=datetime.UTC)
+
+
+@pytest.fixture
+def archive_storage(settings, tmp_path):
+    settings.NOTIFICATION_ARCHIVE_STORAGE = "django.core.files.storage.FileSystemStorage"
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.NOTIFICATION_RETENTION_MONTHS = 2
+    return FileSystemStorage(location=tmp_path)
+
+
+def create_notification(notification_factory, user, created_at):
+    notification = notification_factory(user=user)
+    Notification.objects.filter(pk=notification.pk).update(created_at=created_at)
+    return notification
+
+
+class TestMonths:
+    @pytest.mark.parametrize("months, expected", [(1, (2026, 4)), (10, (2027, 1)), (-3, (2025, 12)), (-15, (2024, 12))])
+    def test_add_months(self, months, expected):
+        result = partitions.add_months(partitions.month_start(NOW), months)
+
+        assert (result.year, result.month) == expected
+
+    def test_retention_cutoff(self, settings):
+        settings.NOTIFICATION_RETENTION_MONTHS = 2
+
+        assert partitions.get_retention_cutoff(NOW) == datetime.datetime(2026, 1, 1, tzinfo=datetime.UTC)
+
+
+@pytest.mark.skipif(connection.vendor == "postgresql", reason="Partitioned tables drop whole partitions instead")
+class TestApplyRetention:
+    def test_archives_and_removes_expired_months(self, archive_storage, user_factory, notification_factory):
+        user = user_factory()
+        expired = [
+            create_notification(notification_factory, user, datetime.datetime(2025, 11, 20, tzinfo=datetime.UTC)),
+            create_notification(notification_factory, user, datetime.datetime(2025, 12, 31, tzinfo=datetime.UTC)),
+        ]
+        kept = create_notification(notification_factory, user, datetime.datetime(2026, 1, 1, tzinfo=datetime.UTC))
+
+        archived = partitions.apply_retention(now=NOW)
+
+        assert archived == ["notifications_notification_p202511", "notifications_notification_p202512"]
+        assert list(Notification.objects.values_list("id", flat=True)) == [kept.id]
+        with archive_storage.open("notifications/archive/notifications_notification_p202512.ndjson.gz") as archive:
+            rows = [json.loads(line) for line in gzip.decompress(archive.read()).splitlines()]
+        assert [row["id"] for row in rows] == [expired[1].id.id]
+
+    def test_nothing_expired(self, archive_storage, user_factory, notification_factory):
+        create_notification(notification_factory, user_factory(), NOW)
+
+        assert partitions.apply_retention(now=NOW) == []
+        assert Notification.objects.count() == 1
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="Notifications are only partitioned on PostgreSQL")
+class TestPartitionedTable:
+    def test_rows_without_partition_are_moved_from_default_partition(self, user_factory, notification_factory):
+        later = partitions.add_months(partitions.month_start(timezone.now()), 12)
+        # Maintenance did not run: the row lands in the default partition instead of failing
+        notification = create_notification(notification_factory, user_factory(), later)
+
+        created = partitions.create_partitions(now=later)
+
+        assert partitions.get_partition_name(later) in created
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {partitions.DEFAULT_PARTITION}")
+            assert cursor.fetchone() == (0,)
+            cursor.execute(
+                f"SELECT id FROM {partitions.get_partition_name(later)} WHERE id = %s", [notification.pk.id]
+            )
+            assert cursor.fetchone() == (notification.pk.id,)
+        assert partitions.DEFAULT_PARTITION in dict(partitions.get_partitions())
+
+    def test_creates_missing_partitions_ahead(self, settings, user_factory, notification_factory):
+        later = partitions.add_months(partitions.month_start(timezone.now()), 12)
+
+        created = partitions.create_partitions(now=later)
+
+        last_month = partitions.add_months(later, settings.NOTIFICATION_PARTITION_MONTHS_AHEAD)
+        assert created[-1] == partitions.get_partition_name(last_month)
+        assert partitions.create_partitions(now=later) == []
+        # Months missed while maintenance did not run have a partition too
+        notification = create_notification(notification_factory, user_factory(), partitions.add_months(later, -1))
+        assert Notification.objects.filter(pk=notification.pk).exists()
+
+    def test_archives_and_drops_expired_partitions(self, archive_storage, user_factory, notification_factory):
+        partitions.create_partitions()
+        current_month = partitions.month_start(timezone.now())
+        next_month = partitions.add_months(current_month, 1)
+        expired = create_notification(notification_factory, user_factory(), next_month)
+        kept = create_notification(notification_factory, user_factory(), partitions.add_months(current_month, 2))
+        partition_name = partitions.get_partition_name(next_month)
+
+        # Retention ends two months before, right after the partition of the expired notification
+        archived = partitions.apply_retention(now=partitions.add_months(current_month, 4))
+
+        assert partition_name in archived
+        assert partition_name not in {name for name, _ in partitions.get_partitions()}
+        assert list(Notification.objects.values_list("id", flat=True)) == [kept.id]
+        with archive_storage.open(f"notifications/archive/{partition_name}.ndjson.gz") as archive:
+            rows = [json.loads(line) for line in gzip.decompress(archive.read()).splitlines()]
+        assert [row["id"] for row in rows] == [expired.id.id]
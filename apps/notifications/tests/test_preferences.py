@@ -0,0 +1,83 @@
+import pytest
+from django.core.cache import cache
+
+from .. import preferences, sender
+from ..broadcasts import deliver_broadcast
+from ..models import Notification, NotificationBroadcast, NotificationPreference
+
+pytestmark = pytest.mark.django_db
+
+IN_APP = NotificationPreference.Channels.IN_APP
+EMAIL = NotificationPreference.Channels.EMAIL
+
+
+@pytest.fixture(autouse=True)
+def clear_preference_cache():
+    cache.clear()
+    preferences.preference_cache.clear_local()
+    yield
+    preferences.preference_cache.clear_local()
+
+
+def disable(user, notification_type, channel):
+    return NotificationPreference.objects.create(
+        user=user, notification_type=notification_type, channel=channel, enabled=False
+    )
+
+
+class TestPreferenceMatrix:
+    def test_channels_are_enabled_by_default(self, user_factory):
+        user = user_factory()
+        disable(user, "invitation", EMAIL)
+
+        matrix = preferences.get_preference_matrix(user)
+
+        assert matrix.get_enabled_channels("invitation", [IN_APP, EMAIL]) == [IN_APP]
+        assert matrix.is_enabled("other", EMAIL)
+        assert matrix.is_enabled("invitation", None)
+
+    def test_matrix_is_cached_until_preferences_change(
+        self, user_factory, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        user = user_factory()
+        preferences.get_preference_matrix(user)
+
+        with django_assert_num_queries(0):
+            assert preferences.get_preference_matrix(user).is_enabled("invitation", IN_APP)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            disable(user, "invitation", IN_APP)
+            # Until the commit, other requests still read the previous preferences
+            assert preferences.get_preference_matrix(user).is_enabled("invitation", IN_APP)
+
+        assert not preferences.get_preference_matrix(user).is_enabled("invitation", IN_APP)
+
+    def test_bulk_load_takes_one_query(self, user_factory, django_assert_num_queries):
+        users = user_factory.create_batch(3)
+        disable(users[1], "invitation", IN_APP)
+
+        with django_assert_num_queries(1):
+            matrices = preferences.load_preference_matrices(users)
+
+        assert [matrices[user.pk].is_enabled("invitation", IN_APP) for user in users] == [True, False, True]
+
+
+class TestPreferenceAwareSending:
+    def test_disabled_channel_is_skipped(self, user_factory):
+        user, other_user = user_factory.create_batch(2)
+        disable(user, "invitation", IN_APP)
+
+        sender.send_bulk_notification([user, other_user], "invitation", {}, issuer=None)
+
+        assert list(Notification.objects.values_list("user_id", flat=True)) == [other_user.pk]
+
+    def test_broadcast_skips_users_with_disabled_in_app_channel(self, user_factory, mocker):
+        mocker.patch("notifications.broadcasts.publish_notifications")
+        user, other_user = user_factory.create_batch(2)
+        disable(user, "announcement", IN_APP)
+        broadcast = NotificationBroadcast.objects.create(type="announcement")
+
+        broadcast = deliver_broadcast(broadcast.id)
+
+        assert broadcast.recipients_count == 1
+        assert list(Notification.objects.values_list("user_id", flat=True)) == [other_user.pk]
@@ -0,0 +1,99 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from .. import scheduled
+from ..models import Notification, ScheduledNotification
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def publish_notifications(mocker):
+    return mocker.patch("notifications.scheduled.publish_notifications")
+
+
+def schedule(user, scheduled_for, **kwargs):
+    return ScheduledNotification.objects.create(user=user, type="reminder", scheduled_for=scheduled_for, **kwargs)
+
+
+class TestDispatchDueNotifications:
+    def test_sends_due_notifications_only(self, user_factory):
+        user = user_factory()
+        now = timezone.now()
+        due = [schedule(user, now - datetime.timedelta(minutes=minutes), data={"n": minutes}) for minutes in range(5)]
+        future = schedule(user, now + datetime.timedelta(hours=1))
+        already_sent = schedule(user, now - datetime.timedelta(hours=1), sent=True)
+
+        sent_count = scheduled.dispatch_due_notifications(chunk_size=2)
+
+        assert sent_count == 5
+        assert sorted(Notification.objects.values_list("data__n", flat=True)) == list(range(5))
+        for notification in due:
+            notification.refresh_from_db()
+            assert notification.sent and notification.sent_at is not None
+        future.refresh_from_db()
+        already_sent.refresh_from_db()
+        assert not future.sent
+        assert already_sent.sent_at is None
+
+    def test_sent_notifications_are_not_sent_again(self, user_factory):
+        schedule(user_factory(), timezone.now())
+        scheduled.dispatch_due_notifications()
+
+        assert scheduled.dispatch_due_notifications() == 0
+        assert Notification.objects.count() == 1
+
+    def test_chunk_takes_constant_number_of_queries(self, user_factory, django_assert_max_num_queries):
+        user = user_factory()
+        for _ in range(20):
+            schedule(user, timezone.now())
+
+        with django_assert_max_num_queries(8):
+            assert scheduled.dispatch_due_chunk(chunk_size=20) == 20
+
+
+class TestDispatchQueuedNotifications:
+    @pytest.fixture(autouse=True)
+    def local_queue(self, settings):
+        settings.REDIS_CONNECTION = None
+        scheduled.scheduled_notifications_queue.clear()
+        yield
+        scheduled.scheduled_notifications_queue.clear()
+
+    def test_sends_notifications_registered_on_save(self, user_factory, django_capture_on_commit_callbacks):
+        now = timezone.now()
+        with django_capture_on_commit_callbacks(execute=True):
+            due = schedule(user_factory(), now)
+            schedule(user_factory(), now + datetime.timedelta(hours=1))
+
+        assert scheduled.dispatch_queued_notifications(10, now=now) == 1
+
+        due.refresh_from_db()
+        assert due.sent
+        assert list(Notification.objects.values_list("user_id", flat=True)) == [due.user_id]
+
+    def test_deleted_notification_is_dequeued(self, user_factory, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            scheduled_notification = schedule(user_factory(), timezone.now())
+
+        scheduled_notification.delete()
+
+        assert scheduled.scheduled_notifications_queue.next_due_at() is None
+
+
+class TestDispatchScheduledNotificationsCommand:
+    def test_keeps_dispatching_after_errors(self, mocker):
+        command_module = "notifications.management.commands.dispatch_scheduled_notifications"
+        dispatch = mocker.patch(f"{command_module}.dispatch_queued_notifications", side_effect=[RuntimeError, 2])
+        close_old_connections = mocker.patch(f"{command_module}.close_old_connections")
+        # Stops the loop after its second iteration
+        mocker.patch(f"{command_module}.time.sleep", side_effect=[None, KeyboardInterrupt])
+
+        with pytest.raises(KeyboardInterrupt):
+            call_command("dispatch_scheduled_notifications", poll_interval=0.1)
+
+        assert dispatch.call_count == 2
+        assert close_old_connections.call_count == 2
@@ -1,12 +1,14 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.views.generic import ListView
 
 from . import models
+from .pagination import InvalidCursor, paginate_feed
+from .services import NotificationService
 
 
 class NotificationListView(LoginRequiredMixin, ListView):
@@ -19,7 +21,28 @@ class NotificationListView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         return models.Notification.objects.filter(
             user=self.request.user
-        ).order_by('-created_at')
+        ).order_by('-created_at', '-id')
+
+    def get_template_names(self):
+        # "Load more" requests only need the next page of items
+        if self.request.headers.get('HX-Request'):
+            return ['notifications/partials/notification_page.html']
+        return super().get_template_names()
+
+    def paginate_queryset(self, queryset, page_size):
+        """Keyset pagination: pages follow the `cursor` query parameter instead of a page number."""
+        try:
+            notifications, self.next_cursor = paginate_feed(
+                queryset, self.request.GET.get('cursor'), page_size
+            )
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+        return None, None, notifications, self.next_cursor is not None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = self.next_cursor
+        return context
 
 
 @login_required
@@ -28,8 +51,9 @@ def mark_notification_read(request, pk):
     notification = get_object_or_404(
         models.Notification, pk=pk, user=request.user
     )
-    notification.is_read = True
-    notification.save()
+    # A conditional UPDATE, so concurrent requests cannot both decrement the unread counter
+    models.Notification.objects.filter(pk=notification.pk).mark_read()
+    notification.refresh_from_db()
     
     if request.headers.get('HX-Request'):
         return render(request, 'notifications/partials/notification_item.html', {
@@ -42,9 +66,7 @@ def mark_notification_read(request, pk):
 @login_required
 def mark_all_notifications_read(request):
     """Mark all notifications as read."""
-    models.Notification.objects.filter(
-        user=request.user, is_read=False
-    ).update(is_read=True)
+    NotificationService.mark_read_all_user_notifications(request.user)
     
     messages.success(request, 'All notifications marked as read.')
     
@@ -0,0 +1,182 @@
+"""
+Micro-batching of high-volume tasks.
+
+`@batched_task` turns a handler of many items into a task whose calls are collected instead of being sent to the
+broker one by one. `.delay(...)` appends the call to a buffer (a Redis list, or process memory without Redis) and only
+sends a flush message when the buffer gets its first item (delayed by `max_wait_ms`) or reaches `max_size` items. The
+flush task runs the handler once per batch of up to `max_size` calls, so it can use bulk ORM operations and checks out
+a single database connection. Should a flush message be lost (e.g. a broker hiccup), the periodic
+`flush_batched_tasks` task sends a flush for every batched task with buffered calls, so they are not stranded until
+the buffer next fills up.
+
+Every call still gets its own result: `.delay()` returns an `AsyncResult` whose id is stored with the result (or the
+exception) of that call only. When the handler raises for a whole batch, its calls are run again one by one, so a
+single bad item does not fail the others.
+"""
+
+import logging
+import threading
+import uuid
+from dataclasses import dataclass, field
+
+from celery import shared_task
+from celery.result import AsyncResult
+from django.conf import settings
+from kombu.utils.json import dumps, loads
+
+from core.redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+# Batched tasks by name, flushed periodically by `flush_batched_tasks`
+registry: dict[str, "BatchedTask"] = {}
+
+
+@dataclass
+class BatchItem:
+    id: str
+    args: list = field(default_factory=list)
+    kwargs: dict = field(default_factory=dict)
+
+
+class BatchedTask:
+    def __init__(self, handler, name: str, max_size: int, max_wait_ms: int):
+        self.handler = handler
+        self.name = name
+        self.max_size = max_size
+        self.max_wait_ms = max_wait_ms
+
+        self._local_buffer = []
+        self._local_buffer_lock = threading.Lock()
+
+        def flush():
+            return self.flush()
+
+        self.flush_task = shared_task(name=f"{name}.flush")(flush)
+        registry[name] = self
+
+    @property
+    def key(self) -> str:
+        return f"tasks:batch:{self.name}"
+
+    def __call__(self, *args, **kwargs):
+        """Run a single call synchronously, like calling a task does."""
+        (result,) = self.handler([BatchItem(id=str(uuid.uuid4()), args=list(args), kwargs=kwargs)])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def delay(self, *args, **kwargs) -> AsyncResult:
+        item = BatchItem(id=str(uuid.uuid4()), args=list(args), kwargs=kwargs)
+        length = self._push(item)
+
+        if length % self.max_size == 0:
+            self.flush_task.delay()
+        elif length == 1:
+            # The first call of a batch waits at most max_wait_ms for others to join it
+            self.flush_task.apply_async(countdown=self.max_wait_ms / 1000)
+
+        return AsyncResult(item.id)
+
+    def flush(self) -> dict:
+        """Run the handler over the buffered calls, batch by batch; returns the number of calls run and failed."""
+        processed = failed = 0
+        while items := self._pop(self.max_size):
+            results = self._run(items)
+            for item, result in zip(items, results, strict=True):
+                failed += isinstance(result, Exception)
+                self._store(item, result)
+            processed += len(items)
+
+        return {"processed": processed, "failed": failed}
+
+    def _run(self, items: list[BatchItem]) -> list:
+        """
+        Results of the handler in the order of `items`; the handler returns an exception instance for an item it failed.
+        """
+        try:
+            return self.handler(items)
+        except Exception as e:
+            if len(items) == 1:
+                return [e]
+            logger.warning(f"Batch of {len(items)} {self.name} calls failed, running them one by one: {e}")
+
+        results = []
+        for item in items:
+            try:
+                results.extend(self.handler([item]))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    @staticmethod
+    def _store(item: BatchItem, result):
+        from .celery import app
+
+        try:
+            if isinstance(result, Exception):
+                app.backend.mark_as_failure(item.id, result)
+            else:
+                app.backend.mark_as_done(item.id, result)
+        except Exception as e:
+            logger.error(f"Could not store the result of batched call {item.id}: {e}")
+
+    def _push(self, item: BatchItem) -> int:
+        entry = dumps({"id": item.id, "args": item.args, "kwargs": item.kwargs})
+        if (redis := get_redis_connection()) is None:
+            with self._local_buffer_lock:
+                self._local_buffer.append(entry)
+                return len(self._local_buffer)
+
+        return redis.rpush(self.key, entry)
+
+    def pending_count(self) -> int:
+        """Number of buffered calls waiting for a flush."""
+        if (redis := get_redis_connection()) is None:
+            with self._local_buffer_lock:
+                return len(self._local_buffer)
+
+        return redis.llen(self.key)
+
+    def _pop(self, size: int) -> list[BatchItem]:
+        if (redis := get_redis_connection()) is None:
+            with self._local_buffer_lock:
+                entries = self._local_buffer[:size]
+                del self._local_buffer[:size]
+        else:
+            pipeline = redis.pipeline(transaction=True)
+            pipeline.lrange(self.key, 0, size - 1)
+            pipeline.ltrim(self.key, size, -1)
+            entries, _ = pipeline.execute()
+
+        return [BatchItem(**loads(entry)) for entry in entries]
+
+
+@shared_task
+def flush_batched_tasks():
+    """Send a flush for every batched task with buffered calls, in case the flush message of a batch was lost."""
+    flushed = []
+    for name, task in registry.items():
+        if task.pending_count():
+            task.flush_task.delay()
+            flushed.append(name)
+    return {"flushed": flushed}
+
+
+def batched_task(max_size: int | None = None, max_wait_ms: int | None = None, name: str | None = None):
+    """
+    Decorate `handler(items: list[BatchItem]) -> list` as a micro-batched task.
+
+    The handler returns one result per item, in order; an exception instance as the result of an item marks that call
+    as failed.
+    """
+
+    def decorator(handler) -> BatchedTask:
+        return BatchedTask(
+            handler,
+            name=name or f"{handler.__module__}.{handler.__name__}",
+            max_size=max_size or settings.TASK_BATCH_MAX_SIZE,
+            max_wait_ms=max_wait_ms if max_wait_ms is not None else settings.TASK_BATCH_MAX_WAIT_MS,
+        )
+
+    return decorator
@@ -1,7 +1,7 @@
 import os
 
 from celery import Celery
-from celery.schedules import crontab
+from celery.signals import task_postrun, task_prerun
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
@@ -15,20 +15,22 @@ app.autodiscover_tasks(
     ]
 )
 
-# Celery Beat schedule for periodic tasks
-app.conf.beat_schedule = {
-    "sync-content-every-hour": {
-        "task": "tasks.content_tasks.sync_content",
-        "schedule": crontab(minute=0),
-    },
-    "send-scheduled-notifications": {
-        "task": "tasks.notification_tasks.send_scheduled_notifications",
-        "schedule": crontab(minute="*/5"),
-    },
-    "cleanup-expired-tokens": {
-        "task": "tasks.scheduler.cleanup_expired_tokens",
-        "schedule": crontab(hour=0, minute=0),
-    },
-}
-
-app.conf.timezone = "UTC"
+# Channel layer messages committed by a task are sent as one batch when it ends, see core.publisher
+_publisher_batches = {}
+
+
+@task_prerun.connect
+def start_publisher_batch(task_id, **kwargs):
+    from core.publisher import channel_layer_publisher
+
+    _publisher_batches[task_id] = channel_layer_publisher.start_batch()
+
+
+@task_postrun.connect
+def end_publisher_batch(task_id, **kwargs):
+    from core.publisher import channel_layer_publisher
+
+    channel_layer_publisher.end_batch(_publisher_batches.pop(task_id, None))
+
+
+# The beat schedule is the CELERY_BEAT_SCHEDULE setting, shared with the config.celery app that deployments run
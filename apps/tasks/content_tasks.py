@@ -1,54 +1,90 @@
 import logging
 
 from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from .batching import BatchItem, batched_task
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task
-def sync_content():
-    """Synchronize content from external CMS (Contentful)."""
-    from content.models import ContentItem
+def sync_content(full: bool = False):
+    """
+    Synchronize content from external CMS (Contentful): only the entries changed since the last sync are applied,
+    `full=True` resynchronizes every entry.
+    """
+    from content.sync import sync_contentful
     from integrations.services.contentful_service import ContentfulService
 
-    logger.info("Starting content synchronization")
+    logger.info(f"Starting {'full' if full else 'incremental'} content synchronization")
 
     try:
-        service = ContentfulService()
-        entries = service.get_all_entries()
-
-        synced_count = 0
-        for entry in entries:
-            ContentItem.objects.update_or_create(
-                external_id=entry["id"],
-                defaults={
-                    "content_type": entry["content_type"],
-                    "fields": entry["fields"],
-                    "is_published": True,
-                },
-            )
-            synced_count += 1
+        result = sync_contentful(ContentfulService(), full=full)
 
-        # Mark missing entries as unpublished
-        existing_ids = [e["id"] for e in entries]
-        ContentItem.objects.exclude(external_id__in=existing_ids).update(is_published=False)
-
-        logger.info(f"Synced {synced_count} content items")
-        return {"synced_count": synced_count}
+        logger.info(
+            f"Synced {result.synced_count} content items: {result.written_count} written, "
+            f"{result.unpublished_count} unpublished"
+        )
+        return result.as_dict()
     except Exception as e:
         logger.error(f"Error syncing content: {e}")
         return {"error": str(e)}
 
 
-@shared_task
-def process_uploaded_document(document_id: int):
-    """Process an uploaded document (extract text, generate thumbnails, etc.)."""
+@batched_task(max_wait_ms=settings.CONTENTFUL_WEBHOOK_DEBOUNCE_MS)
+def apply_contentful_event(items: list[BatchItem]) -> list:
+    """
+    Apply a Contentful webhook event to its entry; called as `apply_contentful_event.delay(entry_id, event,
+    content_type)` with a `publish`, `unpublish` or `delete` event.
+
+    Events are collected for CONTENTFUL_WEBHOOK_DEBOUNCE_MS before being applied, so a burst of events for an entry
+    results in a single fetch. Entries of Contentful models (e.g. `DemoItem`) are still synced by the `ContentfulSync`
+    lambda, triggered once per batch.
+    """
+    from content import tasks as lambda_tasks
+    from content.sync import is_contentful_model_content_type, sync_entry_ids
+    from integrations.services.contentful_service import ContentfulService
+
+    events = [_contentful_event_arguments(*item.args, **item.kwargs) for item in items]
+    result = sync_entry_ids(ContentfulService(), [entry_id for entry_id, _, _ in events])
+    if any(is_contentful_model_content_type(content_type) for _, _, content_type in events):
+        lambda_tasks.ContentfulSync("complete").apply()
+
+    logger.info(
+        f"Applied {len(items)} Contentful events: {result.written_count} written, "
+        f"{result.unpublished_count} unpublished"
+    )
+    return [result.as_dict()] * len(items)
+
+
+def _contentful_event_arguments(entry_id: str, event: str, content_type: str | None = None) -> tuple:
+    return entry_id, event, content_type
+
+
+@batched_task()
+def process_uploaded_document(items: list[BatchItem]) -> list:
+    """
+    Process uploaded documents (extract text, generate thumbnails, etc.); called as
+    `process_uploaded_document.delay(document_id)`.
+
+    The documents of a batch are loaded with one query and marked processed with one `bulk_update`.
+    """
     from content.models import Document
 
-    logger.info(f"Processing document {document_id}")
+    to_document_id = Document._meta.pk.to_python
+    document_ids = [to_document_id(item.args[0] if item.args else item.kwargs["document_id"]) for item in items]
+    documents = {document.id.id: document for document in Document.objects.filter(id__in=document_ids)}
 
-    try:
-        document = Document.objects.get(id=document_id)
+    results = []
+    processed = []
+    for document_id in document_ids:
+        document = documents.get(document_id.id)
+        if document is None:
+            logger.error(f"Document {document_id} not found")
+            results.append({"error": "Document not found"})
+            continue
 
         # Generate thumbnail if image
         if document.file.name.lower().endswith((".png", ".jpg", ".jpeg", ".gif")):
@@ -61,16 +97,14 @@ def process_uploaded_document(document_id: int):
             pass
 
         document.is_processed = True
-        document.save()
+        document.updated_at = timezone.now()
+        processed.append(document)
+        results.append({"document_id": str(document_id), "status": "processed"})
 
-        logger.info(f"Document {document_id} processed successfully")
-        return {"document_id": document_id, "status": "processed"}
-    except Document.DoesNotExist:
-        logger.error(f"Document {document_id} not found")
-        return {"error": "Document not found"}
-    except Exception as e:
-        logger.error(f"Error processing document: {e}")
-        return {"error": str(e)}
+    Document.objects.bulk_update(processed, ["is_processed", "extracted_text", "thumbnail", "updated_at"])
+
+    logger.info(f"Processed {len(processed)} documents")
+    return results
 
 
 @shared_task
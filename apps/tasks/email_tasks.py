@@ -1,22 +1,68 @@
 import logging
+from collections import defaultdict
 
 from celery import shared_task
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+
+from .batching import BatchItem, batched_task
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task
-def send_email_task(to_email: str, subject: str, template_name: str, context: dict = None):
-    """Send an email using a template."""
-    context = context or {}
+@batched_task()
+def send_email_task(items: list[BatchItem]) -> list:
+    """
+    Send emails using a template; called as `send_email_task.delay(to_email, subject, template_name, context)`.
 
-    try:
-        html_content = render_to_string(f"emails/{template_name}.html", context)
-        text_content = render_to_string(f"emails/{template_name}.txt", context)
+    The emails of a batch sharing a template are rendered together, so the parts they have in common are rendered once,
+    and all of them are delivered over reused backend connections.
+    """
+    from core.email_delivery import deliver_messages
+
+    calls_by_template = defaultdict(list)
+    for index, item in enumerate(items):
+        to_email, subject, template_name, context = _send_email_task_arguments(*item.args, **item.kwargs)
+        calls_by_template[template_name].append((index, to_email, subject, context or {}))
+
+    results = [None] * len(items)
+    messages = {}
+    for template_name, calls in calls_by_template.items():
+        try:
+            emails = _build_emails(template_name, calls)
+        except Exception as e:
+            logger.error(f"Error rendering email: {e}")
+            for index, *_ in calls:
+                results[index] = {"error": str(e)}
+            continue
+        for (index, *_), email in zip(calls, emails, strict=True):
+            messages[index] = email
+
+    for index, delivery in zip(messages, deliver_messages(list(messages.values())), strict=True):
+        to_email = delivery.message.to[0]
+        if delivery.sent:
+            logger.info(f"Email sent to {to_email}: {delivery.message.subject}")
+            results[index] = {"status": "sent", "to": to_email}
+        else:
+            logger.error(f"Error sending email to {to_email}: {delivery.failed_recipients[to_email]}")
+            results[index] = {"error": delivery.failed_recipients[to_email]}
+
+    return results
 
+
+def _send_email_task_arguments(to_email: str, subject: str, template_name: str, context: dict = None):
+    return to_email, subject, template_name, context
+
+
+def _build_emails(template_name: str, calls: list[tuple]) -> list[EmailMultiAlternatives]:
+    from core.email_templates import get_email_template
+
+    contexts = [context for *_, context in calls]
+    html_contents = get_email_template(f"emails/{template_name}.html").render_many(contexts)
+    text_contents = get_email_template(f"emails/{template_name}.txt").render_many(contexts)
+
+    emails = []
+    for (_, to_email, subject, _), html_content, text_content in zip(calls, html_contents, text_contents, strict=True):
         email = EmailMultiAlternatives(
             subject=subject,
             body=text_content,
@@ -24,13 +70,8 @@ def send_email_task(to_email: str, subject: str, template_name: str, context: di
             to=[to_email],
         )
         email.attach_alternative(html_content, "text/html")
-        email.send()
-
-        logger.info(f"Email sent to {to_email}: {subject}")
-        return {"status": "sent", "to": to_email}
-    except Exception as e:
-        logger.error(f"Error sending email: {e}")
-        return {"error": str(e)}
+        emails.append(email)
+    return emails
 
 
 @shared_task
@@ -0,0 +1,16 @@
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_login_attempts():
+    """Write buffered login attempts to the database."""
+    from iam.services import login_attempts
+
+    flushed = login_attempts.flush_login_attempts()
+    if flushed:
+        logger.info(f"Flushed {flushed} login attempts")
+    return {"flushed": flushed}
@@ -1,63 +1,54 @@
 import logging
+from collections import Counter
 
-from asgiref.sync import async_to_sync
 from celery import shared_task
-from channels.layers import get_channel_layer
+from django.db import transaction
 from django.utils import timezone
 
+from .batching import BatchItem, batched_task
+
 logger = logging.getLogger(__name__)
 
 
-@shared_task
-def create_notification(user_id: int, notification_type: str, data: dict = None):
-    """Create a notification and send it via WebSocket."""
+@batched_task()
+def create_notification(items: list[BatchItem]) -> list:
+    """
+    Create notifications and send them via WebSocket; called as `create_notification.delay(user_id, type, data)`.
+
+    The notifications of a batch are written with one `bulk_create` and published together.
+    """
+    from django.contrib.auth import get_user_model
+
+    from notifications import counters
+    from notifications.broadcasts import publish_notifications
     from notifications.models import Notification
 
-    try:
-        notification = Notification.objects.create(
-            user_id=user_id,
-            type=notification_type,
-            data=data or {},
+    to_user_id = get_user_model()._meta.pk.to_python
+    calls = [_create_notification_arguments(*item.args, **item.kwargs) for item in items]
+    with transaction.atomic():
+        notifications = Notification.objects.bulk_create(
+            [
+                Notification(user_id=to_user_id(user_id), type=notification_type, data=data or {})
+                for user_id, notification_type, data in calls
+            ]
         )
+        counters.add_unread(Counter(notification.user_id for notification in notifications))
+        publish_notifications(notifications)
+
+    logger.info(f"Created {len(notifications)} notifications")
+    return [{"notification_id": str(notification.id)} for notification in notifications]
 
-        # Send via WebSocket
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f"notifications_{user_id}",
-            {
-                "type": "notification_message",
-                "notification": {
-                    "id": str(notification.id),
-                    "type": notification.type,
-                    "data": notification.data,
-                    "is_read": notification.is_read,
-                    "created_at": notification.created_at.isoformat(),
-                },
-            },
-        )
 
-        logger.info(f"Notification created for user {user_id}: {notification_type}")
-        return {"notification_id": str(notification.id)}
-    except Exception as e:
-        logger.error(f"Error creating notification: {e}")
-        return {"error": str(e)}
+def _create_notification_arguments(user_id: int, notification_type: str, data: dict = None):
+    return user_id, notification_type, data
 
 
 @shared_task
 def send_scheduled_notifications():
-    """Send all scheduled notifications that are due."""
-    from notifications.models import ScheduledNotification
-
-    now = timezone.now()
-    due_notifications = ScheduledNotification.objects.filter(scheduled_for__lte=now, sent=False)
+    """Send all scheduled notifications that are due. Safe to run on several workers at once."""
+    from notifications.scheduled import dispatch_due_notifications
 
-    sent_count = 0
-    for scheduled in due_notifications:
-        create_notification.delay(user_id=scheduled.user_id, notification_type=scheduled.type, data=scheduled.data)
-        scheduled.sent = True
-        scheduled.sent_at = now
-        scheduled.save()
-        sent_count += 1
+    sent_count = dispatch_due_notifications()
 
     logger.info(f"Sent {sent_count} scheduled notifications")
     return {"sent_count": sent_count}
@@ -66,21 +57,52 @@ def send_scheduled_notifications():
 @shared_task
 def broadcast_notification(notification_type: str, data: dict = None, tenant_id: str = None):
     """Broadcast a notification to all users or all users in a tenant."""
-    from multitenancy.models import TenantMembership
-    from iam.models import User
+    from notifications.models import NotificationBroadcast
 
-    if tenant_id:
-        user_ids = TenantMembership.objects.filter(tenant_id=tenant_id, is_active=True).values_list(
-            "user_id", flat=True
-        )
-    else:
-        user_ids = User.objects.filter(is_active=True).values_list("id", flat=True)
+    broadcast = NotificationBroadcast.objects.create(type=notification_type, data=data or {}, tenant_id=tenant_id)
+    deliver_notification_broadcast.delay(broadcast_id=str(broadcast.id))
+
+    logger.info(f"Started notification broadcast {broadcast.id}")
+    return {"broadcast_id": str(broadcast.id)}
+
+
+# Acknowledged only once finished, so a broadcast whose worker died is redelivered and resumes from its cursor
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def deliver_notification_broadcast(self, broadcast_id: str):
+    """Deliver a broadcast in chunks, reporting the number of notified users as task progress."""
+    from notifications.broadcasts import deliver_broadcast
+
+    def report_progress(broadcast):
+        if self.request.id and not self.request.is_eager:
+            self.update_state(state="PROGRESS", meta={"broadcast_id": broadcast_id, "sent": broadcast.recipients_count})
+
+    broadcast = deliver_broadcast(broadcast_id, on_progress=report_progress)
+
+    logger.info(f"Broadcast notification {broadcast_id} to {broadcast.recipients_count} users")
+    return {"broadcast_id": broadcast_id, "broadcast_to": broadcast.recipients_count}
 
-    for user_id in user_ids:
-        create_notification.delay(user_id=user_id, notification_type=notification_type, data=data)
 
-    logger.info(f"Broadcast notification to {len(user_ids)} users")
-    return {"broadcast_to": len(user_ids)}
+@shared_task
+def resume_notification_broadcasts():
+    """Restart broadcasts that stopped making progress, e.g. because their worker was killed."""
+    from datetime import timedelta
+
+    from django.conf import settings
+    from notifications.models import NotificationBroadcast
+
+    stalled_before = timezone.now() - timedelta(seconds=settings.NOTIFICATION_BROADCAST_STALLED_AFTER)
+    broadcast_ids = NotificationBroadcast.objects.filter(
+        completed_at__isnull=True, updated_at__lt=stalled_before
+    ).values_list("id", flat=True)
+
+    resumed_count = 0
+    for broadcast_id in broadcast_ids:
+        deliver_notification_broadcast.delay(broadcast_id=str(broadcast_id))
+        resumed_count += 1
+
+    if resumed_count:
+        logger.info(f"Resumed {resumed_count} stalled notification broadcasts")
+    return {"resumed_count": resumed_count}
 
 
 @shared_task
@@ -89,12 +111,42 @@ def mark_old_notifications_read(user_id: int, days: int = 30):
     from datetime import timedelta
 
     from notifications.models import Notification
+    from notifications.partitions import get_retention_cutoff
 
     cutoff_date = timezone.now() - timedelta(days=days)
 
-    updated = Notification.objects.filter(user_id=user_id, is_read=False, created_at__lt=cutoff_date).update(
-        is_read=True, read_at=timezone.now()
-    )
+    # Notifications past retention are about to be archived, leave their partitions alone
+    updated = Notification.objects.filter(
+        user_id=user_id, created_at__lt=cutoff_date, created_at__gte=get_retention_cutoff()
+    ).mark_read()
 
     logger.info(f"Marked {updated} old notifications as read for user {user_id}")
     return {"marked_read": updated}
+
+
+@shared_task
+def reconcile_unread_notification_counters():
+    """Fix unread notification counters that drifted from the notifications table."""
+    from notifications.counters import reconcile_unread_counts
+
+    fixed_count = reconcile_unread_counts()
+
+    if fixed_count:
+        logger.warning(f"Fixed {fixed_count} unread notification counters")
+    return {"fixed_count": fixed_count}
+
+
+@shared_task
+def maintain_notification_partitions():
+    """Create upcoming notification partitions, then archive and remove notifications past retention."""
+    from notifications.counters import reconcile_unread_counts
+    from notifications.partitions import apply_retention, create_partitions
+
+    created = create_partitions()
+    archived = apply_retention()
+    if archived:
+        # Expired unread notifications no longer count
+        reconcile_unread_counts()
+
+    logger.info(f"Created notification partitions {created}, archived {archived}")
+    return {"created": created, "archived": archived}
@@ -0,0 +1,3 @@
+"""Imported by Celery's task autodiscovery, which looks for a `tasks` module in every app, to register all tasks."""
+
+from . import content_tasks, email_tasks, iam_tasks, notification_tasks, scheduler  # noqa: F401
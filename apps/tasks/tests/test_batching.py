@@ -0,0 +1,91 @@
+import pytest
+
+from notifications.models import Notification, UnreadNotificationCounter
+
+from ..batching import BatchedTask, flush_batched_tasks, registry
+from ..notification_tasks import create_notification
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def local_buffer(settings, mocker):
+    settings.REDIS_CONNECTION = None
+    # Batched tasks made by tests must not outlive them
+    mocker.patch.dict(registry)
+
+
+def make_task(mocker, handler, max_size=3, name="tests.batched"):
+    task = BatchedTask(handler, name=name, max_size=max_size, max_wait_ms=100)
+    mocker.patch.object(task, "flush_task")
+    return task
+
+
+class TestBatchedTask:
+    def test_sends_flush_on_first_call_and_when_full(self, mocker):
+        task = make_task(mocker, lambda items: [None for _ in items])
+
+        for value in range(4):
+            task.delay(value)
+
+        task.flush_task.apply_async.assert_called_once_with(countdown=0.1)
+        task.flush_task.delay.assert_called_once_with()
+
+    def test_runs_handler_once_per_batch(self, mocker):
+        handler = mocker.Mock(side_effect=lambda items: [item.args[0] * 2 for item in items])
+        task = make_task(mocker, handler)
+
+        results = [task.delay(value) for value in range(5)]
+
+        assert task.flush() == {"processed": 5, "failed": 0}
+        assert [len(call.args[0]) for call in handler.call_args_list] == [3, 2]
+        assert [result.get() for result in results] == [0, 2, 4, 6, 8]
+
+    def test_reports_failures_per_call(self, mocker):
+        def handler(items):
+            if any(item.kwargs["value"] < 0 for item in items):
+                raise ValueError("negative")
+            return [item.kwargs["value"] for item in items]
+
+        task = make_task(mocker, handler)
+        ok, failed = task.delay(value=1), task.delay(value=-1)
+
+        assert task.flush() == {"processed": 2, "failed": 1}
+        assert ok.get() == 1
+        with pytest.raises(ValueError):
+            failed.get()
+
+    def test_handler_can_fail_single_items(self, mocker):
+        task = make_task(mocker, lambda items: [LookupError(item.args[0]) if item.args[0] else 1 for item in items])
+        ok, failed = task.delay(0), task.delay(1)
+
+        assert task.flush() == {"processed": 2, "failed": 1}
+        assert ok.get() == 1
+        assert failed.state == "FAILURE"
+
+
+class TestFlushBatchedTasks:
+    def test_flushes_tasks_with_buffered_calls(self, mocker):
+        mocker.patch.dict(registry, clear=True)
+        idle = make_task(mocker, lambda items: [None for _ in items], name="tests.idle")
+        stranded = make_task(mocker, lambda items: [None for _ in items], name="tests.stranded")
+        stranded.delay(1)
+
+        assert flush_batched_tasks() == {"flushed": ["tests.stranded"]}
+        idle.flush_task.delay.assert_not_called()
+        stranded.flush_task.delay.assert_called_once_with()
+
+
+class TestCreateNotification:
+    def test_creates_batch_of_notifications(self, mocker, user_factory):
+        mocker.patch.object(create_notification, "flush_task")
+        publish_notifications = mocker.patch("notifications.broadcasts.publish_notifications")
+        users = user_factory.create_batch(2)
+
+        results = [create_notification.delay(user.id.id, "info", {"title": "Hello"}) for user in users]
+        create_notification.flush()
+
+        notifications = Notification.objects.filter(type="info", data={"title": "Hello"})
+        assert {result.get()["notification_id"] for result in results} == {str(n.id) for n in notifications}
+        assert {counter.count for counter in UnreadNotificationCounter.objects.filter(user__in=users)} == {1}
+        publish_notifications.assert_called_once()
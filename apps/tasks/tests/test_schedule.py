@@ -0,0 +1,15 @@
+import pytest
+from django.conf import settings
+
+from config.celery import app as deployed_app
+
+from ..celery import app
+
+
+@pytest.mark.parametrize("celery_app", [deployed_app, app], ids=["config", "tasks"])
+def test_beat_schedule_tasks_are_registered(celery_app):
+    celery_app.loader.import_default_modules()
+
+    assert celery_app.conf.beat_schedule == settings.CELERY_BEAT_SCHEDULE
+    assert "maintain-notification-partitions" in celery_app.conf.beat_schedule
+    assert {entry["task"] for entry in celery_app.conf.beat_schedule.values()} <= set(celery_app.tasks)
@@ -1,6 +1,5 @@
 import json
 
-from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.contrib.auth import get_user_model
 
@@ -118,12 +117,8 @@ class TenantConsumer(AsyncWebsocketConsumer):
         """Handle tenant update notifications"""
         await self.send(text_data=json.dumps({"type": "tenant_update", "data": event["data"]}))
 
-    @database_sync_to_async
-    def verify_tenant_access(self):
-        """Verify if user has access to the tenant"""
-        from multitenancy.models import TenantMembership
+    async def verify_tenant_access(self):
+        """Verify if user has access to the tenant, served from the tenant role cache when warm"""
+        from multitenancy.middleware import aget_current_user_role
 
-        try:
-            return TenantMembership.objects.filter(user=self.user, tenant_id=self.tenant_id, is_accepted=True).exists()
-        except Exception:
-            return False
+        return await aget_current_user_role(self.tenant_id, self.user) is not None
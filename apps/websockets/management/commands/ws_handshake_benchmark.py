@@ -0,0 +1,97 @@
+import asyncio
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from iam import jwt
+from iam.authentication import JSONWebTokenCookieMiddleware
+from iam.services import user_snapshots
+from multitenancy import cache as tenant_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the WebSocket handshake under a reconnect storm. The first round starts with cold user and tenant "
+        "caches, the following rounds reconnect the same clients against warm caches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Username or email of the connecting user, defaults to the first active user")
+        parser.add_argument("--tenant", help="Tenant ID; connects to the tenant consumer instead of notifications")
+        parser.add_argument("--connections", type=int, default=1000, help="Connections opened per round")
+        parser.add_argument("--concurrency", type=int, default=200, help="Handshakes in flight at the same time")
+        parser.add_argument("--rounds", type=int, default=3)
+        parser.add_argument("--timeout", type=float, default=10, help="Handshake timeout in seconds")
+
+    def get_user(self, identifier):
+        users = get_user_model().objects.filter(is_active=True)
+        if identifier:
+            user = (users.filter(username=identifier) | users.filter(email=identifier)).first()
+        else:
+            user = users.order_by("pk").first()
+
+        if user is None:
+            raise CommandError("No matching active user found")
+        return user
+
+    def handle(self, *args, **options):
+        from config.routing import websocket_urlpatterns
+
+        user = self.get_user(options["user"])
+        tenant_id = options["tenant"]
+        path = f"/ws/tenant/{tenant_id}/" if tenant_id else "/ws/notifications/"
+        token = jwt.RefreshToken.for_user(user).access_token
+        headers = [(b"cookie", f"{settings.ACCESS_TOKEN_COOKIE}={token}".encode())]
+        application = JSONWebTokenCookieMiddleware(URLRouter(websocket_urlpatterns))
+
+        # Start from cold caches, as right after a deploy
+        user_snapshots.invalidate_user_snapshots([user.pk])
+        if tenant_id:
+            tenant_cache.invalidate_tenant(tenant_id)
+        tenant_cache.tenant_cache.clear_local()
+
+        self.stdout.write(f"Connecting {options['connections']} clients to {path} as {user}")
+        for round_number in range(1, options["rounds"] + 1):
+            latencies, accepted, elapsed = async_to_sync(self.run_round)(
+                application, path, headers, options["connections"], options["concurrency"], options["timeout"]
+            )
+            self.report(round_number, latencies, accepted, elapsed)
+
+    async def run_round(self, application, path, headers, connections, concurrency, timeout):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def handshake():
+            async with semaphore:
+                communicator = WebsocketCommunicator(application, path, headers=headers)
+                started = time.perf_counter()
+                try:
+                    connected, _ = await communicator.connect(timeout=timeout)
+                except asyncio.TimeoutError:
+                    connected = False
+                latency = time.perf_counter() - started
+                await communicator.disconnect()
+                return latency, connected
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(handshake() for _ in range(connections)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ in results)
+        accepted = sum(connected for _, connected in results)
+        return latencies, accepted, elapsed
+
+    def report(self, round_number, latencies, accepted, elapsed):
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f"Round {round_number}: {len(latencies) / elapsed:.0f} connects/s, "
+            f"{accepted}/{len(latencies)} accepted, "
+            f"p50 {statistics.median(latencies) * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms"
+        )
+        if accepted < len(latencies):
+            self.stdout.write(self.style.WARNING("Some handshakes were rejected, check the user and tenant arguments"))
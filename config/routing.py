@@ -2,13 +2,14 @@
 ASGI routing configuration for WebSocket connections.
 Works alongside REST API for real-time features.
 """
-from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.sessions import SessionMiddlewareStack
 from channels.security.websocket import AllowedHostsOriginValidator
 from django.core.asgi import get_asgi_application
 from django.urls import re_path
 
 from apps.websockets.consumers import NotificationConsumer, TenantConsumer
+from iam.authentication import JSONWebTokenCookieMiddleware
 
 # Get the Django ASGI application
 django_asgi_app = get_asgi_application()
@@ -21,8 +22,10 @@ websocket_urlpatterns = [
 application = ProtocolTypeRouter({
     'http': django_asgi_app,
     'websocket': AllowedHostsOriginValidator(
-        AuthMiddlewareStack(
-            URLRouter(websocket_urlpatterns)
+        SessionMiddlewareStack(
+            JSONWebTokenCookieMiddleware(
+                URLRouter(websocket_urlpatterns)
+            )
         )
     ),
 })
@@ -18,6 +18,7 @@ import sys
 from pathlib import Path
 
 import environ
+from celery.schedules import crontab
 
 from . import monitoring
 
@@ -97,6 +98,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     #  HealthCheckMiddleware needs to be before the HostsRequestMiddleware
     "core.middleware.HealthCheckMiddleware",
+    "core.middleware.ChannelLayerPublisherMiddleware",
     "core.middleware.ManageCookiesMiddleware",
     "core.middleware.SetAuthTokenCookieMiddleware",
     "django_hosts.middleware.HostsRequestMiddleware",
@@ -114,6 +116,16 @@ MIDDLEWARE = [
     "social_django.middleware.SocialAuthExceptionMiddleware",
 ]
 
+# Readiness probe (/readyz, /lbcheck) snapshot refresh settings, all in seconds
+HEALTH_CHECK_INTERVAL = env.float("HEALTH_CHECK_INTERVAL", default=2)
+HEALTH_CHECK_PROBE_TIMEOUT = env.float("HEALTH_CHECK_PROBE_TIMEOUT", default=1)
+HEALTH_CHECK_MIGRATIONS_INTERVAL = env.float("HEALTH_CHECK_MIGRATIONS_INTERVAL", default=60)
+
+# Maximum number of channel layer messages sent concurrently by the publisher (see core.publisher)
+CHANNEL_LAYER_PUBLISH_BATCH_SIZE = env.int("CHANNEL_LAYER_PUBLISH_BATCH_SIZE", default=500)
+# Seconds between two logs of the publisher metrics of a process, when it published meanwhile; 0 disables them
+CHANNEL_LAYER_PUBLISH_METRICS_INTERVAL = env.float("CHANNEL_LAYER_PUBLISH_METRICS_INTERVAL", default=300)
+
 ROOT_URLCONF = "config.urls"
 ROOT_HOSTCONF = "config.hosts"
 DEFAULT_HOST = "api"
@@ -250,11 +262,20 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 AUTHENTICATION_BACKENDS = (
-    "iam.backends.EmailBackend",  # Custom backend for email authentication
+    "iam.backends.EmailBackend",  # Email or username authentication, replaces ModelBackend
     "social_core.backends.google.GoogleOAuth2",
     "social_core.backends.facebook.FacebookOAuth2",
-    "django.contrib.auth.backends.ModelBackend",
 )
+# Seconds a failed email/username and password pair is remembered, so repeating it skips password hashing
+AUTH_FAILED_LOGIN_CACHE_TIMEOUT = env.int("AUTH_FAILED_LOGIN_CACHE_TIMEOUT", default=60)
+
+# Login lockout: failed attempts per email / IP address allowed within the sliding window (in seconds)
+LOGIN_LOCKOUT_WINDOW = env.int("LOGIN_LOCKOUT_WINDOW", default=60 * 15)
+LOGIN_LOCKOUT_MAX_FAILURES_PER_EMAIL = env.int("LOGIN_LOCKOUT_MAX_FAILURES_PER_EMAIL", default=10)
+LOGIN_LOCKOUT_MAX_FAILURES_PER_IP = env.int("LOGIN_LOCKOUT_MAX_FAILURES_PER_IP", default=100)
+# Buffered LoginAttempt ingestion, flushed by the tasks.iam_tasks.flush_login_attempts periodic task
+LOGIN_ATTEMPT_FLUSH_BATCH_SIZE = env.int("LOGIN_ATTEMPT_FLUSH_BATCH_SIZE", default=500)
+LOGIN_ATTEMPT_BUFFER_MAX_LENGTH = env.int("LOGIN_ATTEMPT_BUFFER_MAX_LENGTH", default=100_000)
 
 # Add custom user model as the default user model
 AUTH_USER_MODEL = "iam.User"
@@ -289,7 +310,7 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "iam.authentication.JSONWebTokenCookieAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "iam.authentication.JSONWebTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_THROTTLE_RATES": {"anon": "100/day"},
@@ -309,6 +330,15 @@ REFRESH_TOKEN_COOKIE = "refresh_token"
 REFRESH_TOKEN_LOGOUT_COOKIE = "refresh_token_logout"
 COOKIE_MAX_AGE = 3600 * 24 * 14  # 14 days
 
+# Resolve JWT users from a cached snapshot validated against the token version claim instead of a per-request query
+JWT_STATELESS_USER_ENABLED = env.bool("JWT_STATELESS_USER_ENABLED", default=False)
+JWT_USER_SNAPSHOT_TIMEOUT = env.int("JWT_USER_SNAPSHOT_TIMEOUT", default=60)
+
+# Cached effective-permission bitmaps (iam.services.effective_permissions), timeouts in seconds
+IAM_PERMISSION_CACHE_TIMEOUT = env.int("IAM_PERMISSION_CACHE_TIMEOUT", default=60 * 60)
+IAM_PERMISSION_CACHE_LOCAL_TTL = env.int("IAM_PERMISSION_CACHE_LOCAL_TTL", default=5)
+IAM_PERMISSION_CACHE_LOCAL_MAXSIZE = env.int("IAM_PERMISSION_CACHE_LOCAL_MAXSIZE", default=4096)
+
 
 SOCIAL_AUTH_USER_MODEL = "iam.User"
 SOCIAL_AUTH_USER_FIELDS = ["email", "username"]
@@ -414,6 +444,28 @@ ENABLED_PAYMENT_GATEWAYS = [name for name, config in PAYMENT_GATEWAYS.items() if
 SUBSCRIPTION_TRIAL_PERIOD_DAYS = env("SUBSCRIPTION_TRIAL_PERIOD_DAYS", default=7)
 
 NOTIFICATIONS_STRATEGIES = ["InAppNotificationStrategy"]
+# Per-user notification preference matrices are cached until the user changes a preference
+NOTIFICATION_PREFERENCES_CACHE_TIMEOUT = env.int("NOTIFICATION_PREFERENCES_CACHE_TIMEOUT", default=60 * 60)
+NOTIFICATION_PREFERENCES_CACHE_LOCAL_TTL = env.int("NOTIFICATION_PREFERENCES_CACHE_LOCAL_TTL", default=5)
+# Broadcasts are delivered this many recipients per INSERT and channel layer round
+NOTIFICATION_BROADCAST_CHUNK_SIZE = env.int("NOTIFICATION_BROADCAST_CHUNK_SIZE", default=1000)
+# Unfinished broadcasts without progress for this many seconds are restarted from their cursor
+NOTIFICATION_BROADCAST_STALLED_AFTER = env.int("NOTIFICATION_BROADCAST_STALLED_AFTER", default=60 * 10)
+# Notifications are kept this many full months, then archived to NOTIFICATION_ARCHIVE_STORAGE and removed
+NOTIFICATION_RETENTION_MONTHS = env.int("NOTIFICATION_RETENTION_MONTHS", default=12)
+# Monthly notification partitions (PostgreSQL) are created this many months in advance
+NOTIFICATION_PARTITION_MONTHS_AHEAD = env.int("NOTIFICATION_PARTITION_MONTHS_AHEAD", default=3)
+# Archives contain user data, so they are kept out of the public media storage
+NOTIFICATION_ARCHIVE_STORAGE = env(
+    "NOTIFICATION_ARCHIVE_STORAGE",
+    default=(
+        "django.core.files.storage.FileSystemStorage" if IS_LOCAL_DEBUG else "core.storage.CustomS3Boto3Storage"
+    ),
+)
+# Due scheduled notifications claimed and sent per transaction
+SCHEDULED_NOTIFICATION_DISPATCH_CHUNK_SIZE = env.int("SCHEDULED_NOTIFICATION_DISPATCH_CHUNK_SIZE", default=1000)
+# Longest the dispatcher sleeps between delay queue checks, i.e. how late a newly scheduled notification can be sent
+SCHEDULED_NOTIFICATION_DISPATCH_POLL_INTERVAL = env.float("SCHEDULED_NOTIFICATION_DISPATCH_POLL_INTERVAL", default=1.0)
 
 SHELL_PLUS_IMPORTS = []
 
@@ -430,6 +482,11 @@ DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 
 CSRF_TRUSTED_ORIGINS = env("CSRF_TRUSTED_ORIGINS", default=[])
 RATELIMIT_IP_META_KEY = "core.utils.get_client_ip"
+# Networks of the load balancers and proxies in front of the app; X-Forwarded-For entries they add are trusted when
+# resolving the client ip (see core.utils.get_client_ip)
+TRUSTED_PROXY_NETWORKS = env.list(
+    "TRUSTED_PROXY_NETWORKS", default=["10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16", "127.0.0.0/8", "::1/128"]
+)
 
 OTP_AUTH_ISSUER_NAME = env("OTP_AUTH_ISSUER_NAME", default="")
 OTP_AUTH_TOKEN_COOKIE = "otp_auth_token"
@@ -443,6 +500,12 @@ USER_DOCUMENTS_NUMBER_LIMIT = env.int("USER_DOCUMENTS_NUMBER_LIMIT", default=10)
 
 TENANT_INVITATION_TIMEOUT = env("TENANT_INVITATION_TIMEOUT", default=60 * 60 * 24 * 14)
 
+# Tenant / membership resolution cache used by TenantMiddleware
+TENANT_CACHE_TIMEOUT = env.int("TENANT_CACHE_TIMEOUT", default=60 * 5)
+# How long a worker trusts its in-process copy before re-checking the shared cache
+TENANT_CACHE_LOCAL_TTL = env.int("TENANT_CACHE_LOCAL_TTL", default=5)
+TENANT_CACHE_LOCAL_MAXSIZE = env.int("TENANT_CACHE_LOCAL_MAXSIZE", default=2048)
+
 # Celery Configuration
 CELERY_RESULT_BACKEND = "django-db"
 if IS_LOCAL_DEBUG:
@@ -450,8 +513,9 @@ if IS_LOCAL_DEBUG:
     CELERY_TASK_ALWAYS_EAGER = True
     CELERY_TASK_EAGER_PROPAGATES = True
     CELERY_BROKER_URL = "memory://"
-    # Print emails to console for local development
-    EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+    # Print emails to console for local development, or write them to EMAIL_FILE_PATH with the file-based backend
+    EMAIL_BACKEND = env("EMAIL_BACKEND", default="django.core.mail.backends.console.EmailBackend")
+    EMAIL_FILE_PATH = env("EMAIL_FILE_PATH", default=str(BASE_DIR / "media" / "emails"))
 else:
     CELERY_BROKER_URL = f'{env("REDIS_CONNECTION")}/0'
     EMAIL_BACKEND = env("EMAIL_BACKEND", default="django_ses.SESBackend")
@@ -460,6 +524,64 @@ CELERY_BROKER_TRANSPORT_OPTIONS = {
     "visibility_timeout": 3600,
 }
 
+# Celery Beat schedule for periodic tasks, used by both config.celery (deployed beat) and tasks.celery
+CELERY_TIMEZONE = "UTC"
+CELERY_BEAT_SCHEDULE = {
+    "sync-content-every-hour": {
+        "task": "tasks.content_tasks.sync_content",
+        "schedule": crontab(minute=0),
+    },
+    # Safety net only: scheduled notifications are sent on time by the dispatch_scheduled_notifications command
+    "send-scheduled-notifications": {
+        "task": "tasks.notification_tasks.send_scheduled_notifications",
+        "schedule": crontab(minute="*/5"),
+    },
+    "resume-notification-broadcasts": {
+        "task": "tasks.notification_tasks.resume_notification_broadcasts",
+        "schedule": crontab(minute="*/5"),
+    },
+    "reconcile-unread-notification-counters": {
+        "task": "tasks.notification_tasks.reconcile_unread_notification_counters",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "maintain-notification-partitions": {
+        "task": "tasks.notification_tasks.maintain_notification_partitions",
+        "schedule": crontab(hour=2, minute=30),
+    },
+    "cleanup-expired-tokens": {
+        "task": "tasks.scheduler.cleanup_expired_tokens",
+        "schedule": crontab(hour=0, minute=0),
+    },
+    # Safety net only: batched tasks send their own flush messages, see tasks.batching
+    "flush-batched-tasks": {
+        "task": "tasks.batching.flush_batched_tasks",
+        "schedule": datetime.timedelta(minutes=1),
+    },
+    "flush-login-attempts": {
+        "task": "tasks.iam_tasks.flush_login_attempts",
+        "schedule": datetime.timedelta(seconds=10),
+    },
+}
+
+# Contentful entries hashed and upserted per query by the content sync (see content.sync)
+CONTENT_SYNC_CHUNK_SIZE = env.int("CONTENT_SYNC_CHUNK_SIZE", default=500)
+
+# Contentful Sync API used by the incremental content sync; the client can be swapped, e.g. for a local fake Contentful
+CONTENTFUL_SYNC_CLIENT = env(
+    "CONTENTFUL_SYNC_CLIENT", default="integrations.services.contentful_sync.ContentfulSyncClient"
+)
+CONTENTFUL_API_URL = env("CONTENTFUL_API_URL", default="https://cdn.contentful.com")
+CONTENTFUL_LOCALE = env("CONTENTFUL_LOCALE", default="en-US")
+
+# Contentful webhook events are collected for this long (in milliseconds), a burst of events for an entry is one fetch
+CONTENTFUL_WEBHOOK_DEBOUNCE_MS = env.int("CONTENTFUL_WEBHOOK_DEBOUNCE_MS", default=2000)
+# Value of the X-Contentful-Webhook-Secret header the webhook is configured with in Contentful, other requests are refused
+CONTENTFUL_WEBHOOK_SECRET = env("CONTENTFUL_WEBHOOK_SECRET", default=None)
+
+# Default size and maximum wait (in milliseconds) of the batches of micro-batched tasks (see tasks.batching)
+TASK_BATCH_MAX_SIZE = env.int("TASK_BATCH_MAX_SIZE", default=100)
+TASK_BATCH_MAX_WAIT_MS = env.int("TASK_BATCH_MAX_WAIT_MS", default=200)
+
 
 EMAIL_HOST = env("EMAIL_HOST", default=None)
 EMAIL_PORT = env("EMAIL_PORT", default=None)
@@ -468,6 +590,21 @@ EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD", default=None)
 EMAIL_FROM_ADDRESS = env("EMAIL_FROM_ADDRESS", default=None)
 EMAIL_REPLY_ADDRESS = env.list("EMAIL_REPLY_ADDRESS", default=(EMAIL_FROM_ADDRESS,))
 
+# Bulk email delivery (see core.email_delivery): messages sent per connection, attempts per recipient and the base
+# delay between attempts in seconds. With SMTP, use core.email_delivery.SMTPEmailBackend as EMAIL_BACKEND so that
+# recipients refused by the server are retried too.
+EMAIL_DELIVERY_BATCH_SIZE = env.int("EMAIL_DELIVERY_BATCH_SIZE", default=100)
+EMAIL_DELIVERY_MAX_ATTEMPTS = env.int("EMAIL_DELIVERY_MAX_ATTEMPTS", default=3)
+EMAIL_DELIVERY_RETRY_DELAY = env.float("EMAIL_DELIVERY_RETRY_DELAY", default=1)
+
+# Long-lived Node email renderer processes (see core.email_renderer); timeouts and intervals in seconds
+EMAIL_RENDERER_DIR = env("EMAIL_RENDERER_DIR", default=str(BASE_DIR / "scripts" / "runtime"))
+EMAIL_RENDERER_POOL_SIZE = env.int("EMAIL_RENDERER_POOL_SIZE", default=2)
+EMAIL_RENDERER_TIMEOUT = env.float("EMAIL_RENDERER_TIMEOUT", default=10)
+EMAIL_RENDERER_HEALTH_CHECK_INTERVAL = env.float("EMAIL_RENDERER_HEALTH_CHECK_INTERVAL", default=30)
+# Renderer processes are replaced after this many renders to bound the memory the bundle may leak
+EMAIL_RENDERER_MAX_RENDERS = env.int("EMAIL_RENDERER_MAX_RENDERS", default=1000)
+
 DEFAULT_USER_GROUP = env("DEFAULT_USER_GROUP", default="User")
 
 if DEBUG:
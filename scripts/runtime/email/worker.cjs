@@ -0,0 +1,46 @@
+// Long-lived email renderer used by core.email_renderer.EmailRendererPool.
+//
+// Speaks JSON lines: every line read from stdin is a request, answered by exactly one line on stdout with the same id.
+//   {"id": 1, "type": "render", "emailType": "ACCOUNT_ACTIVATION", "emailData": {...}} -> {"id": 1, "result": {...}}
+//   {"id": 2, "type": "ping"} -> {"id": 2, "result": "pong"}
+// A request that fails is answered with {"id": ..., "error": "..."} and the worker keeps serving.
+const readline = require('readline');
+
+const { renderEmail } = require('./index');
+
+// stdout carries the protocol only, anything the renderer logs goes to stderr
+const log = (...args) => process.stderr.write(`${args.join(' ')}\n`);
+console.log = log;
+console.info = log;
+console.debug = log;
+
+const respond = (response) => process.stdout.write(`${JSON.stringify(response)}\n`);
+
+const handle = (request) => {
+  switch (request.type) {
+    case 'ping':
+      return 'pong';
+    case 'render':
+      return renderEmail(request.emailType, request.emailData);
+    default:
+      throw Error(`Unknown request type: ${request.type}`);
+  }
+};
+
+readline.createInterface({ input: process.stdin, terminal: false }).on('line', (line) => {
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (error) {
+    respond({ id: null, error: `Invalid request: ${error.message}` });
+    return;
+  }
+
+  try {
+    respond({ id: request.id, result: handle(request) });
+  } catch (error) {
+    respond({ id: request.id, error: error && error.message ? error.message : String(error) });
+  }
+});
+
+process.stdin.on('end', () => process.exit(0));
@@ -0,0 +1,6 @@
+#!/bin/bash
+set -e
+
+echo "Starting scheduled notifications dispatcher..."
+
+pdm run python manage.py dispatch_scheduled_notifications